@@ -0,0 +1,2 @@
+# bench
+# Offline benchmark harness: stand-in provider server + run scenarios
@@ -0,0 +1,545 @@
+# fixtures.py
+# Provider responses for the stand-in server: recorded files first, then a
+# deterministic synthetic catalogue sized per scenario
+
+import hashlib, json, random, re, threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+# Query parameters never written to (or matched against) fixture files
+SECRET_PARAMS = {"api_key", "apikey"}
+
+GENRES = {
+    28: "Action",
+    12: "Adventure",
+    16: "Animation",
+    35: "Comedy",
+    80: "Crime",
+    99: "Documentary",
+    18: "Drama",
+    10751: "Family",
+    14: "Fantasy",
+    36: "History",
+    27: "Horror",
+    10402: "Music",
+    9648: "Mystery",
+    10749: "Romance",
+    878: "Science Fiction",
+    10770: "TV Movie",
+    53: "Thriller",
+    10752: "War",
+    37: "Western",
+}
+LANGUAGES = ["en"] * 14 + ["fr", "fr", "de", "ja", "ko", "es", "it", "sv", "fi", "da"]
+# chance a movie has subtitles in a language (others use DEFAULT_SUBS_RATIO)
+SUBS_RATIO = {"en": 0.95, "fi": 0.45, "sv": 0.5, "is": 0.04}
+DEFAULT_SUBS_RATIO = 0.35
+WORDS = (
+    "a young detective returns home to uncover the truth about her family "
+    "while a storm closes in on the city and old friends become rivals"
+).split()
+
+Response = Tuple[int, Any, Dict[str, str]]
+
+
+# ----------------- Recorded fixtures -----------------
+class FixtureStore:
+    """
+    Recorded GET responses on disk, one JSON file per request:
+    <root>/<provider>/<sha1 of path + query>.json. API keys are stripped
+    from the query before hashing, so recordings replay with any key.
+    """
+
+    KEEP_HEADERS = (
+        "X-Pagination-Page",
+        "X-Pagination-Limit",
+        "X-Pagination-Page-Count",
+        "X-Pagination-Item-Count",
+        "ETag",
+    )
+
+    def __init__(self, root: Optional[Path]) -> None:
+        self.root = Path(root) if root else None
+
+    @staticmethod
+    def key(path: str, query: Dict[str, List[str]]) -> str:
+        items = sorted(
+            (k, v) for k, vs in query.items() if k not in SECRET_PARAMS for v in vs
+        )
+        return hashlib.sha1(f"{path}?{urlencode(items)}".encode()).hexdigest()
+
+    def _file(self, provider: str, path: str, query: Dict[str, List[str]]) -> Path:
+        return self.root / provider / f"{self.key(path, query)}.json"
+
+    def load(
+        self, provider: str, path: str, query: Dict[str, List[str]]
+    ) -> Optional[Response]:
+        if not self.root:
+            return None
+        f = self._file(provider, path, query)
+        if not f.exists():
+            return None
+        data = json.loads(f.read_text(encoding="utf-8"))
+        return data["status"], data["body"], data.get("headers") or {}
+
+    def save(
+        self,
+        provider: str,
+        path: str,
+        query: Dict[str, List[str]],
+        status: int,
+        body: Any,
+        headers: Dict[str, str],
+    ) -> None:
+        f = self._file(provider, path, query)
+        f.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "path": path,
+            "query": {k: v for k, v in query.items() if k not in SECRET_PARAMS},
+            "status": status,
+            "headers": {k: headers[k] for k in self.KEEP_HEADERS if k in headers},
+            "body": body,
+        }
+        f.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+
+
+# ----------------- Synthetic catalogue -----------------
+class SyntheticWorld:
+    """
+    A fake movie universe that answers like the real providers.
+    TMDB ids are year * 1000 + popularity rank, IMDb ids are derived from
+    them, and every attribute comes from a RNG seeded by the id, so runs
+    are reproducible without storing anything.
+    """
+
+    def __init__(
+        self,
+        seed: int = 1,
+        per_year: int = 400,
+        radarr_size: int = 500,
+        radarr_years: Tuple[int, int] = (2020, 2020),
+        radarr_overlap: float = 0.1,
+        trakt_size: int = 0,
+        trakt_years: Tuple[int, int] = (1990, 2024),
+    ) -> None:
+        self.seed = seed
+        self.per_year = min(per_year, 999)
+        self.radarr_size = radarr_size
+        self.radarr_years = radarr_years
+        self.radarr_overlap = radarr_overlap
+        self.trakt_size = trakt_size
+        self.trakt_years = trakt_years
+        self._movies: Dict[int, dict] = {}
+        self._library: Optional[List[dict]] = None
+        self._library_json: Optional[bytes] = None
+        self._trakt: Optional[List[dict]] = None
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget movies added during a run (the library returns to its seed)."""
+        with self._lock:
+            self._added: Dict[int, dict] = {}
+            self._next_id = self.radarr_size + 1
+
+    def _rng(self, *parts) -> random.Random:
+        return random.Random(":".join(str(p) for p in (self.seed,) + parts))
+
+    # --- TMDB ---
+    def movie(self, tmdb_id: int) -> Optional[dict]:
+        year, rank = divmod(int(tmdb_id), 1000)
+        if not (1 <= rank <= self.per_year and 1900 <= year <= 2100):
+            return None
+        with self._lock:
+            if tmdb_id in self._movies:
+                return self._movies[tmdb_id]
+        rng = self._rng("movie", tmdb_id)
+        title = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rank}"
+        movie = {
+            "adult": False,
+            "backdrop_path": f"/b{tmdb_id}.jpg",
+            "genre_ids": rng.sample(sorted(GENRES), rng.randint(1, 3)),
+            "id": tmdb_id,
+            "original_language": rng.choice(LANGUAGES),
+            "original_title": title,
+            "overview": " ".join(rng.choice(WORDS) for _ in range(40)).capitalize(),
+            "popularity": round(2000 / rank, 3),
+            "poster_path": f"/p{tmdb_id}.jpg",
+            "release_date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "title": title,
+            "video": False,
+            "vote_average": round(min(9.5, max(1.0, rng.gauss(6.3, 1.0))), 1),
+            "vote_count": int(30000 / rank**0.8 * rng.uniform(0.2, 1.5)),
+        }
+        with self._lock:
+            self._movies[tmdb_id] = movie
+        return movie
+
+    def discover(self, q: Dict[str, str]) -> Response:
+        year = int(q.get("primary_release_year") or 2020)
+        movies = [self.movie(year * 1000 + r) for r in range(1, self.per_year + 1)]
+        if q.get("vote_average.gte"):
+            movies = [
+                m for m in movies if m["vote_average"] >= float(q["vote_average.gte"])
+            ]
+        if q.get("vote_count.gte"):
+            movies = [m for m in movies if m["vote_count"] >= int(q["vote_count.gte"])]
+        if q.get("with_genres"):
+            wanted = {int(g) for g in re.split(r"[|,]", q["with_genres"])}
+            movies = [m for m in movies if wanted & set(m["genre_ids"])]
+        if q.get("without_genres"):
+            unwanted = {int(g) for g in q["without_genres"].split(",")}
+            movies = [m for m in movies if not unwanted & set(m["genre_ids"])]
+        if q.get("with_original_language"):
+            lang = q["with_original_language"]
+            movies = [m for m in movies if m["original_language"] == lang]
+        page = max(1, int(q.get("page") or 1))
+        body = {
+            "page": page,
+            "results": movies[(page - 1) * 20 : page * 20],
+            "total_pages": (len(movies) + 19) // 20,
+            "total_results": len(movies),
+        }
+        return 200, body, {}
+
+    def details(self, tmdb_id: int, q: Dict[str, str]) -> Response:
+        movie = self.movie(tmdb_id)
+        if not movie:
+            return 404, {"status_code": 34, "status_message": "Not found."}, {}
+        rng = self._rng("details", tmdb_id)
+        imdb_id = f"tt{tmdb_id:08d}"
+        body = {k: v for k, v in movie.items() if k != "genre_ids"}
+        body.update(
+            {
+                "budget": rng.randint(0, 200) * 1_000_000,
+                "genres": [{"id": g, "name": GENRES[g]} for g in movie["genre_ids"]],
+                "homepage": "",
+                "imdb_id": imdb_id if rng.random() > 0.05 else None,
+                "production_companies": [
+                    {"id": rng.randint(1, 99999), "name": f"Studio {i}"}
+                    for i in range(rng.randint(1, 4))
+                ],
+                "revenue": rng.randint(0, 900) * 1_000_000,
+                "runtime": rng.randint(80, 170),
+                "spoken_languages": [{"iso_639_1": movie["original_language"]}],
+                "status": "Released",
+                "tagline": " ".join(rng.choice(WORDS) for _ in range(6)),
+            }
+        )
+        if "external_ids" in (q.get("append_to_response") or ""):
+            body["external_ids"] = {"imdb_id": imdb_id, "wikidata_id": None}
+        return 200, body, {}
+
+    def genres(self) -> Response:
+        return 200, {"genres": [{"id": k, "name": v} for k, v in GENRES.items()]}, {}
+
+    # --- OMDb ---
+    def omdb(self, q: Dict[str, str]) -> Response:
+        imdb_id = q.get("i") or ""
+        movie = self.movie(int(imdb_id[2:])) if imdb_id[2:].isdigit() else None
+        if not movie:
+            return 200, {"Response": "False", "Error": "Incorrect IMDb ID."}, {}
+        rng = self._rng("omdb", imdb_id)
+        imdb_rating = round(
+            min(9.8, max(1.0, movie["vote_average"] + rng.gauss(0, 0.5))), 1
+        )
+        ratings = [{"Source": "Internet Movie Database", "Value": f"{imdb_rating}/10"}]
+        if rng.random() < 0.8:
+            rt = min(100, max(0, int(imdb_rating * 12 - 20 + rng.gauss(0, 10))))
+            ratings.append({"Source": "Rotten Tomatoes", "Value": f"{rt}%"})
+        body = {
+            "Title": movie["title"],
+            "Year": movie["release_date"][:4],
+            "Plot": movie["overview"],
+            "Ratings": ratings,
+            "imdbRating": str(imdb_rating),
+            "imdbVotes": f"{int(movie['vote_count'] * rng.uniform(1, 4)):,}",
+            "imdbID": imdb_id,
+            "Type": "movie",
+            "Response": "True",
+        }
+        return 200, body, {}
+
+    # --- OpenSubtitles ---
+    def _uploads(self, movie: dict, lang: str, q: Dict[str, str]) -> List[dict]:
+        """A movie's (seeded) subtitle uploads in one language."""
+        raw_id = f"{movie['id']:08d}"  # as in its IMDb id, seeds stay comparable
+        rng = self._rng("subs", raw_id, lang)
+        if rng.random() > SUBS_RATIO.get(lang, DEFAULT_SUBS_RATIO):
+            return []
+        uploads = []
+        for n in range(rng.randint(1, 8)):
+            ai = rng.random() < 0.1
+            if ai and q.get("ai_translated") == "exclude":
+                continue
+            sub_id = f"{raw_id}{lang}{n}"
+            uploads.append(
+                {
+                    "id": sub_id,
+                    "type": "subtitle",
+                    "attributes": {
+                        "subtitle_id": sub_id,
+                        "language": lang,
+                        "download_count": rng.randint(0, 50000),
+                        "new_download_count": rng.randint(0, 500),
+                        "hearing_impaired": rng.random() < 0.2,
+                        "hd": rng.random() < 0.7,
+                        "fps": rng.choice([23.976, 24.0, 25.0]),
+                        "votes": rng.randint(0, 40),
+                        "ratings": round(rng.uniform(0, 10), 1),
+                        "from_trusted": rng.random() < 0.3,
+                        "foreign_parts_only": False,
+                        "ai_translated": ai,
+                        "machine_translated": False,
+                        "upload_date": f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-01T00:00:00Z",
+                        "release": f"{movie['title'].replace(' ', '.')}.1080p.BluRay",
+                        "feature_details": {
+                            "imdb_id": int(raw_id),
+                            # like the real listing, a few lack the TMDB id
+                            "tmdb_id": movie["id"] if rng.random() > 0.1 else None,
+                            "title": movie["title"],
+                            "year": int(movie["release_date"][:4]),
+                        },
+                        "files": [{"file_id": rng.randint(1, 10**7)}],
+                    },
+                }
+            )
+        return uploads
+
+    def subtitles(self, q: Dict[str, str]) -> Response:
+        langs = (q.get("languages") or "en").split(",")
+        raw_id = (q.get("imdb_id") or "").lower().lstrip("t")
+        if raw_id:
+            movie = self.movie(int(raw_id)) if raw_id.isdigit() else None
+            data = (
+                [u for lang in langs for u in self._uploads(movie, lang, q)]
+                if movie
+                else []
+            )
+            body = {"total_pages": 1, "total_count": len(data), "page": 1, "data": data}
+            return 200, body, {}
+
+        # Listing without a movie: every upload of the year, 60 per page
+        year = int(q.get("year") or 2020)
+        movies = [self.movie(year * 1000 + r) for r in range(1, self.per_year + 1)]
+        data = [u for m in movies for lang in langs for u in self._uploads(m, lang, q)]
+        order = q.get("order_by") or "download_count"
+        data.sort(key=lambda u: u["attributes"].get(order) or 0, reverse=True)
+        page = max(1, int(q.get("page") or 1))
+        body = {
+            "total_pages": max(1, (len(data) + 59) // 60),
+            "total_count": len(data),
+            "page": page,
+            "data": data[(page - 1) * 60 : page * 60],
+        }
+        return 200, body, {}
+
+    # --- Radarr ---
+    def _radarr_movie(self, movie_id: int, tmdb_id: int) -> dict:
+        movie = self.movie(tmdb_id) or {}
+        rng = self._rng("radarr", tmdb_id)
+        title = movie.get("title") or f"Library Movie {tmdb_id}"
+        year = int((movie.get("release_date") or "1999")[:4])
+        return {
+            "id": movie_id,
+            "title": title,
+            "originalTitle": title,
+            "sortTitle": title.lower(),
+            "sizeOnDisk": rng.randint(0, 40) * 10**9,
+            "status": "released",
+            "overview": movie.get("overview")
+            or " ".join(rng.choice(WORDS) for _ in range(40)),
+            "images": [
+                {
+                    "coverType": "poster",
+                    "url": f"/MediaCover/{movie_id}/poster.jpg",
+                    "remoteUrl": f"https://image.tmdb.org/t/p/original/p{tmdb_id}.jpg",
+                },
+                {
+                    "coverType": "fanart",
+                    "url": f"/MediaCover/{movie_id}/fanart.jpg",
+                    "remoteUrl": f"https://image.tmdb.org/t/p/original/b{tmdb_id}.jpg",
+                },
+            ],
+            "year": year,
+            "hasFile": rng.random() < 0.8,
+            "path": f"/movies/{title} ({year})",
+            "qualityProfileId": 1,
+            "monitored": True,
+            "minimumAvailability": "released",
+            "runtime": rng.randint(80, 170),
+            "imdbId": f"tt{tmdb_id:08d}",
+            "tmdbId": tmdb_id,
+            "titleSlug": str(tmdb_id),
+            "genres": [GENRES[g] for g in movie.get("genre_ids", [])],
+            "tags": [],
+            "added": f"20{rng.randint(15, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+            "ratings": {
+                "imdb": {
+                    "votes": movie.get("vote_count", 0),
+                    "value": movie.get("vote_average", 0),
+                    "type": "user",
+                },
+                "tmdb": {
+                    "votes": movie.get("vote_count", 0),
+                    "value": movie.get("vote_average", 0),
+                    "type": "user",
+                },
+            },
+        }
+
+    def library(self) -> List[dict]:
+        """Seeded Radarr library: a share of the scenario's years, then filler."""
+        with self._lock:
+            if self._library is None:
+                rng = self._rng("library")
+                first, last = self.radarr_years
+                ids = [
+                    y * 1000 + r
+                    for y in range(first, last + 1)
+                    for r in range(1, self.per_year + 1)
+                    if rng.random() < self.radarr_overlap
+                ][: self.radarr_size]
+                ids += [9_000_000 + i for i in range(self.radarr_size - len(ids))]
+                self._library = [
+                    self._radarr_movie(i + 1, t) for i, t in enumerate(ids)
+                ]
+                self._library_json = json.dumps(self._library).encode()
+            return self._library
+
+    def radarr(self, method: str, path: str, q: Dict[str, str], body: Any) -> Response:
+        library = self.library()
+        if path == "/movie" and method == "GET":
+            with self._lock:
+                added = list(self._added.values())
+            if q.get("tmdbId"):
+                tmdb_id = int(q["tmdbId"])
+                found = [m for m in library + added if m["tmdbId"] == tmdb_id]
+                return 200, found, {}
+            if not added:
+                return 200, self._library_json, {}
+            return 200, library + added, {}
+        if path == "/movie" and method == "POST":
+            tmdb_id = int((body or {}).get("tmdbId") or 0)
+            with self._lock:
+                if tmdb_id in self._added or any(
+                    m["tmdbId"] == tmdb_id for m in library
+                ):
+                    error = [
+                        {
+                            "propertyName": "TmdbId",
+                            "errorMessage": "This movie has already been added",
+                            "errorCode": "MovieExistsValidator",
+                        }
+                    ]
+                    return 400, error, {}
+                movie = self._radarr_movie(self._next_id, tmdb_id)
+                self._next_id += 1
+                self._added[tmdb_id] = movie
+            return 201, movie, {}
+        if path == "/movie/import" and method == "POST":
+            created = []
+            for item in body or []:
+                status, movie, _ = self.radarr("POST", "/movie", {}, item)
+                if status == 201:
+                    created.append(movie)
+            return 201, created, {}
+        if path == "/command" and method == "POST":
+            return (
+                201,
+                {"id": 1, "name": (body or {}).get("name"), "status": "queued"},
+                {},
+            )
+        if path == "/system/status":
+            return 200, {"appName": "Radarr", "version": "5.0.0.0"}, {}
+        return 404, {"message": "NotFound"}, {}
+
+    # --- Trakt ---
+    def trakt_items(self) -> List[dict]:
+        with self._lock:
+            if self._trakt is None:
+                rng = self._rng("trakt")
+                first, last = self.trakt_years
+                items = []
+                for rank in range(1, self.trakt_size + 1):
+                    tmdb_id = rng.randint(first, last) * 1000 + rng.randint(
+                        1, self.per_year
+                    )
+                    movie = self.movie(tmdb_id)
+                    items.append(
+                        {
+                            "rank": rank,
+                            "id": rank,
+                            "listed_at": "2024-01-01T00:00:00.000Z",
+                            "notes": None,
+                            "type": "movie",
+                            "movie": {
+                                "title": movie["title"],
+                                "year": int(movie["release_date"][:4]),
+                                "ids": {
+                                    "trakt": tmdb_id,
+                                    "slug": str(tmdb_id),
+                                    "imdb": f"tt{tmdb_id:08d}",
+                                    "tmdb": tmdb_id,
+                                },
+                            },
+                        }
+                    )
+                self._trakt = items
+            return self._trakt
+
+    def trakt(self, method: str, path: str, q: Dict[str, str], body: Any) -> Response:
+        if path == "/oauth/token" and method == "POST":
+            return (
+                200,
+                {
+                    "access_token": "bench",
+                    "refresh_token": "bench",
+                    "expires_in": 86400,
+                },
+                {},
+            )
+        if not re.fullmatch(r"/users/[^/]+/lists/[^/]+/items(/movies?)?", path):
+            return 404, {"error": "not found"}, {}
+        items = self.trakt_items()
+        if "page" not in q and "limit" not in q:
+            return 200, items, {}
+        page = max(1, int(q.get("page") or 1))
+        limit = max(1, int(q.get("limit") or 10))
+        headers = {
+            "X-Pagination-Page": str(page),
+            "X-Pagination-Limit": str(limit),
+            "X-Pagination-Page-Count": str((len(items) + limit - 1) // limit),
+            "X-Pagination-Item-Count": str(len(items)),
+            "ETag": f'"{self.seed}-{len(items)}-{page}-{limit}"',
+        }
+        return 200, items[(page - 1) * limit : page * limit], headers
+
+    # --- Routing ---
+    def handle(
+        self, provider: str, method: str, path: str, q: Dict[str, str], body: Any
+    ) -> Response:
+        """Answer one request; `path` is relative to the provider's API root."""
+        if provider == "tmdb":
+            if path == "/3/discover/movie":
+                return self.discover(q)
+            if path == "/3/genre/movie/list":
+                return self.genres()
+            m = re.fullmatch(r"/3/movie/(\d+)", path)
+            if m:
+                return self.details(int(m.group(1)), q)
+            m = re.fullmatch(r"/3/find/tt(\d+)", path)
+            if m:
+                movie = self.movie(int(m.group(1)))
+                return 200, {"movie_results": [movie] if movie else []}, {}
+        elif provider == "omdb":
+            return self.omdb(q)
+        elif provider == "opensubtitles":
+            if path == "/api/v1/subtitles":
+                return self.subtitles(q)
+        elif provider == "radarr":
+            return self.radarr(method, path[len("/api/v3") :], q, body)
+        elif provider == "trakt":
+            return self.trakt(method, path, q, body)
+        return 404, {"error": f"no stand-in route for {provider} {path}"}, {}
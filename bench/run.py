@@ -0,0 +1,376 @@
+# run.py
+# Offline benchmark: runs main_process scenarios against the stand-in server
+#
+#   python -m bench.run                       # all scenarios
+#   python -m bench.run one-year --warm       # second run on a warm cache
+#   python -m bench.run --json base.json      # save results ...
+#   python -m bench.run --compare base.json   # ... and fail on regressions
+#
+# Every scenario runs in a fresh interpreter inside a temporary directory
+# (config/, cache.db, CSV and log all land there), so results do not leak
+# between scenarios and nothing touches a real /config.
+
+import argparse, json, os, subprocess, sys, tempfile, time, urllib.request
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULT_PREFIX = "BENCH_RESULT "
+
+# Seconds added per request by the stand-in (scaled by --latency-scale)
+DEFAULT_LATENCY = {
+    "tmdb": 0.03,
+    "omdb": 0.05,
+    "opensubtitles": 0.05,
+    "radarr": 0.01,
+    "trakt": 0.15,
+}
+# Stand-in rate limits (requests/second) used with --limits
+DEFAULT_LIMITS = {"tmdb": 40, "omdb": 10, "opensubtitles": 5, "trakt": 3}
+
+# Client settings for every scenario; --env overrides them
+BENCH_ENV = {
+    "TMDB_API_KEY": "bench",
+    "OMDB_KEY": "bench",
+    "OS_API_KEY": "bench",
+    "TRAKT_CLIENT_ID": "bench",
+    "RADARR_KEY": "bench",
+    "SUBTITLE_LANG": "fi",
+    "QUIET_MODE": "true",
+    "DEBUG": "false",
+    "TMDB_RATE": "0",
+    "OMDB_RATE": "0",
+    "OS_RATE": "0",
+    "TRAKT_RATE": "0",
+    "OS_DELAY": "0",
+    "HTTP_BACKOFF": "0.2",
+    "CACHE_BACKEND": "sqlite",
+    "MIN_VOTE_COUNT": "0",
+    "ALLOWED_LANGUAGES": "",
+    "POSTER_PREWARM": "false",
+}
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "one-year": {
+        "world": {"radarr_size": 500, "radarr_years": "2020"},
+        "run": {
+            "start_year": 2020,
+            "end_year": 2020,
+            "max_pages": 5,
+            "max_movies": 10,
+            "min_tmdb": 6.0,
+            "min_imdb": 6.0,
+        },
+    },
+    "ten-years": {
+        "world": {"radarr_size": 2000, "radarr_years": "2010-2019"},
+        "run": {
+            "start_year": 2010,
+            "end_year": 2019,
+            "max_pages": 5,
+            "max_movies": 50,
+            "min_tmdb": 6.0,
+            "min_imdb": 6.0,
+        },
+    },
+    "ten-years-ranked": {
+        "world": {"radarr_size": 2000, "radarr_years": "2010-2019"},
+        "run": {
+            "start_year": 2010,
+            "end_year": 2019,
+            "max_pages": 5,
+            "max_movies": 50,
+            "min_tmdb": 6.0,
+            "min_imdb": 6.0,
+            "rank": True,
+        },
+    },
+    "trakt-5k": {
+        "world": {"radarr_size": 1000, "trakt_size": 5000},
+        "run": {
+            "trakt_user": "bench",
+            "trakt_list": "big-list",
+            "start_year": 1990,
+            "end_year": 2024,
+            "max_movies": 100,
+            "min_tmdb": 6.0,
+            "min_imdb": 6.0,
+        },
+    },
+    "rare-lang": {
+        "world": {"radarr_size": 500, "radarr_years": "2015-2019"},
+        "run": {
+            "start_year": 2015,
+            "end_year": 2019,
+            "max_pages": 10,
+            "max_movies": 15,
+            "min_tmdb": 6.0,
+            "min_imdb": 6.0,
+            "subtitle_lang": "is",
+        },
+    },
+    "rare-lang-subs-first": {
+        "world": {"radarr_size": 500, "radarr_years": "2015-2019"},
+        "run": {
+            "start_year": 2015,
+            "end_year": 2019,
+            "max_pages": 10,
+            "max_movies": 15,
+            "min_tmdb": 6.0,
+            "min_imdb": 6.0,
+            "subtitle_lang": "is",
+            "discovery": "subtitles",
+        },
+    },
+    "big-radarr": {
+        "world": {
+            "radarr_size": 50000,
+            "radarr_years": "2018-2022",
+            "radarr_overlap": 0.3,
+        },
+        "run": {
+            "start_year": 2020,
+            "end_year": 2020,
+            "max_pages": 10,
+            "max_movies": 25,
+            "min_tmdb": 5.5,
+            "min_imdb": 0,
+        },
+    },
+}
+
+
+# ----------------- Worker (runs inside the scenario interpreter) -----------------
+def _stand_in(path: str) -> Dict[str, Any]:
+    url = os.environ["BENCH_STAND_IN"] + path
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def worker(spec: Dict[str, Any]) -> None:
+    import resource, tracemalloc
+
+    if spec["trace_memory"]:
+        tracemalloc.start()
+    from suborbit import suborbit_core as core
+
+    if core.BASE_CONFIG.resolve() == Path("/config"):
+        sys.exit("bench: /config exists here; run the benchmark outside the container")
+
+    runs = []
+    for i in range(2 if spec["warm"] else 1):
+        # Same workload each time: forget earlier adds, keep the caches
+        _stand_in("/_reset")
+        core.RADARR_LIBRARY.invalidate()
+        if spec["trace_memory"]:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        core.main_process(**spec["run"])
+        runs.append(
+            {
+                "wall": round(time.perf_counter() - started, 3),
+                "summary": core.run_summary(),
+                "server": _stand_in("/_stats"),
+                "traced_peak_mb": (
+                    round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+                    if spec["trace_memory"]
+                    else None
+                ),
+            }
+        )
+    result = runs[-1]
+    result["cold_wall"] = runs[0]["wall"]
+    # ru_maxrss is KiB on Linux
+    result["peak_rss_mb"] = round(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+    )
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ----------------- Runner -----------------
+def start_stand_in(world: Dict[str, Any], args) -> subprocess.Popen:
+    latency = {k: v * args.latency_scale for k, v in DEFAULT_LATENCY.items()}
+    cmd = [sys.executable, "-m", "bench.stand_in", "--port", "0"]
+    for key, value in world.items():
+        cmd += [f"--{key.replace('_', '-')}", str(value)]
+    cmd += ["--latency", ",".join(f"{k}={v}" for k, v in latency.items())]
+    if args.limits:
+        cmd += ["--limits", ",".join(f"{k}={v}" for k, v in DEFAULT_LIMITS.items())]
+    if args.fixtures:
+        cmd += ["--fixtures", str(args.fixtures.resolve())]
+    if args.record:
+        cmd += ["--record", "--radarr-upstream", args.radarr_upstream]
+    return subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+
+
+def run_scenario(name: str, args) -> Dict[str, Any]:
+    scenario = SCENARIOS[name]
+    server = start_stand_in(scenario["world"], args)
+    try:
+        ready = server.stdout.readline().strip()
+        if not ready.startswith("READY "):
+            raise RuntimeError(f"stand-in server failed to start: {ready!r}")
+        base = ready.split(" ", 1)[1]
+
+        env = dict(os.environ)
+        for k, v in BENCH_ENV.items():
+            # recording needs the real keys
+            if not (args.record and k.endswith(("_KEY", "_ID")) and env.get(k)):
+                env[k] = v
+        env.update(
+            {
+                "BENCH_STAND_IN": base,
+                "TMDB_API_URL": f"{base}/tmdb/3",
+                "OMDB_API_URL": f"{base}/omdb/",
+                "OS_API_URL": f"{base}/opensubtitles/api/v1",
+                "TRAKT_API_URL": f"{base}/trakt",
+                "RADARR_API": f"{base}/radarr/api/v3",
+                "PYTHONPATH": os.pathsep.join(
+                    p for p in (str(REPO_ROOT), env.get("PYTHONPATH")) if p
+                ),
+            }
+        )
+        env.update(dict(kv.split("=", 1) for kv in args.env))
+        spec = {
+            "run": scenario["run"],
+            "warm": args.warm,
+            "trace_memory": args.trace_memory,
+        }
+        with tempfile.TemporaryDirectory(prefix="suborbit-bench-") as tmp:
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.run", "--worker", json.dumps(spec)],
+                cwd=tmp,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=args.timeout,
+            )
+        for line in proc.stdout.splitlines():
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX) :])
+        raise RuntimeError(
+            f"scenario {name} failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}"
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def flatten(result: Dict[str, Any]) -> Dict[str, float]:
+    """The numbers that get reported and compared."""
+    server = result["server"]
+    row = {
+        "wall": result["wall"],
+        "requests": sum(p["requests"] for p in server.values()),
+        "throttled": sum(p["throttled"] for p in server.values()),
+        "added": result["summary"].get("added", 0),
+        "peak_rss_mb": result["peak_rss_mb"],
+    }
+    for provider in DEFAULT_LATENCY:
+        row[provider] = server.get(provider, {}).get("requests", 0)
+    if result.get("traced_peak_mb") is not None:
+        row["traced_peak_mb"] = result["traced_peak_mb"]
+    return row
+
+
+COLUMNS = [
+    ("wall", "wall s", "{:.2f}"),
+    ("requests", "reqs", "{:g}"),
+    ("tmdb", "tmdb", "{:g}"),
+    ("omdb", "omdb", "{:g}"),
+    ("opensubtitles", "os", "{:g}"),
+    ("radarr", "radarr", "{:g}"),
+    ("trakt", "trakt", "{:g}"),
+    ("throttled", "429", "{:g}"),
+    ("added", "added", "{:g}"),
+    ("peak_rss_mb", "rss MB", "{:.1f}"),
+    ("traced_peak_mb", "traced MB", "{:.1f}"),
+]
+# Compared against a baseline; anything else is informational
+COMPARED = ("wall", "requests", "peak_rss_mb", "traced_peak_mb")
+
+
+def print_table(rows: Dict[str, Dict[str, float]]) -> None:
+    cols = [c for c in COLUMNS if any(c[0] in r for r in rows.values())]
+    width = max([12] + [len(name) + 2 for name in rows])
+    print(f"{'scenario':<{width}}" + "".join(f"{label:>10}" for _, label, _ in cols))
+    for name, row in rows.items():
+        cells = [fmt.format(row[key]) if key in row else "-" for key, _, fmt in cols]
+        print(f"{name:<{width}}" + "".join(f"{c:>10}" for c in cells))
+
+
+def compare(
+    rows: Dict[str, Dict[str, float]], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Print deltas vs a saved run; return the regressions over `threshold`."""
+    regressions = []
+    for name, row in rows.items():
+        base = (baseline.get("rows") or {}).get(name)
+        if not base:
+            continue
+        deltas = []
+        for key in COMPARED:
+            if key not in row or not base.get(key):
+                continue
+            change = (row[key] - base[key]) / base[key]
+            deltas.append(f"{key} {change:+.0%}")
+            if change > threshold:
+                regressions.append(f"{name}: {key} {base[key]:g} -> {row[key]:g}")
+        print(f"  {name:<12}" + ", ".join(deltas))
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="SubOrbit offline benchmarks")
+    ap.add_argument("scenarios", nargs="*", help=", ".join(SCENARIOS))
+    ap.add_argument("--warm", action="store_true", help="report a second, warm run")
+    ap.add_argument("--latency-scale", type=float, default=1.0)
+    ap.add_argument("--limits", action="store_true", help="enforce provider limits")
+    ap.add_argument("--trace-memory", action="store_true", help="tracemalloc peak")
+    ap.add_argument("--fixtures", type=Path, help="recorded responses to replay")
+    ap.add_argument("--record", action="store_true", help="record fixture misses")
+    ap.add_argument("--radarr-upstream", default="", help="real Radarr to record")
+    ap.add_argument("--env", action="append", default=[], help="KEY=VALUE override")
+    ap.add_argument("--json", type=Path, help="write results here")
+    ap.add_argument("--compare", type=Path, help="baseline results to compare")
+    ap.add_argument("--threshold", type=float, default=0.15)
+    ap.add_argument("--timeout", type=int, default=900)
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.worker:
+        worker(json.loads(args.worker))
+        return 0
+    if args.record and not args.fixtures:
+        ap.error("--record needs --fixtures")
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        ap.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    rows, results = {}, {}
+    for name in args.scenarios or SCENARIOS:
+        print(f"▶ {name} ...", flush=True)
+        results[name] = run_scenario(name, args)
+        rows[name] = flatten(results[name])
+    print()
+    print_table(rows)
+
+    if args.json:
+        args.json.write_text(
+            json.dumps({"rows": rows, "results": results}, indent=2), encoding="utf-8"
+        )
+    if args.compare:
+        print(f"\nvs {args.compare}:")
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(rows, baseline, args.threshold)
+        if regressions:
+            print("\n❌ Regressions over {:.0%}:".format(args.threshold))
+            for r in regressions:
+                print(f"  {r}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
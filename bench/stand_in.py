@@ -0,0 +1,287 @@
+# stand_in.py
+# Local stand-in for every provider SubOrbit talks to, with per-provider
+# latency, rate limits and request counters
+#
+#   python -m bench.stand_in --port 8765 --radarr-size 5000
+#
+# Providers live under path prefixes: /tmdb/3, /omdb/, /opensubtitles/api/v1,
+# /radarr/api/v3 and /trakt. GET /_stats returns the counters, /_reset
+# clears them (and movies added to the fake Radarr). GET responses carry an
+# ETag (unless recorded with one, a hash of the body) and a matching
+# If-None-Match gets a 304.
+
+import argparse, hashlib, json, re, threading, time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .fixtures import FixtureStore, SyntheticWorld
+
+PROVIDERS = ("tmdb", "omdb", "opensubtitles", "radarr", "trakt")
+
+# Where --record forwards fixture misses (path is appended as-is)
+UPSTREAMS = {
+    "tmdb": "https://api.themoviedb.org",
+    "omdb": "http://www.omdbapi.com",
+    "opensubtitles": "https://api.opensubtitles.com",
+    "trakt": "https://api.trakt.tv",
+}
+FORWARD_HEADERS = (
+    "Api-Key",
+    "User-Agent",
+    "X-Api-Key",
+    "Authorization",
+    "trakt-api-key",
+    "trakt-api-version",
+)
+
+
+def parse_pairs(raw: str, cast=float) -> Dict[str, Any]:
+    """'tmdb=0.03,omdb=0.05' -> {'tmdb': 0.03, 'omdb': 0.05}"""
+    out = {}
+    for part in (raw or "").split(","):
+        k, _, v = part.partition("=")
+        if k.strip() and v.strip():
+            out[k.strip()] = cast(v)
+    return out
+
+
+def parse_range(raw: str):
+    first, _, last = raw.partition("-")
+    return int(first), int(last or first)
+
+
+class Bucket:
+    """Non-blocking token bucket: requests over the rate get a 429."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, rate)  # one second of burst
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.stamp) * self.rate
+            )
+            self.stamp = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.providers = defaultdict(
+                lambda: {"requests": 0, "throttled": 0, "bytes": 0, "routes": {}}
+            )
+
+    def count(self, provider: str, route: str, status: int, size: int) -> None:
+        with self.lock:
+            p = self.providers[provider]
+            p["requests"] += 1
+            p["bytes"] += size
+            if status == 429:
+                p["throttled"] += 1
+            p["routes"][route] = p["routes"].get(route, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return json.loads(json.dumps(self.providers))
+
+
+def route_label(method: str, path: str) -> str:
+    """Collapse ids so counters group by endpoint."""
+    path = re.sub(r"/users/[^/]+/lists/[^/]+", "/users/:user/lists/:list", path)
+    return f"{method} {re.sub(r'(?<!^)/(tt)?[0-9]+(?=/|$)', '/:id', path)}"
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        world: SyntheticWorld,
+        latency: Dict[str, float] = None,
+        limits: Dict[str, float] = None,
+        fixtures: FixtureStore = None,
+        record: bool = False,
+        radarr_upstream: str = "",
+    ) -> None:
+        super().__init__(address, StandInHandler)
+        self.world = world
+        self.latency = latency or {}
+        self.buckets = {p: Bucket(r) for p, r in (limits or {}).items() if r > 0}
+        self.fixtures = fixtures or FixtureStore(None)
+        self.record = record
+        self.upstreams = dict(UPSTREAMS, radarr=radarr_upstream.rstrip("/"))
+        self.stats = Stats()
+
+    def respond(self, provider, method, path, query, headers, body):
+        q = {k: v[-1] for k, v in query.items()}
+        if method == "GET":
+            recorded = self.fixtures.load(provider, path, query)
+            if recorded:
+                return recorded
+            if self.record and self.upstreams.get(provider):
+                return self.forward(provider, path, query, headers)
+        # Writes are never forwarded: the fake Radarr answers them
+        return self.world.handle(provider, method, path, q, body)
+
+    def forward(self, provider, path, query, headers):
+        import requests
+
+        resp = requests.get(
+            self.upstreams[provider] + path,
+            params=query,
+            headers={h: headers[h] for h in FORWARD_HEADERS if h in headers},
+            timeout=30,
+        )
+        try:
+            body = resp.json()
+        except ValueError:
+            return resp.status_code, {"error": resp.text[:200]}, {}
+        if resp.status_code == 200:
+            self.fixtures.save(
+                provider, path, query, resp.status_code, body, resp.headers
+            )
+        return resp.status_code, body, dict(resp.headers)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    server: StandInServer
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Any, headers: Dict[str, str] = None) -> int:
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            if k.lower().startswith("x-pagination") or k in ("ETag", "Retry-After"):
+                self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+        return len(payload)
+
+    def _handle(self, method: str) -> None:
+        srv = self.server
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        if url.path == "/_stats":
+            self._send(200, srv.stats.snapshot())
+            return
+        if url.path == "/_reset":
+            srv.stats.reset()
+            srv.world.reset()
+            self._send(200, {"ok": True})
+            return
+
+        provider, _, rest = url.path.lstrip("/").partition("/")
+        path = "/" + rest
+        if provider not in PROVIDERS:
+            self._send(404, {"error": f"unknown provider {provider}"})
+            return
+        route = route_label(method, path)
+        bucket = srv.buckets.get(provider)
+        if bucket and not bucket.allow():
+            size = self._send(429, {"error": "rate limited"}, {"Retry-After": "1"})
+            srv.stats.count(provider, route, 429, size)
+            return
+        if srv.latency.get(provider):
+            time.sleep(srv.latency[provider])
+
+        try:
+            body = json.loads(raw) if raw else None
+            query = parse_qs(url.query, keep_blank_values=True)
+            status, payload, headers = srv.respond(
+                provider, method, path, query, self.headers, body
+            )
+        except Exception as e:
+            status, payload, headers = 500, {"error": str(e)}, {}
+        headers = dict(headers or {})
+        if method == "GET" and status == 200 and "ETag" not in headers:
+            raw = payload if isinstance(payload, bytes) else json.dumps(payload)
+            digest = hashlib.sha1(raw if isinstance(raw, bytes) else raw.encode())
+            headers["ETag"] = f'"{digest.hexdigest()[:16]}"'
+        etag = headers.get("ETag")
+        if status == 200 and etag and self.headers.get("If-None-Match") == etag:
+            status, payload = 304, b""
+        size = self._send(status, payload, headers)
+        srv.stats.count(provider, route, status, size)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(description="SubOrbit provider stand-in server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--per-year", type=int, default=400, help="TMDB movies per year")
+    ap.add_argument("--radarr-size", type=int, default=500)
+    ap.add_argument("--radarr-years", default="2020", help="e.g. 2010-2019")
+    ap.add_argument("--radarr-overlap", type=float, default=0.1)
+    ap.add_argument("--trakt-size", type=int, default=0)
+    ap.add_argument("--latency", default="", help="seconds, e.g. tmdb=0.03,omdb=0.05")
+    ap.add_argument("--limits", default="", help="requests/second, e.g. tmdb=40")
+    ap.add_argument("--fixtures", type=Path, help="recorded responses directory")
+    ap.add_argument(
+        "--record", action="store_true", help="forward fixture misses upstream"
+    )
+    ap.add_argument("--radarr-upstream", default="", help="real Radarr for --record")
+    return ap
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    world = SyntheticWorld(
+        seed=args.seed,
+        per_year=args.per_year,
+        radarr_size=args.radarr_size,
+        radarr_years=parse_range(args.radarr_years),
+        radarr_overlap=args.radarr_overlap,
+        trakt_size=args.trakt_size,
+    )
+    server = StandInServer(
+        (args.host, args.port),
+        world,
+        latency=parse_pairs(args.latency),
+        limits=parse_pairs(args.limits),
+        fixtures=FixtureStore(args.fixtures),
+        record=args.record,
+        radarr_upstream=args.radarr_upstream,
+    )
+    host, port = server.server_address[:2]
+    print(f"READY http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
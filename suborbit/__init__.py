@@ -6,6 +6,10 @@ from .blueprints.core import core_bp
 from .blueprints.trakt import trakt_bp
 from .blueprints.radarr import radarr_bp
 from .blueprints.config_status import config_status_bp
+from .blueprints.metrics import metrics_bp
+from .blueprints.jobs import jobs_bp
+from .blueprints.posters import posters_bp
+from .jobs import job_manager
 
 
 def create_app():
@@ -17,5 +21,11 @@ def create_app():
     app.register_blueprint(trakt_bp)
     app.register_blueprint(radarr_bp)
     app.register_blueprint(config_status_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(posters_bp)
+
+    # Pick up jobs still queued from before a restart
+    job_manager().start()
 
     return app
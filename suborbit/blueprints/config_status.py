@@ -1,19 +1,19 @@
 from flask import Blueprint, jsonify
 from ..config import Config
-import requests, time, os, json
+from ..suborbit_core import HTTP, shared_state
+import time, os, json
 
 config_status_bp = Blueprint("config_status", __name__)
 
-_cache = {"timestamp": 0, "data": None}
-_CACHE_TTL = 300  # 5 minutes
+_CACHE_TTL = 300  # 5 minutes, shared by all web workers
 
 
 @config_status_bp.route("/api/config/status")
 def config_status():
     """Return SubOrbit system info: version + integration health."""
-    now = time.time()
-    if _cache["data"] and now - _cache["timestamp"] < _CACHE_TTL:
-        return jsonify(_cache["data"])
+    cached = shared_state().get("ui", "config_status")
+    if cached:
+        return jsonify(cached)
 
     # --- Base info ---
     version = os.getenv("APP_VERSION", "dev")
@@ -36,7 +36,7 @@ def config_status():
     try:
         if Config.RADARR_API and Config.RADARR_KEY:
             url = f"{Config.RADARR_API.rstrip('/')}/system/status"
-            r = requests.get(url, headers={"X-Api-Key": Config.RADARR_KEY}, timeout=5)
+            r = HTTP.get(url, headers={"X-Api-Key": Config.RADARR_KEY}, timeout=5)
             r.raise_for_status()
             info = r.json()
             data["radarr"] = {
@@ -74,6 +74,5 @@ def config_status():
     ok_count = sum(1 for k, v in data.items() if isinstance(v, dict) and v.get("ok"))
     data["summary"] = f"{ok_count}/4 integrations ready"
 
-    _cache["timestamp"] = now
-    _cache["data"] = data
+    shared_state().set("ui", "config_status", data, ttl=_CACHE_TTL)
     return jsonify(data)
@@ -1,5 +1,6 @@
 from flask import (
     Blueprint,
+    Response,
     render_template,
     request,
     redirect,
@@ -9,13 +10,18 @@ from flask import (
 )
 import threading, time, json, os
 from pathlib import Path
-from ..suborbit_core import main_process, log, LOG_PATH, request_stop, get_tmdb_genres
+from ..jobs import job_manager
+from ..config import Config
+from ..logbuffer import StreamSlots, sse_events
+from ..suborbit_core import (
+    log,
+    LOG_BUFFER,
+    get_tmdb_genres,
+)
 from datetime import datetime, timezone
 
 core_bp = Blueprint("core", __name__)
 
-process_thread = None
-
 
 def parse_genres(raw: str):
     include, exclude = [], []
@@ -44,19 +50,18 @@ def index():
         max_pages=cfg["MAX_DISCOVER_PAGES"],
         min_vote_count=cfg["MIN_VOTE_COUNT"],
         subtitle_lang=cfg["SUBTITLE_LANG"],
+        subtitle_mode=cfg["SUBTITLE_MODE"],
+        discovery=cfg["DISCOVERY"],
+        rank=cfg["RANK_CANDIDATES"],
         default_genres=cfg["DEFAULT_GENRES"],
-        running=(process_thread and process_thread.is_alive()),
+        running=job_manager().counts()["running"] > 0,
     )
 
 
 @core_bp.route("/start", methods=["POST"])
 def start():
-    global process_thread
     cfg = current_app.config
 
-    if process_thread and process_thread.is_alive():
-        return redirect(url_for("core.index"))
-
     # Read submitted form data
     form = request.form
     args = {
@@ -68,19 +73,21 @@ def start():
         "max_movies": int(form.get("max_movies", cfg["MAX_MOVIES_PER_RUN"])),
         "max_pages": int(form.get("max_pages", cfg["MAX_DISCOVER_PAGES"])),
         "subtitle_lang": form.get("subtitle_lang", cfg["SUBTITLE_LANG"]),
+        "subtitle_mode": form.get("subtitle_mode", cfg["SUBTITLE_MODE"]),
+        "discovery": form.get("discovery", cfg["DISCOVERY"]),
         "min_vote_count": int(form.get("min_vote_count", cfg["MIN_VOTE_COUNT"])),
         "randomize": bool(form.get("randomize")),
+        "rank": bool(form.get("rank")),
         "trakt_user": form.get("trakt_user", "").strip() or None,
         "trakt_list": form.get("trakt_list", "").strip() or None,
     }
 
     include, exclude = parse_genres(form.get("genres", ""))
 
-    def run_process():
-        main_process(include_genres=include, exclude_genres=exclude, **args)
-
-    process_thread = threading.Thread(target=run_process, daemon=True)
-    process_thread.start()
+    # Queued behind any run in progress
+    job_manager().submit(
+        dict(args, include_genres=include, exclude_genres=exclude), name="ui"
+    )
     time.sleep(1)
 
     return redirect(url_for("core.index"))
@@ -88,13 +95,22 @@ def start():
 
 @core_bp.route("/stop", methods=["POST"])
 def stop():
-    request_stop()
+    """Stop the running job(s); queued runs start next."""
+    job_manager().cancel_running()
+    return redirect(url_for("core.index"))
+
+
+@core_bp.route("/queue/clear", methods=["POST"])
+def clear_queue():
+    """Drop the runs still waiting in the queue."""
+    job_manager().clear_queue()
     return redirect(url_for("core.index"))
 
 
 @core_bp.route("/status")
 def status():
-    return jsonify({"running": (process_thread and process_thread.is_alive())})
+    counts = job_manager().counts()
+    return jsonify({"running": counts["running"] > 0, "queued": counts["queued"]})
 
 
 @core_bp.route("/genres")
@@ -102,12 +118,59 @@ def genres():
     return jsonify(get_tmdb_genres())
 
 
+LOG_BACKLOG = 200  # lines sent to a client that connects mid-run
+SSE_KEEPALIVE = 15  # seconds between keep-alive comments
+# Shared by /logs/stream and the job log streams: each holds a thread
+SSE_STREAMS = StreamSlots(Config.SSE_MAX_STREAMS)
+
+
+def event_stream(events) -> Response:
+    """An SSE response, or 503 once every stream slot is taken (clients poll)."""
+    stream = SSE_STREAMS.open(events)
+    if stream is None:
+        events.close()
+        return Response(
+            "too many log streams, poll /logs instead\n",
+            status=503,
+            mimetype="text/plain",
+            headers={"Retry-After": str(int(Config.SSE_MAX_AGE) or 60)},
+        )
+    return Response(
+        stream,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @core_bp.route("/logs")
 def logs():
-    if LOG_PATH.exists():
-        with LOG_PATH.open("r", encoding="utf-8") as f:
-            return jsonify(f.readlines()[-200:])
-    return jsonify([])
+    """
+    Without `after`: the last 200 lines, as before.
+    With `after=<cursor>`: only newer records, plus the cursor to send next
+    time and whether the client must clear its view (new run).
+    """
+    after = request.args.get("after", type=int)
+    if after is None:
+        records, _, _ = LOG_BUFFER.since(0, LOG_BACKLOG)
+        return jsonify([r["msg"] + "\n" for r in records])
+    records, reset, cursor = LOG_BUFFER.since(after, LOG_BACKLOG)
+    return jsonify({"records": records, "cursor": cursor, "reset": reset})
+
+
+@core_bp.route("/logs/stream")
+def logs_stream():
+    """
+    Server-sent events: pushes each new log record as it is written.
+    Reconnecting browsers resume from Last-Event-ID; an idle stream only
+    sends keep-alive comments. Streams end after SSE_MAX_AGE (the browser
+    reconnects) and past SSE_MAX_STREAMS the answer is a 503.
+    """
+    cursor = request.headers.get("Last-Event-ID", type=int)
+    if cursor is None:
+        cursor = request.args.get("after", 0, type=int)
+    return event_stream(
+        sse_events(LOG_BUFFER, cursor, LOG_BACKLOG, SSE_KEEPALIVE, Config.SSE_MAX_AGE)
+    )
 
 
 @core_bp.route("/healthz")
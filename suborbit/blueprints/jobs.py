@@ -0,0 +1,113 @@
+from flask import Blueprint, jsonify, request
+from ..jobs import clean_params, job_manager
+from ..config import Config
+from .core import LOG_BACKLOG, SSE_KEEPALIVE, event_stream, parse_genres
+
+jobs_bp = Blueprint("jobs", __name__, url_prefix="/api/jobs")
+
+
+def _job_params(data: dict) -> dict:
+    """Accept the UI's "genres" string ("drama,!horror") as well."""
+    params = dict(data)
+    params.pop("name", None)
+    if "genres" in params:
+        include, exclude = parse_genres(params.pop("genres") or "")
+        params.setdefault("include_genres", include)
+        params.setdefault("exclude_genres", exclude)
+    return params
+
+
+@jobs_bp.route("", methods=["GET"])
+def list_jobs():
+    """Recent jobs, newest first (?status=queued|running|done|failed|cancelled)."""
+    jobs = job_manager().list(
+        request.args.get("status"), request.args.get("limit", 100, type=int)
+    )
+    return jsonify(jobs)
+
+
+@jobs_bp.route("", methods=["DELETE"])
+def clear_jobs():
+    """Cancel every queued job (running ones keep going)."""
+    return jsonify({"cancelled": job_manager().clear_queue()})
+
+
+@jobs_bp.route("", methods=["POST"])
+def submit_jobs():
+    """
+    Queue one run (a JSON object of main_process parameters plus an
+    optional "name") or a batch (a JSON list of them).
+    """
+    data = request.get_json(silent=True)
+    batch = data if isinstance(data, list) else [data]
+    if not batch or not all(isinstance(d, dict) for d in batch):
+        return jsonify({"error": "expected a JSON object or list of objects"}), 400
+    try:
+        # Validate the whole batch before queueing any of it
+        params = [clean_params(_job_params(d)) for d in batch]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    jobs = [job_manager().submit(p, name=d.get("name")) for p, d in zip(params, batch)]
+    return jsonify(jobs if isinstance(data, list) else jobs[0]), 201
+
+
+@jobs_bp.route("/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_manager().get(job_id)
+    if not job:
+        return jsonify({"error": "not found"}), 404
+    return jsonify(job)
+
+
+@jobs_bp.route("/<job_id>", methods=["DELETE"])
+@jobs_bp.route("/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    if not job_manager().cancel(job_id):
+        return jsonify({"error": "not queued or running"}), 409
+    return jsonify(job_manager().get(job_id))
+
+
+@jobs_bp.route("/<job_id>/resume", methods=["POST"])
+def resume_job(job_id):
+    """Requeue a cancelled or failed job; it picks up from its checkpoint."""
+    if not job_manager().resume(job_id):
+        return jsonify({"error": "not cancelled or failed"}), 409
+    return jsonify(job_manager().get(job_id))
+
+
+@jobs_bp.route("/<job_id>/logs")
+def job_logs(job_id):
+    """Cursor-based log of a job, from whichever worker runs it."""
+    job = job_manager().get(job_id)
+    if not job:
+        return jsonify({"error": "not found"}), 404
+    records, reset, cursor = job_manager().log_since(
+        job_id, request.args.get("after", 0, type=int)
+    )
+    if not records and not request.args.get("after") and job["log_tail"]:
+        # Finished before its log was mirrored (jobs from older versions)
+        records = [{"msg": l} for l in job["log_tail"]]
+    return jsonify(
+        {
+            "records": records,
+            "cursor": cursor,
+            "reset": reset,
+            "finished": job["status"] not in ("queued", "running"),
+        }
+    )
+
+
+@jobs_bp.route("/<job_id>/logs/stream")
+def job_logs_stream(job_id):
+    """Server-sent events for one running job's log."""
+    job = job_manager().get(job_id)
+    if not job or job["status"] != "running":
+        return jsonify({"error": "job is not running"}), 404
+    cursor = request.headers.get("Last-Event-ID", type=int)
+    if cursor is None:
+        cursor = request.args.get("after", 0, type=int)
+    return event_stream(
+        job_manager().log_events(
+            job_id, cursor, LOG_BACKLOG, SSE_KEEPALIVE, Config.SSE_MAX_AGE
+        )
+    )
@@ -0,0 +1,17 @@
+from flask import Blueprint, Response, jsonify
+from ..jobs import job_manager
+from ..suborbit_core import collect_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    """Prometheus scrape endpoint (providers, cache, rate limits, pipeline)."""
+    return Response(collect_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+@metrics_bp.route("/api/run/summary")
+def summary():
+    """Timing/counts for the current or last run, incl. the slowest provider."""
+    return jsonify(job_manager().latest_summary())
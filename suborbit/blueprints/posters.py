@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify, send_file
+from ..config import Config
+from ..suborbit_core import POSTERS, poster_file
+
+posters_bp = Blueprint("posters", __name__, url_prefix="/api/posters")
+
+
+@posters_bp.route("/<int:tmdb_id>")
+def poster(tmdb_id):
+    """Thumbnail of a movie in the Radarr library, cached on disk."""
+    path = poster_file(tmdb_id)
+    if not path:
+        return jsonify({"error": "no poster"}), 404
+    try:
+        # ETag from the file's mtime and size; If-None-Match answers 304
+        return send_file(
+            path,
+            mimetype="image/jpeg",
+            conditional=True,
+            etag=True,
+            max_age=Config.POSTER_MAX_AGE,
+        )
+    except FileNotFoundError:  # evicted in the meantime
+        return jsonify({"error": "no poster"}), 404
+
+
+@posters_bp.route("/clear", methods=["POST"])
+def clear_posters():
+    """Drop every cached thumbnail (they are fetched again on demand)."""
+    POSTERS.clear()
+    return jsonify({"status": "cleared"})
@@ -1,14 +1,12 @@
-from flask import Blueprint, jsonify
-import requests, time
+from flask import Blueprint, Response, jsonify, request
+import hashlib, json, threading, time
 from urllib.parse import urlparse
 from ..config import Config
+from ..suborbit_core import HTTP, RADARR_LIBRARY, mark_radarr_updated, shared_state
 
 radarr_bp = Blueprint("radarr", __name__)
 
-_cache_recent = {"timestamp": 0, "data": None}
-_cache_status = {"timestamp": 0, "data": None}
-_CACHE_TTL = 600
-_STATUS_TTL = 300
+_STATUS_TTL = 300  # shared by all web workers
 
 
 # ------------------------------------------------------------
@@ -62,9 +60,9 @@ validate_radarr_config()
 
 def fetch_status():
     """Fetch and cache /system/status from Radarr."""
-    now = time.time()
-    if _cache_status["data"] and now - _cache_status["timestamp"] < _STATUS_TTL:
-        return _cache_status["data"], None
+    cached = shared_state().get("ui", "radarr_status")
+    if cached:
+        return cached, None
 
     api_url = Config.RADARR_API.rstrip("/")
     api_key = Config.RADARR_KEY
@@ -72,13 +70,12 @@ def fetch_status():
         return None, ("Radarr not configured", 400)
 
     try:
-        r = requests.get(
+        r = HTTP.get(
             f"{api_url}/system/status", headers={"X-Api-Key": api_key}, timeout=8
         )
         r.raise_for_status()
         data = r.json()
-        _cache_status["timestamp"] = now
-        _cache_status["data"] = data
+        shared_state().set("ui", "radarr_status", data, ttl=_STATUS_TTL)
         return data, None
     except Exception as e:
         return None, (f"Failed to reach Radarr: {e}", 500)
@@ -124,96 +121,117 @@ def status():
     )
 
 
+def _recent_entry(m: dict, ui_base: str) -> dict:
+    """Carousel card for one slim Radarr movie."""
+    tmdb_id = m.get("tmdbId")
+    imdb_id = m.get("imdbId")
+    radarr_id = m.get("id")
+
+    # Poster (a cached thumbnail served by /api/posters)
+    img = ""
+    for i in m.get("images", []):
+        if i.get("coverType") == "poster":
+            path = i.get("remoteUrl") or i.get("url")
+            if path and tmdb_id:
+                img = f"/api/posters/{tmdb_id}"
+            elif path:
+                img = path if path.startswith("http") else f"{ui_base}{path}"
+            if img:
+                break
+
+    # Ratings
+    rating = None
+    ratings = m.get("ratings") or {}
+    if "imdb" in ratings and ratings["imdb"].get("value"):
+        rating = ratings["imdb"]["value"]
+    elif "tmdb" in ratings and ratings["tmdb"].get("value"):
+        rating = ratings["tmdb"]["value"]
+    elif ratings.get("value"):
+        rating = ratings["value"]
+
+    radarr_url = (
+        f"{ui_base}/movie/{tmdb_id or radarr_id}" if (tmdb_id or radarr_id) else None
+    )
+    tmdb_url = f"https://www.themoviedb.org/movie/{tmdb_id}" if tmdb_id else None
+    imdb_url = f"https://www.imdb.com/title/{imdb_id}" if imdb_id else None
+    trakt_url = f"https://trakt.tv/movies/{imdb_id}" if imdb_id else None
+
+    return {
+        "title": m.get("title"),
+        "year": m.get("year"),
+        "rating": rating,
+        "poster": img,
+        "overview": m.get("overview", ""),
+        "radarr": radarr_url,
+        "tmdb": tmdb_url,
+        "imdb": imdb_url,
+        "trakt": trakt_url,
+    }
+
+
+# Rendered carousel, rebuilt only when the library's newest additions change
+# (or the Radarr UI base may have: it comes from the TTL'd status)
+_recent_view = {"generation": -1, "built_at": 0.0, "entries": [], "etag": ""}
+_recent_lock = threading.Lock()
+
+
+def recent_entries():
+    """All kept recent additions as cards, plus an ETag for them."""
+    with _recent_lock:
+        view = _recent_view
+        stale = time.time() - view["built_at"] >= _STATUS_TTL
+        if view["generation"] != RADARR_LIBRARY.generation or stale:
+            generation = RADARR_LIBRARY.generation
+            movies, _ = RADARR_LIBRARY.recent(0, RADARR_LIBRARY.recent_size)
+            ui_base = get_radarr_ui_base()
+            entries = [_recent_entry(m, ui_base) for m in movies]
+            digest = hashlib.sha1(
+                json.dumps(entries, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            view.update(
+                generation=generation,
+                built_at=time.time(),
+                entries=entries,
+                etag=f'"{digest[:16]}"',
+            )
+        return view["entries"], view["etag"]
+
+
 @radarr_bp.route("/api/radarr/recent")
 def recent():
-    """Return recently added movies (cached 10 min)."""
-    now = time.time()
-    # if _cache_recent["data"] and now - _cache_recent["timestamp"] < _CACHE_TTL:
-    #     return jsonify(_cache_recent["data"])
-
+    """
+    Recently added movies, newest first (?offset=&limit=, default 10).
+    X-Total-Count gives how many are kept; an If-None-Match matching the
+    ETag gets a 304, so polling clients only download changes.
+    """
     api_url = Config.RADARR_API.rstrip("/")
     api_key = Config.RADARR_KEY
     if not api_url or not api_key:
         return jsonify({"error": "Radarr not configured"}), 400
 
-    try:
-        r = requests.get(f"{api_url}/movie", headers={"X-Api-Key": api_key}, timeout=10)
-        r.raise_for_status()
-        movies = r.json()
-    except Exception as e:
-        return jsonify({"error": f"Failed to reach Radarr: {e}"}), 500
-
-    movies = sorted(movies, key=lambda m: m.get("added", ""), reverse=True)
-    ui_base = get_radarr_ui_base()
-
-    recent = []
-    for m in movies[:10]:
-        # Poster
-        img = ""
-        for i in m.get("images", []):
-            if i.get("coverType") == "poster":
-                path = i.get("remoteUrl") or i.get("url")
-                if path:
-                    img = path if path.startswith("http") else f"{ui_base}{path}"
-                    break
-
-        # Ratings
-        rating = None
-        ratings = m.get("ratings") or {}
-        if "imdb" in ratings and ratings["imdb"].get("value"):
-            rating = ratings["imdb"]["value"]
-        elif "tmdb" in ratings and ratings["tmdb"].get("value"):
-            rating = ratings["tmdb"]["value"]
-        elif ratings.get("value"):
-            rating = ratings["value"]
-
-        tmdb_id = m.get("tmdbId")
-        imdb_id = m.get("imdbId")
-        radarr_id = m.get("id")
-
-        radarr_url = (
-            f"{ui_base}/movie/{tmdb_id or radarr_id}"
-            if (tmdb_id or radarr_id)
-            else None
-        )
-        tmdb_url = f"https://www.themoviedb.org/movie/{tmdb_id}" if tmdb_id else None
-        imdb_url = f"https://www.imdb.com/title/{imdb_id}" if imdb_id else None
-        trakt_url = f"https://trakt.tv/movies/{imdb_id}" if imdb_id else None
-
-        recent.append(
-            {
-                "title": m.get("title"),
-                "year": m.get("year"),
-                "rating": rating,
-                "poster": img,
-                "overview": m.get("overview", ""),
-                "radarr": radarr_url,
-                "tmdb": tmdb_url,
-                "imdb": imdb_url,
-                "trakt": trakt_url,
-            }
-        )
+    # Shared library snapshot (TTL'd, updated incrementally by radarr_add)
+    if not RADARR_LIBRARY.refresh() and not RADARR_LIBRARY.loaded:
+        return jsonify({"error": "Failed to reach Radarr"}), 500
 
-    _cache_recent["timestamp"] = now
-    _cache_recent["data"] = recent
-    return jsonify(recent)
+    entries, etag = recent_entries()
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = min(max(1, request.args.get("limit", 10, type=int)), len(entries))
+    etag = f'{etag[:-1]}-{offset}-{limit}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status=304, headers=headers)
+    resp = jsonify(entries[offset : offset + limit])
+    resp.headers.update(headers, **{"X-Total-Count": str(len(entries))})
+    return resp
 
 
 @radarr_bp.route("/api/radarr/refresh", methods=["POST"])
 def refresh_cache():
     """Manually clear Radarr poster cache."""
-    global _cache_recent
-    _cache_recent = {"timestamp": 0, "data": None}
+    RADARR_LIBRARY.invalidate()
     return jsonify({"status": "cleared"})
 
 
-_refresh_flag = {"recent_update": False}
-
-
-def mark_radarr_updated():
-    _refresh_flag["recent_update"] = True
-
-
 @radarr_bp.route("/api/radarr/mark_updated", methods=["POST"])
 def mark_updated():
     """Manually mark Radarr cache for refresh (optional external trigger)."""
@@ -224,6 +242,4 @@ def mark_updated():
 @radarr_bp.route("/api/radarr/check_update")
 def check_update():
     """Return whether carousel should refresh."""
-    val = _refresh_flag["recent_update"]
-    _refresh_flag["recent_update"] = False
-    return jsonify({"update": val})
+    return jsonify({"update": RADARR_LIBRARY.pop_updated()})
@@ -1,24 +1,29 @@
 from flask import Blueprint, jsonify
-import requests, threading, time, os, json
+import threading, time, os, json
 from pathlib import Path
-from ..suborbit_core import log
+from ..config import Config
+from ..suborbit_core import HTTP, log, shared_state
 
 trakt_bp = Blueprint("trakt", __name__, url_prefix="/trakt")
-trakt_state = {"state": "idle"}
+
+
+def set_device_state(state: str) -> None:
+    """Device auth progress, visible to every web worker."""
+    shared_state().set("trakt", "device_state", state)
 
 
 @trakt_bp.route("/device")
 def trakt_device():
-    trakt_state["state"] = "waiting"
-    url = "https://api.trakt.tv/oauth/device/code"
+    set_device_state("waiting")
+    url = f"{Config.TRAKT_API_URL}/oauth/device/code"
     headers = {"Content-Type": "application/json"}
     data = {"client_id": os.getenv("TRAKT_CLIENT_ID")}
 
-    r = requests.post(url, json=data, headers=headers)
+    r = HTTP.post(url, json=data, headers=headers, timeout=10)
     device_info = r.json()
 
     def poll_for_token():
-        token_url = "https://api.trakt.tv/oauth/device/token"
+        token_url = f"{Config.TRAKT_API_URL}/oauth/device/token"
         payload = {
             "client_id": os.getenv("TRAKT_CLIENT_ID"),
             "client_secret": os.getenv("TRAKT_CLIENT_SECRET"),
@@ -26,15 +31,15 @@ def trakt_device():
         }
         for _ in range(60):
             time.sleep(device_info.get("interval", 5))
-            resp = requests.post(token_url, json=payload, headers=headers)
+            resp = HTTP.post(token_url, json=payload, headers=headers, timeout=10)
             if resp.status_code == 200:
                 tokens = resp.json()
                 with open("trakt_token.json", "w", encoding="utf-8") as f:
                     json.dump(tokens, f, indent=2)
                 log("✅ Trakt authenticated successfully!")
-                trakt_state["state"] = "done"
+                set_device_state("done")
                 return
-        trakt_state["state"] = "error"
+        set_device_state("error")
         log("⚠️ Trakt auth timed out.")
 
     threading.Thread(target=poll_for_token, daemon=True).start()
@@ -45,7 +50,12 @@ def trakt_device():
 def trakt_status_route():
     token_file = Path("trakt_token.json")
     if not token_file.exists():
-        return jsonify({"authenticated": False, "state": trakt_state["state"]})
+        return jsonify(
+            {
+                "authenticated": False,
+                "state": shared_state().get("trakt", "device_state", "idle"),
+            }
+        )
 
     try:
         data = json.loads(token_file.read_text())
@@ -0,0 +1,296 @@
+# cache.py
+# Provider metadata cache: (namespace, key) -> JSON value with per-namespace TTLs
+
+import json, sqlite3, threading, time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_MISSING = object()
+
+
+class BaseCache:
+    """
+    Common interface for cache backends.
+    Values must be JSON-serializable. `ttls` maps namespace -> seconds
+    (0 or missing = never expires); `max_entries` bounds the total size,
+    evicting least recently used rows first.
+    """
+
+    def __init__(self, ttls: Dict[str, int] = None, max_entries: int = 0) -> None:
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.hits: Counter = Counter()  # per namespace
+        self.misses: Counter = Counter()
+
+    def _expiry(self, namespace: str, ttl: Optional[int]) -> Optional[float]:
+        ttl = self.ttls.get(namespace, 0) if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: int = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    def pop(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Atomically read and remove a value."""
+        raise NotImplementedError
+
+    def clear(self, namespace: str = None) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+        }
+
+
+class MemoryCache(BaseCache):
+    """Process-local LRU cache (used when no database is wanted)."""
+
+    def __init__(self, ttls: Dict[str, int] = None, max_entries: int = 0) -> None:
+        super().__init__(ttls, max_entries)
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key, default=None):
+        k = (namespace, str(key))
+        with self._lock:
+            entry = self._data.get(k, _MISSING)
+            if entry is _MISSING or (entry[1] and entry[1] < time.time()):
+                if entry is not _MISSING:
+                    del self._data[k]
+                self.misses[namespace] += 1
+                return default
+            self._data.move_to_end(k)
+            self.hits[namespace] += 1
+            return entry[0]
+
+    def set(self, namespace, key, value, ttl=None):
+        k = (namespace, str(key))
+        with self._lock:
+            self._data[k] = (value, self._expiry(namespace, ttl))
+            self._data.move_to_end(k)
+            while self.max_entries and len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.pop((namespace, str(key)), None)
+
+    def pop(self, namespace, key, default=None):
+        with self._lock:
+            entry = self._data.pop((namespace, str(key)), None)
+        if entry is None or (entry[1] and entry[1] < time.time()):
+            return default
+        return entry[0]
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+            else:
+                for k in [k for k in self._data if k[0] == namespace]:
+                    del self._data[k]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache(BaseCache):
+    """
+    SQLite-backed cache. Every set() is a single-row upsert, so nothing is
+    lost if the process dies mid-run. Access times are only rewritten when
+    older than TOUCH_INTERVAL to keep reads cheap.
+    """
+
+    TOUCH_INTERVAL = 3600
+    EVICT_EVERY = 500  # writes between size checks
+
+    def __init__(
+        self, path: Path, ttls: Dict[str, int] = None, max_entries: int = 0
+    ) -> None:
+        super().__init__(ttls, max_entries)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace   TEXT NOT NULL,
+                key         TEXT NOT NULL,
+                value       TEXT NOT NULL,
+                expires_at  REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+            """)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)"
+        )
+        self.purge_expired()
+
+    def get(self, namespace, key, default=None):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at, accessed_at FROM cache "
+                "WHERE namespace = ? AND key = ?",
+                (namespace, str(key)),
+            ).fetchone()
+            if row is None or (row[1] and row[1] < now):
+                if row is not None:
+                    self._db.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                        (namespace, str(key)),
+                    )
+                self.misses[namespace] += 1
+                return default
+            if now - row[2] > self.TOUCH_INTERVAL:
+                self._db.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, str(key)),
+                )
+            self.hits[namespace] += 1
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return default
+
+    def set(self, namespace, key, value, ttl=None):
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO cache (namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET "
+                "value = excluded.value, expires_at = excluded.expires_at, "
+                "accessed_at = excluded.accessed_at",
+                (
+                    namespace,
+                    str(key),
+                    payload,
+                    self._expiry(namespace, ttl),
+                    time.time(),
+                ),
+            )
+            self._writes += 1
+            if self.max_entries and self._writes % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used rows above max_entries (lock held)."""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM cache WHERE (namespace, key) IN ("
+                "SELECT namespace, key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),),
+            )
+            if self.max_entries:
+                self._evict()
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, str(key)),
+            )
+
+    def pop(self, namespace, key, default=None):
+        # BEGIN IMMEDIATE takes the write lock, so only one process gets it
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM cache "
+                    "WHERE namespace = ? AND key = ?",
+                    (namespace, str(key)),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                        (namespace, str(key)),
+                    )
+            finally:
+                self._db.execute("COMMIT")
+        if row is None or (row[1] and row[1] < time.time()):
+            return default
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return default
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._db.execute("DELETE FROM cache")
+            else:
+                self._db.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def create_cache(
+    backend: str, path: Path, ttls: Dict[str, int] = None, max_entries: int = 0
+) -> BaseCache:
+    """Build the configured cache backend ('sqlite' or 'memory')."""
+    if backend == "memory":
+        return MemoryCache(ttls, max_entries)
+    if backend == "sqlite":
+        return SQLiteCache(path, ttls, max_entries)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+def import_json_cache(cache: BaseCache, json_path: Path) -> int:
+    """
+    One-time migration of the legacy cache.json ("omdb:<imdb_id>" entries).
+    The file is renamed afterwards so it is not parsed again.
+    """
+    json_path = Path(json_path)
+    if not json_path.exists():
+        return 0
+    try:
+        with json_path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        data = {}
+    count = 0
+    for k, v in data.items():
+        namespace, _, key = k.partition(":")
+        if key:
+            cache.set(namespace, key, v)
+            count += 1
+    json_path.rename(json_path.with_suffix(".json.migrated"))
+    return count
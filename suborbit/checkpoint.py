@@ -0,0 +1,113 @@
+# checkpoint.py
+# Run checkpoints: how far a run got and which movies it already decided,
+# saved under /config/checkpoints so a stopped or crashed run can resume
+
+import json, os, time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+def _normalized(params: Dict[str, Any]) -> Dict[str, Any]:
+    return json.loads(json.dumps(params, default=str))
+
+
+class Checkpoint:
+    """
+    Cursor and decisions of one run. `cursor` is the [year, page] of
+    discovery every earlier candidate was decided by; `processed` holds
+    the tmdb ids decided since. Accepted movies still waiting for Radarr
+    are `hold()`-ed: the saved cursor never passes the oldest of them, so
+    a resume evaluates them again. Written atomically (temp file +
+    rename), at most every `interval` seconds unless forced.
+    """
+
+    def __init__(self, path: Path, params: Dict[str, Any], interval: float = 30):
+        self.path = Path(path)
+        self.params = _normalized(params)
+        self.interval = interval
+        self.cursor: Optional[list] = None
+        self.processed: set = set()
+        self.held: Dict[Any, Optional[list]] = {}  # tmdb_id -> cursor
+        self.added = 0
+        self.evaluated = 0
+        self.rejections: Dict[str, int] = {}
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def load(
+        cls, path: Path, params: Dict[str, Any], interval: float = 30
+    ) -> Optional["Checkpoint"]:
+        """The saved checkpoint, or None if missing, unreadable or for other params."""
+        try:
+            with Path(path).open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        ckpt = cls(path, params, interval)
+        if data.get("params") != ckpt.params:
+            return None
+        ckpt.cursor = data.get("cursor")
+        ckpt.processed = set(data.get("processed") or [])
+        ckpt.added = data.get("added", 0)
+        ckpt.evaluated = data.get("evaluated", 0)
+        ckpt.rejections = data.get("rejections") or {}
+        return ckpt
+
+    def skip(self, tmdb_id: Any) -> bool:
+        return tmdb_id in self.processed
+
+    def hold(self, tmdb_id: Any, cursor: Iterable[int] = None) -> None:
+        """Accepted but not decided yet (waiting in a Radarr batch)."""
+        if tmdb_id:
+            self.held[tmdb_id] = list(cursor) if cursor else None
+
+    def decide(self, tmdb_id: Any, cursor: Iterable[int] = None) -> None:
+        if tmdb_id:
+            self.processed.add(tmdb_id)
+            self.held.pop(tmdb_id, None)
+        # Decisions arrive out of order (batched adds): only move forward
+        if cursor and (self.cursor is None or list(cursor) > self.cursor):
+            self.cursor = list(cursor)
+
+    def resume_cursor(self) -> Optional[list]:
+        """The cursor to save: not past any movie still held."""
+        held = [c for c in self.held.values() if c]
+        if not held or self.cursor is None:
+            return self.cursor
+        return min(self.cursor, *held)
+
+    def save(
+        self,
+        added: int,
+        evaluated: int,
+        rejections: Dict[str, int],
+        force: bool = False,
+    ) -> bool:
+        """Write the checkpoint if `interval` has passed (or forced)."""
+        if not force and time.monotonic() - self._saved_at < self.interval:
+            return False
+        self.added, self.evaluated = added, evaluated
+        self.rejections = dict(rejections)
+        data = {
+            "params": self.params,
+            "cursor": self.resume_cursor(),
+            "processed": sorted(self.processed),
+            "added": self.added,
+            "evaluated": self.evaluated,
+            "rejections": self.rejections,
+            "saved_at": time.time(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self._saved_at = time.monotonic()
+        return True
+
+    def discard(self) -> None:
+        """The run completed: nothing left to resume."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -23,6 +23,12 @@ class Config:
     RADARR_KEY = os.getenv("RADARR_KEY", "")
     RADARR_HOST = os.getenv("RADARR_HOST", "")
 
+    # ===== PROVIDER ENDPOINTS (override for proxies or offline benchmarks) =====
+    TMDB_API_URL = os.getenv("TMDB_API_URL", "https://api.themoviedb.org/3")
+    OMDB_API_URL = os.getenv("OMDB_API_URL", "http://www.omdbapi.com/")
+    OS_API_URL = os.getenv("OS_API_URL", "https://api.opensubtitles.com/api/v1")
+    TRAKT_API_URL = os.getenv("TRAKT_API_URL", "https://api.trakt.tv")
+
     # ===== YEAR RANGE =====
     START_YEAR = int(os.getenv("START_YEAR", 2020))
     END_YEAR = int(os.getenv("END_YEAR", 2020))
@@ -40,21 +46,99 @@ class Config:
     QUALITY_PROFILE_ID = int(os.getenv("QUALITY_PROFILE_ID", 1))
     ROOT_FOLDER = os.getenv("ROOT_FOLDER", "/movies")
     SEARCH_FOR_MOVIE = os.getenv("SEARCH_FOR_MOVIE", "false").lower() == "true"
+    # accepted movies sent per /movie/import call (1 = one POST /movie each)
+    RADARR_BATCH_SIZE = int(os.getenv("RADARR_BATCH_SIZE", 10))
+    RADARR_BATCH_WAIT = float(os.getenv("RADARR_BATCH_WAIT", 60))  # max seconds held
+    RADARR_LIBRARY_TTL = int(
+        os.getenv("RADARR_LIBRARY_TTL", 600)
+    )  # seconds to reuse the /movie snapshot
+    RADARR_RECENT_SIZE = int(os.getenv("RADARR_RECENT_SIZE", 50))  # carousel depth
+
+    # ===== POSTERS =====
+    POSTER_WIDTH = int(os.getenv("POSTER_WIDTH", 300))  # thumbnail width in pixels
+    POSTER_CACHE_MB = int(os.getenv("POSTER_CACHE_MB", 200))  # disk budget
+    POSTER_MAX_AGE = int(os.getenv("POSTER_MAX_AGE", 30 * 86400))  # browser cache
+    POSTER_PREWARM = os.getenv("POSTER_PREWARM", "true").lower() == "true"
 
     # ===== SCRIPT SETTINGS =====
-    MAX_WORKERS = int(os.getenv("MAX_WORKERS", 5))  # unused if sequential
+    MAX_WORKERS = int(os.getenv("MAX_WORKERS", 5))  # parallel candidate lookups
     QUIET_MODE = os.getenv("QUIET_MODE", "false").lower() == "true"
     DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    LOG_BUFFER_LINES = int(os.getenv("LOG_BUFFER_LINES", 2000))  # kept for the UI
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 1.0))  # seconds
+    # live log streams each hold a web thread: cap them, and end each after
+    # SSE_MAX_AGE seconds (browsers reconnect; over the cap they poll)
+    SSE_MAX_STREAMS = int(os.getenv("SSE_MAX_STREAMS", 8))
+    SSE_MAX_AGE = float(os.getenv("SSE_MAX_AGE", 300))
 
     MAX_MOVIES_PER_RUN = int(os.getenv("MAX_MOVIES_PER_RUN", 10))
     OS_DELAY = int(os.getenv("OS_DELAY", 3))  # seconds between OpenSubtitles calls
     RANDOM_SELECTION = os.getenv("RANDOM_SELECTION", "false").lower() == "true"
 
+    # ===== JOBS =====
+    JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", 1))  # runs at the same time
+    JOB_HISTORY = int(os.getenv("JOB_HISTORY", 100))  # finished jobs kept
+    JOB_HEARTBEAT = float(os.getenv("JOB_HEARTBEAT", 2.0))  # seconds between syncs
+    JOB_STALE_AFTER = int(
+        os.getenv("JOB_STALE_AFTER", 60)
+    )  # dead worker's job requeued
+    # gunicorn's own worker count variable; >1 shares the UI log via the file
+    WEB_WORKERS = int(os.getenv("WEB_CONCURRENCY", 1))
+    CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", 30))  # seconds
+
+    # ===== PROVIDER RATE LIMITS (requests/second, 0 = unlimited) =====
+    TMDB_RATE = float(os.getenv("TMDB_RATE", 20))
+    OMDB_RATE = float(os.getenv("OMDB_RATE", 5))
+    OS_RATE = float(os.getenv("OS_RATE") or (1 / OS_DELAY if OS_DELAY > 0 else 0))
+    TRAKT_RATE = float(os.getenv("TRAKT_RATE", 3))  # Trakt allows 1000 GETs / 5 min
+    # max concurrent in-flight requests per provider
+    TMDB_WORKERS = int(os.getenv("TMDB_WORKERS", MAX_WORKERS))
+    OMDB_WORKERS = int(os.getenv("OMDB_WORKERS", 2))
+    OS_WORKERS = int(os.getenv("OS_WORKERS", 1))
+
+    # ===== HTTP CLIENT =====
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+    HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 1.0))  # seconds, doubles per retry
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))  # keep-alive conns per host
+    # per-host concurrent requests, e.g. "api.themoviedb.org=8,www.omdbapi.com=2"
+    HTTP_HOST_CONCURRENCY = os.getenv("HTTP_HOST_CONCURRENCY", "")
+
     # ===== EXTRA FILTERS =====
     MIN_VOTE_COUNT = int(os.getenv("MIN_VOTE_COUNT", 0))
     MAX_DISCOVER_PAGES = int(os.getenv("MAX_DISCOVER_PAGES", 3))  # TMDb pages to parse
+    DISCOVER_PREFETCH = int(os.getenv("DISCOVER_PREFETCH", 4))  # pages fetched ahead
     ALLOWED_LANGUAGES = [
         l.strip() for l in os.getenv("ALLOWED_LANGUAGES", "").split(",") if l.strip()
     ]
-    SUBTITLE_LANG = os.getenv("SUBTITLE_LANG", "fi")
+    SUBTITLE_LANG = os.getenv("SUBTITLE_LANG", "fi")  # one code or a list: fi,sv
+    SUBTITLE_MODE = os.getenv("SUBTITLE_MODE", "any").lower()  # any | all | ranked
+    # quality score (0-100) subtitles need to count; 0 = any upload will do
+    SUBTITLE_MIN_SCORE = float(os.getenv("SUBTITLE_MIN_SCORE", 25))
+    DISCOVERY = os.getenv("DISCOVERY", "tmdb").lower()  # tmdb | subtitles
+    # subtitle-first listing order: download_count (popular) | upload_date (latest)
+    SUBTITLE_FEED_ORDER = os.getenv("SUBTITLE_FEED_ORDER", "download_count")
+    # rank all discovered movies by a weighted score before evaluating any
+    RANK_CANDIDATES = os.getenv("RANK_CANDIDATES", "false").lower() == "true"
+    RANK_WEIGHTS = os.getenv(
+        "RANK_WEIGHTS", "tmdb=0.3,imdb=0.3,rt=0.1,votes=0.2,recency=0.1"
+    )
+    TRAKT_PAGE_SIZE = int(os.getenv("TRAKT_PAGE_SIZE", 100))  # list items per request
+    TRAKT_SAMPLE_SIZE = int(os.getenv("TRAKT_SAMPLE_SIZE", 1000))  # randomized lists
     DEFAULT_GENRES = os.getenv("ALLOWED_GENRES", "")
+
+    # ===== CACHE =====
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")  # sqlite | memory
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 200000))
+    # per-namespace TTLs in seconds (0 = never expires)
+    CACHE_TTL_TMDB = int(os.getenv("CACHE_TTL_TMDB", 7 * 86400))
+    CACHE_TTL_OMDB = int(os.getenv("CACHE_TTL_OMDB", 30 * 86400))
+    CACHE_TTL_OS_FOUND = int(os.getenv("CACHE_TTL_OS_FOUND", 7 * 86400))
+    CACHE_TTL_OS_MISSING = int(os.getenv("CACHE_TTL_OS_MISSING", 21 * 86400))
+    CACHE_TTL_TRAKT = int(os.getenv("CACHE_TTL_TRAKT", 3600))
+    # how long a rejection is trusted by later runs (0 = always re-evaluate)
+    DECISION_TTL = int(os.getenv("DECISION_TTL", 7 * 86400))
+    # HTTP responses kept with their ETag / Last-Modified for revalidation
+    # (only what has no cache of its own: discover pages)
+    HTTP_CACHE = os.getenv("HTTP_CACHE", "true").lower() == "true"
+    CACHE_TTL_HTTP = int(os.getenv("CACHE_TTL_HTTP", 30 * 86400))
+    HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 1024 * 1024))
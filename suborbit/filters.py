@@ -0,0 +1,198 @@
+# filters.py
+# Movie filter predicates, annotated with the data they read and its cost
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .config import Config
+
+# Relative cost of the enrichment that provides a predicate's inputs
+SOURCE_COST = {
+    "tmdb": 1,  # one TMDB details call (or free on the discover payload)
+    "omdb": 2,  # one OMDb call
+}
+
+
+class FilterPredicate(NamedTuple):
+    name: str
+    fields: Tuple[str, ...]  # movie keys the check reads
+    source: str  # enrichment providing them: "tmdb" | "omdb"
+    check: Callable[[dict, Dict[str, Any]], Optional[str]]
+
+    @property
+    def cost(self) -> int:
+        return SOURCE_COST[self.source]
+
+
+# ----------------- Checks -----------------
+# Each returns a reason string if the movie fails, else None.
+def check_year(movie: dict, f: Dict[str, Any]) -> Optional[str]:
+    try:
+        year = int(movie.get("year", 0) or 0)
+    except Exception:
+        return "missing or invalid year"
+    if year < f["start_year"]:
+        return f"too old (year {year} < {f['start_year']})"
+    if year > f["end_year"]:
+        return f"too new (year {year} > {f['end_year']})"
+    return None
+
+
+def check_votes(movie: dict, f: Dict[str, Any]) -> Optional[str]:
+    vote_count = int(movie.get("vote_count", 0) or 0)
+    if vote_count < f["min_vote_count"]:
+        return f"too few votes ({vote_count} < {f['min_vote_count']})"
+    return None
+
+
+def check_tmdb(movie: dict, f: Dict[str, Any]) -> Optional[str]:
+    tmdb_rating = float(movie.get("tmdb_rating") or 0)
+    if tmdb_rating < f["min_tmdb"]:
+        return f"low TMDB ({tmdb_rating} < {f['min_tmdb']})"
+    return None
+
+
+def check_imdb(movie: dict, f: Dict[str, Any]) -> Optional[str]:
+    imdb_rating = float(movie.get("imdb_rating") or 0)
+    if imdb_rating < f["min_imdb"]:
+        return f"low IMDB ({imdb_rating} < {f['min_imdb']})"
+    return None
+
+
+def check_rt(movie: dict, f: Dict[str, Any]) -> Optional[str]:
+    rt_score = int(movie.get("rt_score") or 0)
+    if rt_score < f["min_rt"]:
+        return f"low RT ({rt_score} < {f['min_rt']})"
+    return None
+
+
+def check_genres(movie: dict, f: Dict[str, Any]) -> Optional[str]:
+    movie_genres = [g.lower() for g in movie.get("genres", [])]
+    include_genres = f.get("include_genres")
+    exclude_genres = f.get("exclude_genres")
+
+    if include_genres:
+        if not any(g in movie_genres for g in include_genres):
+            return f"no required genres (movie has {movie_genres}, wanted {include_genres})"
+
+    if exclude_genres:
+        if any(g in movie_genres for g in exclude_genres):
+            return f"excluded genre present (movie has {movie_genres}, excludes {exclude_genres})"
+    return None
+
+
+def check_language(movie: dict, f: Dict[str, Any]) -> Optional[str]:
+    lang = movie.get("original_language")
+    if Config.ALLOWED_LANGUAGES and lang and lang not in Config.ALLOWED_LANGUAGES:
+        return f"language not allowed ({lang})"
+    return None
+
+
+# ----------------- Planning -----------------
+def make_filters(
+    start_year,
+    end_year,
+    min_tmdb,
+    min_imdb,
+    min_rt,
+    include_genres=None,
+    exclude_genres=None,
+    min_vote_count=None,
+) -> Dict[str, Any]:
+    """Bundle run thresholds into the dict every check receives."""
+    return {
+        "start_year": start_year,
+        "end_year": end_year,
+        "min_tmdb": min_tmdb,
+        "min_imdb": min_imdb,
+        "min_rt": min_rt,
+        "include_genres": include_genres,
+        "exclude_genres": exclude_genres,
+        "min_vote_count": (
+            Config.MIN_VOTE_COUNT if min_vote_count is None else min_vote_count
+        ),
+    }
+
+
+def all_predicates() -> List[FilterPredicate]:
+    """Every filter, cheapest first."""
+    # With OMDb, IMDb votes replace TMDB's vote_count, so votes cost an OMDb call
+    votes_source = "omdb" if Config.OMDB_KEY else "tmdb"
+    predicates = [
+        FilterPredicate("year", ("year",), "tmdb", check_year),
+        FilterPredicate("language", ("original_language",), "tmdb", check_language),
+        FilterPredicate("tmdb", ("tmdb_rating",), "tmdb", check_tmdb),
+        FilterPredicate("genres", ("genres",), "tmdb", check_genres),
+        FilterPredicate("votes", ("vote_count",), votes_source, check_votes),
+        FilterPredicate("imdb", ("imdb_rating",), "omdb", check_imdb),
+        FilterPredicate("rt", ("rt_score",), "omdb", check_rt),
+    ]
+    return sorted(predicates, key=lambda p: p.cost)
+
+
+def active_predicates(filters: Dict[str, Any]) -> List[FilterPredicate]:
+    """
+    Only the filters that can reject anything with these thresholds,
+    cheapest first. If none needs OMDb, the OMDb call can be skipped.
+    """
+    enabled = {
+        "year": True,
+        "language": bool(Config.ALLOWED_LANGUAGES),
+        "tmdb": Config.USE_TMDB and filters["min_tmdb"] > 0,
+        "genres": bool(filters.get("include_genres") or filters.get("exclude_genres")),
+        "votes": filters["min_vote_count"] > 0,
+        "imdb": Config.USE_IMDB and filters["min_imdb"] > 0,
+        "rt": Config.USE_RT and filters["min_rt"] > 0,
+    }
+    return [p for p in all_predicates() if enabled[p.name]]
+
+
+def run_predicates(
+    movie: dict,
+    predicates: List[FilterPredicate],
+    filters: Dict[str, Any],
+    source: str = None,
+    partial: bool = False,
+) -> Optional[Tuple[str, str]]:
+    """
+    Run predicates in order (optionally only those fed by `source`).
+    With `partial`, predicates whose fields are missing from `movie` are
+    skipped. Returns (predicate name, reason) for the first failure.
+    """
+    for p in predicates:
+        if source and p.source != source:
+            continue
+        if partial and not all(k in movie for k in p.fields):
+            continue
+        reason = p.check(movie, filters)
+        if reason:
+            return p.name, reason
+    return None
+
+
+def fails_filters(
+    movie,
+    start_year,
+    end_year,
+    min_tmdb,
+    min_imdb,
+    min_rt,
+    include_genres=None,
+    exclude_genres=None,
+    min_vote_count=None,
+):
+    """
+    Check movie against filters.
+    Return reason string if it fails, else None.
+    """
+    filters = make_filters(
+        start_year,
+        end_year,
+        min_tmdb,
+        min_imdb,
+        min_rt,
+        include_genres,
+        exclude_genres,
+        min_vote_count,
+    )
+    failed = run_predicates(movie, active_predicates(filters), filters)
+    return failed[1] if failed else None
@@ -0,0 +1,215 @@
+# http_client.py
+# Shared HTTP client: pooled keep-alive connections, per-host limits, retries
+# and an optional conditional-request cache for GETs
+
+import hashlib, random, re, threading, time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+def parse_host_limits(raw: str) -> Dict[str, int]:
+    """Parse 'api.themoviedb.org=8,api.opensubtitles.com=1' into a dict."""
+    limits = {}
+    for part in (raw or "").split(","):
+        host, _, n = part.strip().partition("=")
+        if host and n.strip().isdigit():
+            limits[host.strip().lower()] = int(n)
+    return limits
+
+
+def retry_after_seconds(resp: requests.Response) -> Optional[float]:
+    """Retry-After as seconds (numeric or HTTP-date form), if present."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_max_age(headers) -> Optional[int]:
+    """
+    Seconds a response may be reused without asking, from Cache-Control
+    (0 for no-cache), or None if it must not be stored (no-store).
+    """
+    value = (headers.get("Cache-Control") or "").lower()
+    if "no-store" in value:
+        return None
+    if "no-cache" in value:
+        return 0
+    m = re.search(r"max-age=(\d+)", value)
+    return int(m.group(1)) if m else 0
+
+
+def cache_key(url: str, params: Dict[str, Any] = None, headers: dict = None) -> str:
+    """Hash of the request (credentials included, never stored in clear)."""
+    parts = [url, urlencode(sorted((params or {}).items()), doseq=True)]
+    parts.append((headers or {}).get("Authorization", ""))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _replay(url: str, entry: Dict[str, Any]) -> requests.Response:
+    """A 200 response rebuilt from a cache entry."""
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp.encoding = "utf-8"
+    resp.headers = CaseInsensitiveDict(entry["headers"])
+    resp._content = entry["body"].encode("utf-8")
+    resp.from_cache = True
+    return resp
+
+
+class HttpClient:
+    """
+    One requests.Session for every provider. urllib3 keeps a keep-alive
+    pool per host (pool_size connections each); `host_limits` caps
+    concurrent requests per host. Connection errors, timeouts and
+    429/502/503/504 are retried with exponential backoff, honoring
+    Retry-After. POSTs are only retried on 429 (not processed by the server).
+
+    With a `response_cache` (a BaseCache), get(..., cache=True) keeps
+    bodies with their validators: fresh ones (Cache-Control max-age) are
+    served locally, stale ones revalidated with If-None-Match /
+    If-Modified-Since, where a 304 returns the stored body.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        host_limits: Dict[str, int] = None,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_wait: float = 60.0,
+        log: Callable[[str], None] = None,
+        observe: Callable[[str, str, Optional[int], float], None] = None,
+        response_cache=None,
+        cache_namespace: str = "http",
+        cache_max_bytes: int = 0,
+    ) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.log = log
+        self.observe = observe  # (method, url, status or None, seconds) per attempt
+        self.response_cache = response_cache
+        self.cache_namespace = cache_namespace
+        self.cache_max_bytes = cache_max_bytes  # larger bodies are not stored
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/json"})
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_slots = {
+            host: threading.BoundedSemaphore(n)
+            for host, n in (host_limits or {}).items()
+            if n > 0
+        }
+
+    def _delay(self, attempt: int, resp: Optional[requests.Response]) -> float:
+        wait = retry_after_seconds(resp) if resp is not None else None
+        if wait is None:
+            wait = self.backoff * (2**attempt) + random.uniform(0, self.backoff)
+        return min(wait, self.max_wait)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request with retries. Returns the last response (whatever
+        its status); raises the last exception if no response was received.
+        """
+        slot = self._host_slots.get((urlparse(url).hostname or "").lower())
+        retry_statuses = RETRY_STATUSES if method == "GET" else {429}
+        attempt = 0
+        while True:
+            resp = None
+            started = time.monotonic()
+            try:
+                try:
+                    if slot:
+                        with slot:
+                            resp = self.session.request(method, url, **kwargs)
+                    else:
+                        resp = self.session.request(method, url, **kwargs)
+                finally:
+                    if self.observe:
+                        status = resp.status_code if resp is not None else None
+                        self.observe(method, url, status, time.monotonic() - started)
+                if resp.status_code not in retry_statuses or attempt >= self.retries:
+                    return resp
+                reason = f"status={resp.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if method != "GET" or attempt >= self.retries:
+                    raise
+                reason = str(e)
+            wait = self._delay(attempt, resp)
+            if self.log:
+                host = urlparse(url).hostname
+                self.log(
+                    f"[HTTP] retry {attempt + 1}/{self.retries} {host} in {wait:.1f}s ({reason})"
+                )
+            time.sleep(wait)
+            attempt += 1
+
+    def get(self, url: str, cache: bool = False, **kwargs) -> requests.Response:
+        if cache and self.response_cache is not None:
+            return self._cached_get(url, **kwargs)
+        return self.request("GET", url, **kwargs)
+
+    def _cached_get(self, url: str, **kwargs) -> requests.Response:
+        store, ns = self.response_cache, self.cache_namespace
+        key = cache_key(url, kwargs.get("params"), kwargs.get("headers"))
+        entry = store.get(ns, key)
+        now = time.time()
+        if entry and entry["fresh_until"] > now:
+            return _replay(url, entry)
+
+        if entry:
+            headers = dict(kwargs.get("headers") or {})
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            kwargs["headers"] = headers
+        resp = self.request("GET", url, **kwargs)
+
+        if resp.status_code == 304 and entry:
+            max_age = cache_max_age(resp.headers)
+            if max_age:  # only rewrite the entry if it became fresh
+                entry["fresh_until"] = now + max_age
+                store.set(ns, key, entry)
+            return _replay(url, entry)
+        if resp.status_code == 200:
+            max_age = cache_max_age(resp.headers)
+            etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+            too_big = self.cache_max_bytes and len(resp.content) > self.cache_max_bytes
+            if max_age is not None and (max_age or etag or modified) and not too_big:
+                headers = {
+                    k: v for k, v in resp.headers.items() if k.lower() != "set-cookie"
+                }
+                store.set(
+                    ns,
+                    key,
+                    {
+                        "body": resp.text,
+                        "headers": headers,
+                        "etag": etag,
+                        "last_modified": modified,
+                        "fresh_until": now + max_age,
+                    },
+                )
+        return resp
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
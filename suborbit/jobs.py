@@ -0,0 +1,574 @@
+# jobs.py
+# Persistent run queue: jobs are stored in /config/jobs.db and executed
+# by a small dispatcher in one web worker, JOB_CONCURRENCY runs at a time
+
+import json, os, socket, sqlite3, threading, time, traceback, uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: no worker processes to coordinate
+    fcntl = None
+
+from .config import Config
+from .logbuffer import sse_events, sse_poll_events
+from .suborbit_core import (
+    BASE_CONFIG,
+    CHECKPOINT_DIR,
+    CLI_RUN_ID,
+    DISCOVERY_MODES,
+    SUBTITLE_MODES,
+    RunContext,
+    log,
+    main_process,
+    run_summary,
+)
+
+JOBS_DB = BASE_CONFIG / "jobs.db"
+JOBS_LOCK = BASE_CONFIG / "jobs.lock"  # held by the worker that runs jobs
+
+# main_process() keyword arguments a job may set, with their types
+JOB_PARAMS = {
+    "start_year": int,
+    "end_year": int,
+    "include_genres": list,
+    "exclude_genres": list,
+    "min_tmdb": float,
+    "min_imdb": float,
+    "min_rt": int,
+    "max_movies": int,
+    "randomize": bool,
+    "max_pages": int,
+    "min_vote_count": int,
+    "subtitle_lang": str,
+    "subtitle_mode": str,
+    "discovery": str,
+    "rank": bool,
+    "trakt_user": str,
+    "trakt_list": str,
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def clean_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and coerce job parameters; raises ValueError."""
+    unknown = set(params) - set(JOB_PARAMS)
+    if unknown:
+        raise ValueError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+    out = {}
+    for key, value in params.items():
+        kind = JOB_PARAMS[key]
+        if value is None or value == "":
+            continue
+        if kind is list:
+            if isinstance(value, str):
+                value = [v.strip() for v in value.split(",") if v.strip()]
+            out[key] = [str(v).lower() for v in value] or None
+        elif kind is bool:
+            out[key] = (
+                value
+                if isinstance(value, bool)
+                else str(value).lower()
+                in (
+                    "1",
+                    "true",
+                    "yes",
+                    "on",
+                )
+            )
+        else:
+            try:
+                out[key] = kind(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key}: expected {kind.__name__}, got {value!r}")
+    if out.get("subtitle_mode", "any") not in SUBTITLE_MODES:
+        raise ValueError(f"subtitle_mode: expected one of {', '.join(SUBTITLE_MODES)}")
+    if out.get("discovery", "tmdb") not in DISCOVERY_MODES:
+        raise ValueError(f"discovery: expected one of {', '.join(DISCOVERY_MODES)}")
+    return out
+
+
+class JobStore:
+    """
+    SQLite table of jobs; safe to share between threads and between web
+    workers (claims and cancel requests are single atomic statements).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id          TEXT PRIMARY KEY,
+                name        TEXT,
+                params      TEXT NOT NULL,
+                status      TEXT NOT NULL,
+                created_at  TEXT NOT NULL,
+                started_at  TEXT,
+                finished_at TEXT,
+                progress    TEXT,
+                summary     TEXT,
+                error       TEXT,
+                log_tail    TEXT
+            )
+            """)
+        # Columns added for multi-worker deployments
+        columns = {r["name"] for r in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (
+            ("owner", "TEXT"),
+            ("heartbeat_at", "REAL"),
+            ("cancel_requested", "INTEGER NOT NULL DEFAULT 0"),
+        ):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)"
+        )
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS job_log (
+                job_id  TEXT NOT NULL,
+                seq     INTEGER NOT NULL,
+                ts      REAL NOT NULL,
+                level   TEXT NOT NULL,
+                msg     TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            ) WITHOUT ROWID
+            """)
+
+    def _row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for key in ("params", "progress", "summary", "log_tail"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def insert(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, name, params, status, created_at) "
+                "VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, name, json.dumps(params), _now()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query, args = "SELECT * FROM jobs", []
+        if status:
+            query += " WHERE status = ?"
+            args.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._db.execute(query, (*args, limit)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def count(self, status: str) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def latest_started(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE started_at IS NOT NULL "
+                "ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def claim_next(self, owner: str, limit: int) -> Optional[Dict[str, Any]]:
+        """
+        Oldest queued job -> running for `owner`, unless `limit` jobs are
+        already running (in any worker). None if nothing was claimed.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                (running,) = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'running'"
+                ).fetchone()
+                row = None
+                if running < limit:
+                    row = self._db.execute(
+                        "SELECT * FROM jobs WHERE status = 'queued' "
+                        "ORDER BY created_at LIMIT 1"
+                    ).fetchone()
+                if row:
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ?, "
+                        "owner = ?, heartbeat_at = ? WHERE id = ?",
+                        (_now(), owner, time.time(), row["id"]),
+                    )
+                    # A resumed job starts a new log
+                    self._db.execute(
+                        "DELETE FROM job_log WHERE job_id = ?", (row["id"],)
+                    )
+            finally:
+                self._db.execute("COMMIT")
+        return self.get(row["id"]) if row else None
+
+    def update(self, job_id: str, **fields) -> None:
+        for key in ("progress", "summary", "log_tail"):
+            if key in fields:
+                fields[key] = json.dumps(fields[key], default=str)
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id)
+            )
+
+    def heartbeat(
+        self, job_id: str, progress: Dict[str, Any], summary: Optional[dict]
+    ) -> bool:
+        """Publish a running job's progress; True if a cancel was requested."""
+        self.update(
+            job_id, heartbeat_at=time.time(), progress=progress, summary=summary
+        )
+        with self._lock:
+            row = self._db.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def cancel_queued(self, job_id: str) -> bool:
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (_now(), job_id),
+            )
+        return cur.rowcount == 1
+
+    def requeue(self, job_id: str) -> bool:
+        """cancelled/failed -> queued again (it resumes from its checkpoint)."""
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, "
+                "finished_at = NULL, error = NULL, owner = NULL, "
+                "heartbeat_at = NULL, cancel_requested = 0 "
+                "WHERE id = ? AND status IN ('cancelled', 'failed')",
+                (job_id,),
+            )
+        return cur.rowcount == 1
+
+    def ids(self) -> set:
+        with self._lock:
+            return {r[0] for r in self._db.execute("SELECT id FROM jobs")}
+
+    def request_cancel(self, job_id: str = None) -> int:
+        """Flag one running job (or all of them) for its owner to stop."""
+        query = "UPDATE jobs SET cancel_requested = 1 WHERE status = 'running'"
+        args: tuple = ()
+        if job_id:
+            query += " AND id = ?"
+            args = (job_id,)
+        with self._lock:
+            return self._db.execute(query, args).rowcount
+
+    def requeue_stale(self, max_age: float) -> int:
+        """
+        Jobs whose worker stopped sending heartbeats (it died or was
+        recycled) go back in the queue, or end as cancelled if asked to.
+        """
+        cutoff = time.time() - max_age
+        stale = "status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)"
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                f"WHERE cancel_requested = 1 AND {stale}",
+                (_now(), cutoff),
+            )
+            cur = self._db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, "
+                f"owner = NULL, heartbeat_at = NULL WHERE {stale}",
+                (cutoff,),
+            )
+        return cur.rowcount
+
+    def append_log(self, job_id: str, records: List[dict], keep: int) -> None:
+        """Mirror new log records of a job; only the last `keep` are kept."""
+        if not records:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO job_log (job_id, seq, ts, level, msg) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(job_id, r["seq"], r["ts"], r["level"], r["msg"]) for r in records],
+            )
+            self._db.execute(
+                "DELETE FROM job_log WHERE job_id = ? AND seq <= ?",
+                (job_id, records[-1]["seq"] - keep),
+            )
+
+    def log_since(self, job_id: str, cursor: int = 0, limit: int = 0) -> List[dict]:
+        """Mirrored records newer than `cursor` (at most `limit`, newest kept)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, ts, level, msg FROM job_log "
+                "WHERE job_id = ? AND seq > ? ORDER BY seq DESC LIMIT ?",
+                (job_id, cursor, limit or -1),
+            ).fetchall()
+        return [dict(r) for r in reversed(rows)]
+
+    def prune(self, keep: int) -> None:
+        """Keep only the newest `keep` finished jobs."""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status NOT IN ('queued', 'running') "
+                "AND id NOT IN (SELECT id FROM jobs "
+                "WHERE status NOT IN ('queued', 'running') "
+                "ORDER BY created_at DESC LIMIT ?)",
+                (keep,),
+            )
+            self._db.execute(
+                "DELETE FROM job_log WHERE job_id NOT IN (SELECT id FROM jobs)"
+            )
+
+
+class JobManager:
+    """
+    Runs queued jobs, up to `concurrency` at a time across all web workers.
+    Every job gets its own RunContext (cancel token, log stream, progress);
+    provider rate limiters, the metadata cache and the Radarr library are
+    shared by the jobs of one worker.
+
+    Only the worker holding JOBS_LOCK claims jobs, so the rate limiters see
+    every run; the OS releases the lock with its process and another
+    worker's dispatcher takes over. Every JOB_HEARTBEAT seconds it publishes
+    the progress and log of its jobs and picks up cancel requests made
+    through any worker.
+    """
+
+    def __init__(self, store: JobStore, concurrency: int = 1) -> None:
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.runs: Dict[str, RunContext] = {}  # jobs running in this worker
+        self._log_seq: Dict[str, int] = {}  # last record mirrored per job
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lease = None  # open JOBS_LOCK while this worker dispatches
+
+    def start(self) -> None:
+        """Start the dispatcher (once); resumes jobs queued before a restart."""
+        with self._lock:
+            if self._dispatcher:
+                return
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="suborbit-jobs", daemon=True
+            )
+            self._dispatcher.start()
+
+    def submit(self, params: Dict[str, Any], name: str = None) -> Dict[str, Any]:
+        job = self.store.insert(name or "", clean_params(params))
+        self.start()
+        self._wake.set()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        if self.store.cancel_queued(job_id):
+            return True
+        if not self.store.request_cancel(job_id):
+            return False
+        run = self.runs.get(job_id)
+        if run:
+            run.cancel.set()
+        return True
+
+    def resume(self, job_id: str) -> bool:
+        """Queue a stopped or failed job again; it continues where it left off."""
+        if not self.store.requeue(job_id):
+            return False
+        self.start()
+        self._wake.set()
+        return True
+
+    def cancel_running(self) -> None:
+        """Stop the running job(s), in any worker; the queue is left alone."""
+        self.store.request_cancel()
+        for run in list(self.runs.values()):
+            run.cancel.set()
+
+    def clear_queue(self) -> int:
+        """Cancel every queued job; returns how many were dropped."""
+        jobs = self.store.list(status="queued", limit=1000)
+        return sum(self.store.cancel_queued(job["id"]) for job in jobs)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(job_id)
+        if job and job_id in self.runs:
+            job["progress"] = dict(self.runs[job_id].progress)
+        return job
+
+    def list(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        jobs = self.store.list(status, limit)
+        for job in jobs:
+            if job["id"] in self.runs:
+                job["progress"] = dict(self.runs[job["id"]].progress)
+        return jobs
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "running": self.store.count("running"),
+            "queued": self.store.count("queued"),
+        }
+
+    def latest_summary(self) -> Dict[str, Any]:
+        """Summary of the most recently started job, whichever worker runs it."""
+        job = self.store.latest_started()
+        run = job and self.runs.get(job["id"])
+        if not job or run:
+            return run_summary(run)
+        return job["summary"] or {
+            "id": job["id"],
+            "running": job["status"] == "running",
+        }
+
+    def log_since(self, job_id: str, cursor: int = 0, limit: int = 0):
+        """(records, reset, next_cursor) of a job's log, like LogBuffer.since()."""
+        run = self.runs.get(job_id)
+        if run:
+            return run.log.since(cursor, limit)
+        records = self.store.log_since(job_id, cursor, limit)
+        return records, False, records[-1]["seq"] if records else cursor
+
+    def log_events(
+        self,
+        job_id: str,
+        cursor: int = 0,
+        backlog: int = 200,
+        keepalive: float = 15,
+        max_age: float = 0,
+    ) -> Iterator[str]:
+        """Server-sent events of a job's log (polled if another worker runs it)."""
+        run = self.runs.get(job_id)
+        if run:
+            return sse_events(run.log, cursor, backlog, keepalive, max_age)
+
+        def fetch(cursor, limit):
+            job = self.store.get(job_id)
+            finished = not job or job["status"] != "running"
+            return self.store.log_since(job_id, cursor, limit), finished
+
+        return sse_poll_events(
+            fetch, cursor, backlog, keepalive, Config.JOB_HEARTBEAT, max_age
+        )
+
+    def _dispatch(self) -> None:
+        while True:
+            self._wake.wait(timeout=Config.JOB_HEARTBEAT)
+            self._wake.clear()
+            try:
+                self._sync()
+                while self._leading():
+                    job = self.store.claim_next(self.owner, self.concurrency)
+                    if not job:
+                        break
+                    # jobs.db counts runs in every worker, this one included
+                    run = RunContext(
+                        job["id"], fresh_log=self.store.count("running") <= 1
+                    )
+                    self.runs[job["id"]] = run
+                    threading.Thread(
+                        target=self._execute,
+                        args=(job, run),
+                        name=f"suborbit-job-{job['id']}",
+                        daemon=True,
+                    ).start()
+            except sqlite3.Error as e:
+                log(f"[WARN] Job dispatcher: {e}")
+
+    def _leading(self) -> bool:
+        """Whether this worker dispatches jobs (takes JOBS_LOCK if it's free)."""
+        if self._lease or fcntl is None:
+            return True
+        lease = open(JOBS_LOCK, "a")
+        try:
+            fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lease.close()
+            return False
+        self._lease = lease
+        if Config.DEBUG:
+            log(f"🗂️ Worker {self.owner} now runs the job queue")
+        return True
+
+    def _sync(self) -> None:
+        """Heartbeat our jobs, pick up cancel requests, requeue orphans."""
+        for job_id, run in list(self.runs.items()):
+            self._mirror_log(job_id, run)
+            summary = run_summary(run) if run.state.get("running") else None
+            if self.store.heartbeat(job_id, run.progress, summary):
+                run.cancel.set()
+        requeued = self.store.requeue_stale(Config.JOB_STALE_AFTER)
+        if requeued:
+            log(f"🗂️ Requeued {requeued} interrupted job(s)")
+
+    def _mirror_log(self, job_id: str, run: RunContext) -> None:
+        records, _, cursor = run.log.since(self._log_seq.get(job_id, 0))
+        self.store.append_log(job_id, records, Config.LOG_BUFFER_LINES)
+        self._log_seq[job_id] = cursor
+
+    def _execute(self, job: Dict[str, Any], run: RunContext) -> None:
+        status, error, summary = "done", None, None
+        try:
+            summary = main_process(run=run, **job["params"])
+            if run.cancel.is_set():
+                status = "cancelled"
+        except Exception as e:
+            status, error = "failed", f"{e}\n{traceback.format_exc(limit=5)}"
+            log(f"❌ Job {job['id']} failed: {e}")
+        finally:
+            self._mirror_log(job["id"], run)
+            records, _, _ = run.log.since(0, 200)
+            self.store.update(
+                job["id"],
+                status=status,
+                finished_at=_now(),
+                progress=run.progress,
+                summary=summary,
+                error=error,
+                log_tail=[r["msg"] for r in records],
+            )
+            self.runs.pop(job["id"], None)
+            self._log_seq.pop(job["id"], None)
+            self.store.prune(Config.JOB_HISTORY)
+            self._prune_checkpoints()
+            self._wake.set()
+
+    def _prune_checkpoints(self) -> None:
+        """Checkpoints of jobs no longer in the store can never be resumed."""
+        ids = self.store.ids() | {CLI_RUN_ID}
+        for path in CHECKPOINT_DIR.glob("*.json"):
+            if path.stem not in ids:
+                path.unlink(missing_ok=True)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def job_manager() -> JobManager:
+    """The process-wide job manager (opened on first use)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(JobStore(JOBS_DB), Config.JOB_CONCURRENCY)
+        return _manager
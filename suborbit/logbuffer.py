@@ -0,0 +1,312 @@
+# logbuffer.py
+# In-memory ring buffer of log records plus a buffered log file writer
+
+import json, threading, time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class LogBuffer:
+    """
+    The last `capacity` log records, numbered by a sequence that keeps
+    growing across clear() calls. Readers keep a cursor (the last seq they
+    saw) and only ever receive newer records; wait() blocks until one
+    arrives, so streaming clients cost nothing while the log is quiet.
+    """
+
+    def __init__(self, capacity: int = 2000) -> None:
+        self._records: deque = deque(maxlen=capacity)
+        self._seq = 0
+        self._cleared_at = 0  # records up to this seq were dropped by clear()
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def append(self, msg: str, level: str = "info") -> Dict[str, Any]:
+        with self._cond:
+            self._seq += 1
+            record = {"seq": self._seq, "ts": time.time(), "level": level, "msg": msg}
+            self._records.append(record)
+            self._cond.notify_all()
+        return record
+
+    def clear(self) -> None:
+        """Drop all records (new run); readers are told to reset."""
+        with self._cond:
+            self._records.clear()
+            self._cleared_at = self._seq
+            self._cond.notify_all()
+
+    def since(
+        self, cursor: int = 0, limit: int = 0
+    ) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """
+        Records newer than `cursor` (at most `limit`, newest kept), whether
+        the reader must reset its view (the buffer was cleared, or records
+        it never saw were already dropped), and the reader's next cursor.
+        """
+        with self._cond:
+            return self._since(cursor, limit)
+
+    def _since(self, cursor: int, limit: int):
+        if cursor > self._seq:  # cursor from before a restart
+            cursor, reset = 0, True
+        else:
+            reset = cursor < self._cleared_at or bool(
+                self._records and cursor < self._records[0]["seq"] - 1
+            )
+        records = [r for r in self._records if r["seq"] > cursor]
+        if limit:
+            records = records[-limit:]
+        next_cursor = records[-1]["seq"] if records else max(cursor, self._cleared_at)
+        return records, reset, next_cursor
+
+    def wait(
+        self, cursor: int, timeout: float
+    ) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Like since(), but block up to `timeout` seconds for something new."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._seq != cursor or cursor < self._cleared_at, timeout
+            )
+            return self._since(cursor, 0)
+
+
+def sse_events(
+    buffer: LogBuffer,
+    cursor: int = 0,
+    backlog: int = 200,
+    keepalive: float = 15,
+    max_age: float = 0,
+) -> Iterator[str]:
+    """
+    Server-sent event stream of a buffer: up to `backlog` recent records,
+    then each new one as it arrives ("reset" when the buffer is cleared).
+    Idle periods only produce keep-alive comments. With `max_age`, the
+    stream ends after that many seconds and the browser reconnects from
+    its last event id (so no client holds a worker thread for good).
+    """
+    deadline = time.monotonic() + max_age if max_age else None
+    records, reset, cursor = buffer.since(cursor, backlog)
+    while True:
+        if reset:
+            yield "event: reset\ndata: {}\n\n"
+        for r in records:
+            yield _sse_record(r)
+        if not (records or reset):
+            yield ": keep-alive\n\n"
+        if deadline and time.monotonic() >= deadline:
+            return
+        timeout = min(keepalive, deadline - time.monotonic()) if deadline else keepalive
+        records, reset, cursor = buffer.wait(cursor, max(timeout, 0))
+
+
+def sse_poll_events(
+    fetch: Callable[[int, int], Tuple[List[Dict[str, Any]], bool]],
+    cursor: int = 0,
+    backlog: int = 200,
+    keepalive: float = 15,
+    interval: float = 1.0,
+    max_age: float = 0,
+) -> Iterator[str]:
+    """
+    Like sse_events() for a log that can only be polled (kept by another
+    process): fetch(cursor, limit) returns (records, finished). The stream
+    ends once the log is finished and drained, or after `max_age`.
+    """
+    deadline = time.monotonic() + max_age if max_age else None
+    records, finished = fetch(cursor, backlog)
+    idle = keepalive  # an empty start still sends a comment right away
+    while True:
+        for r in records:
+            yield _sse_record(r)
+        if records:
+            cursor, idle = records[-1]["seq"], 0.0
+        elif finished:
+            return
+        elif idle >= keepalive:
+            yield ": keep-alive\n\n"
+            idle = 0.0
+        if deadline and time.monotonic() >= deadline:
+            return
+        time.sleep(interval)
+        idle += interval
+        records, finished = fetch(cursor, 0)
+
+
+def _sse_record(record: Dict[str, Any]) -> str:
+    return f"id: {record['seq']}\ndata: {json.dumps(record, ensure_ascii=False)}\n\n"
+
+
+class StreamSlots:
+    """
+    At most `limit` open event streams (each holds a worker thread);
+    0 = unlimited. open() returns None when all slots are taken.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def open(self, events: Iterator[str]) -> Optional["_SlotStream"]:
+        with self._lock:
+            if self.limit and self.active >= self.limit:
+                return None
+            self.active += 1
+        return _SlotStream(events, self._release)
+
+    def _release(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+
+class _SlotStream:
+    """An event iterator that gives its slot back when it ends or is closed."""
+
+    def __init__(self, events: Iterator[str], release: Callable[[], None]) -> None:
+        self._events = events
+        self._release = release
+        self._open = True
+
+    def __iter__(self) -> "_SlotStream":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._events)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Called by the WSGI server once the client is gone (or done)."""
+        if self._open:
+            self._open = False
+            self._release()
+            if hasattr(self._events, "close"):
+                self._events.close()
+
+
+class BufferedLogWriter:
+    """
+    Append-only log file kept open between messages. Lines are flushed
+    by a background thread every `flush_interval` seconds (or once
+    `max_pending` lines are waiting), not on every message.
+    """
+
+    def __init__(
+        self, path: Path, flush_interval: float = 1.0, max_pending: int = 200
+    ) -> None:
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+        self._flusher: Optional[threading.Thread] = None
+
+    def _open(self, mode: str = "a") -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open(mode, encoding="utf-8")
+        if self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="suborbit-log", daemon=True
+            )
+            self._flusher.start()
+
+    def write(self, line: str) -> None:
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line + "\n")
+            self._pending += 1
+            if self._pending >= self.max_pending:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._file and self._pending:
+            self._file.flush()
+            self._pending = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def truncate(self) -> None:
+        """Start the file over (new run)."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._open("w")
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._flush()
+                self._file.close()
+                self._file = None
+
+
+class LogFollower:
+    """
+    Feeds a LogBuffer from a log file other processes append to (several
+    web workers). Every follower reads the file from its start, so record
+    numbers - and the cursors clients hold - agree between workers. A file
+    that shrank was truncated for a new run and clears the buffer.
+    """
+
+    def __init__(self, path: Path, buffer: LogBuffer, interval: float = 0.5) -> None:
+        self.path = Path(path)
+        self.buffer = buffer
+        self.interval = interval
+        self._offset = 0
+        self._partial = b""
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self.poll()
+            self._thread = threading.Thread(
+                target=self._loop, name="suborbit-log-follow", daemon=True
+            )
+            self._thread.start()
+
+    def poll(self) -> None:
+        """Append whatever complete lines were written since the last poll."""
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return
+        if size < self._offset:
+            self.buffer.clear()
+            self._offset, self._partial = 0, b""
+        if size == self._offset:
+            return
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        self._offset += len(chunk)
+        *lines, self._partial = (self._partial + chunk).split(b"\n")
+        for line in lines:
+            self.buffer.append(line.decode("utf-8", "replace"))
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception:
+                pass
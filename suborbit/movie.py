@@ -0,0 +1,157 @@
+# movie.py
+# Compact movie record carried through the pipeline, from TMDB details to
+# the Radarr add and the CSV row
+
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Fields kept from TMDB details, in cache order (see Movie.to_cache)
+DETAIL_FIELDS = (
+    "title",
+    "year",
+    "imdb_id",
+    "original_language",
+    "genres",
+    "tmdb_rating",
+    "vote_count",
+)
+
+CSV_FIELDS = [
+    "title",
+    "year",
+    "tmdb_id",
+    "imdb_id",
+    "original_language",
+    "genres",
+    "tmdb_rating",
+    "imdb_rating",
+    "rt_score",
+    "vote_count",
+    "subtitle_lang",  # language(s) the movie was accepted for
+    "subtitles",  # per language: "fi=12;sv=0"
+    "subtitle_score",  # best usable language's quality score (0-100)
+]
+
+# One shared tuple per genre combination (there are only a few hundred)
+_genre_sets: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_genres(names: Iterable[str]) -> Tuple[str, ...]:
+    genres = tuple(sys.intern(n) for n in names)
+    return _genre_sets.setdefault(genres, genres)
+
+
+def _year(release_date: Optional[str]) -> int:
+    release_date = release_date or ""
+    return int(release_date[:4]) if release_date[:4].isdigit() else 0
+
+
+class Movie:
+    """
+    One candidate: the TMDB fields the filters read, OMDb ratings once
+    fetched and the subtitle outcome once accepted. Slotted, with interned
+    language and genre values; get() / [] / `in` read fields by name so
+    filter predicates treat it like the dicts they were written for.
+    """
+
+    __slots__ = (
+        "tmdb_id",
+        "title",
+        "year",
+        "imdb_id",
+        "original_language",
+        "genres",
+        "tmdb_rating",
+        "vote_count",
+        "imdb_rating",
+        "rt_score",
+        "subtitle_lang",
+        "subtitles",
+        "subtitle_score",
+    )
+    _FIELDS = frozenset(__slots__)
+
+    def __init__(
+        self,
+        tmdb_id: int,
+        title: str = "",
+        year: int = 0,
+        imdb_id: Optional[str] = None,
+        original_language: str = "",
+        genres: Iterable[str] = (),
+        tmdb_rating: float = 0.0,
+        vote_count: int = 0,
+    ) -> None:
+        self.tmdb_id = int(tmdb_id)
+        self.title = title or ""
+        self.year = int(year or 0)
+        self.imdb_id = imdb_id or None
+        self.original_language = sys.intern(original_language or "")
+        self.genres = intern_genres(genres)
+        self.tmdb_rating = float(tmdb_rating or 0)
+        self.vote_count = int(vote_count or 0)
+        self.imdb_rating: Optional[float] = None
+        self.rt_score: Optional[int] = None
+        self.subtitle_lang: Optional[str] = None
+        self.subtitles: Optional[Dict[str, int]] = None  # language -> uploads
+        self.subtitle_score: Optional[float] = None
+
+    @classmethod
+    def from_details(cls, tmdb_id: int, data: Dict[str, Any]) -> "Movie":
+        """From a TMDB /movie/{id} response (extra fields are dropped)."""
+        imdb_id = data.get("imdb_id") or (data.get("external_ids") or {}).get("imdb_id")
+        return cls(
+            tmdb_id,
+            title=data.get("title") or data.get("original_title"),
+            year=_year(data.get("release_date")),
+            imdb_id=imdb_id,
+            original_language=data.get("original_language"),
+            genres=[g.get("name", "") for g in data.get("genres") or []],
+            tmdb_rating=data.get("vote_average"),
+            vote_count=data.get("vote_count"),
+        )
+
+    # ----------------- Serialization -----------------
+    def to_cache(self) -> List[Any]:
+        """The TMDB fields as a list in DETAIL_FIELDS order."""
+        return [getattr(self, k) for k in DETAIL_FIELDS]
+
+    @classmethod
+    def from_cache(cls, tmdb_id: int, value: Any) -> "Movie":
+        """Inverse of to_cache (details dicts from older versions work too)."""
+        if isinstance(value, dict):
+            return cls.from_details(tmdb_id, value)
+        return cls(tmdb_id, **dict(zip(DETAIL_FIELDS, value)))
+
+    def csv_row(self) -> List[Any]:
+        """Values in CSV_FIELDS order."""
+        return [
+            self.title,
+            self.year,
+            self.tmdb_id,
+            self.imdb_id,
+            self.original_language,
+            ",".join(self.genres),
+            self.tmdb_rating,
+            self.imdb_rating,
+            self.rt_score,
+            self.vote_count,
+            self.subtitle_lang,
+            ";".join(f"{l}={n}" for l, n in (self.subtitles or {}).items()),
+            self.subtitle_score,
+        ]
+
+    # ----------------- Mapping access -----------------
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._FIELDS else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS
+
+    def __repr__(self) -> str:
+        return f"Movie({self.tmdb_id}, {self.title!r}, {self.year})"
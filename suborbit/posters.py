@@ -0,0 +1,119 @@
+# posters.py
+# Poster thumbnails kept on disk (under /config/posters), fetched once and
+# resized with Pillow when it is installed
+
+import io, os, threading, time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+try:
+    from PIL import Image
+except ImportError:  # optional: posters are then kept as fetched
+    Image = None
+
+
+def thumbnail(data: bytes, width: int) -> bytes:
+    """JPEG of at most `width` pixels wide (the original without Pillow)."""
+    if Image is None:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = img.convert("RGB")
+            if img.width > width:
+                img = img.resize((width, round(img.height * width / img.width)))
+            out = io.BytesIO()
+            img.save(out, "JPEG", quality=85, optimize=True)
+            return out.getvalue()
+    except Exception:
+        return data
+
+
+class PosterCache:
+    """
+    Directory of `<key>-<width>.jpg` thumbnails bounded to `max_bytes`:
+    the least recently served files go first. On a miss, sources() lists
+    URLs to try and fetch(url) returns bytes or None - once per key
+    however many requests wait for it.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, width: int = 300) -> None:
+        self.root = Path(root).absolute()  # send_file resolves relative to the app
+        self.max_bytes = max_bytes
+        self.width = width
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Lock held while it is fetched
+        self._size: Optional[int] = None  # bytes on disk, scanned on first use
+
+    def path(self, key) -> Path:
+        return self.root / f"{key}-{self.width}.jpg"
+
+    def get(
+        self,
+        key,
+        sources: Callable[[], Iterable[str]],
+        fetch: Callable[[str], Optional[bytes]],
+    ) -> Optional[Path]:
+        """The thumbnail's path, fetching it from the first working URL."""
+        path = self.path(key)
+        if self._touch(path):
+            return path
+        with self._lock:
+            inflight = self._inflight.setdefault(key, threading.Lock())
+        with inflight:
+            try:
+                if self._touch(path):  # fetched while we waited
+                    return path
+                for url in sources():
+                    data = fetch(url)
+                    if data:
+                        self._store(path, thumbnail(data, self.width))
+                        return path
+                return None
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def _touch(self, path: Path) -> bool:
+        """Mark a file used (its atime; the mtime behind its ETag is kept)."""
+        try:
+            os.utime(path, (time.time(), path.stat().st_mtime))
+            return True
+        except OSError:
+            return False
+
+    def _store(self, path: Path, data: bytes) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(f.stat().st_size for f in self._files())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+
+    def _files(self):
+        return [f for f in self.root.glob("*.jpg") if f.is_file()]
+
+    def _evict(self, keep: Path) -> None:
+        """Drop least recently used files down to 90% of the budget."""
+        files = sorted(self._files(), key=lambda f: f.stat().st_atime)
+        for f in files:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            if f == keep:
+                continue
+            try:
+                size = f.stat().st_size
+                f.unlink()
+                self._size -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for f in self._files():
+                f.unlink(missing_ok=True)
+            self._size = 0
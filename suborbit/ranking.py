@@ -0,0 +1,241 @@
+# ranking.py
+# Columnar candidate pools: discover results held in typed arrays, so
+# thresholds, genre masks and a composite score run over whole columns
+
+import math
+from array import array
+from itertools import compress, repeat
+from operator import add, and_, eq, gt, lt, mul, not_, or_, sub, truediv
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .filters import FilterPredicate
+
+# Composite score components and their default weights
+RANK_COMPONENTS = ("tmdb", "imdb", "rt", "votes", "recency")
+DEFAULT_WEIGHTS = {"tmdb": 0.3, "imdb": 0.3, "rt": 0.1, "votes": 0.2, "recency": 0.1}
+
+
+def parse_weights(raw: str) -> Dict[str, float]:
+    """'tmdb=0.5,votes=0.5' -> weights; unknown names are ignored."""
+    weights = {}
+    for part in (raw or "").split(","):
+        name, _, value = part.partition("=")
+        name = name.strip().lower()
+        if name in RANK_COMPONENTS and value.strip():
+            weights[name] = float(value)
+    return weights or dict(DEFAULT_WEIGHTS)
+
+
+class CandidatePool:
+    """
+    Discover candidates, one row per movie, one typed array per field:
+    tmdb id, year, TMDB rating, vote count, a genre bitmask and an interned
+    original language (plus IMDb / RT once known, NaN until then). Only a
+    slim item per row (id and title) is kept for the later stages.
+
+    Filters and the score are map() passes over whole columns with the
+    operator module's C functions, so no Python code runs per row (the
+    stdlib's take on vectorizing; numpy is not a dependency).
+    """
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.years = array("h")
+        self.tmdb = array("d")  # doubles: thresholds compare like check_tmdb
+        self.votes = array("q")
+        self.genres = array("Q")  # bit per genre, see genre_bit()
+        self.langs = array("H")  # index into lang_names
+        self.imdb = array("d")
+        self.rt = array("d")
+        self.items: List[dict] = []
+        self.lang_names: List[str] = []
+        self._lang_codes: Dict[str, int] = {}
+        self._genre_bits: Dict[int, int] = {}
+        self._seen = set()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def genre_bit(self, genre_id: int) -> int:
+        """Bit of a TMDB genre id (assigned on first sight, at most 64)."""
+        bit = self._genre_bits.get(genre_id)
+        if bit is None:
+            if len(self._genre_bits) >= 64:
+                # TMDB has 19; sharing a bit would silently break matching
+                raise ValueError(f"more than 64 genres (genre id {genre_id})")
+            bit = 1 << len(self._genre_bits)
+            self._genre_bits[genre_id] = bit
+        return bit
+
+    def _lang(self, code: str) -> int:
+        index = self._lang_codes.get(code)
+        if index is None:
+            index = self._lang_codes[code] = len(self.lang_names)
+            self.lang_names.append(code)
+        return index
+
+    def add(self, item: dict) -> None:
+        """Append one discover result (duplicates across pages are dropped)."""
+        tmdb_id = int(item.get("id") or 0)
+        if not tmdb_id or tmdb_id in self._seen:
+            return
+        self._seen.add(tmdb_id)
+        release = item.get("release_date") or ""
+        mask = 0
+        for g in item.get("genre_ids") or []:
+            mask |= self.genre_bit(g)
+        self.ids.append(tmdb_id)
+        self.years.append(int(release[:4]) if release[:4].isdigit() else 0)
+        self.tmdb.append(float(item.get("vote_average") or 0))
+        self.votes.append(int(item.get("vote_count") or 0))
+        self.genres.append(mask)
+        self.langs.append(self._lang(item.get("original_language") or ""))
+        self.imdb.append(math.nan)
+        self.rt.append(math.nan)
+        self.items.append({"id": tmdb_id, "title": item.get("title")})
+
+    def extend(self, items: Iterable[dict]) -> "CandidatePool":
+        for item in items:
+            self.add(item)
+        return self
+
+    def fill_known(
+        self, lookup: Callable[[int], Optional[Tuple[Optional[float], Any]]]
+    ) -> int:
+        """
+        Fill IMDb / RT from `lookup(tmdb_id)` -> (imdb_rating, rt_score) or
+        None (what earlier runs already know). Returns how many were found.
+        """
+        found = 0
+        for i, tmdb_id in enumerate(self.ids):
+            known = lookup(tmdb_id)
+            if not known:
+                continue
+            imdb, rt = known
+            if imdb is not None:
+                self.imdb[i] = float(imdb)
+            if rt is not None:
+                self.rt[i] = float(rt)
+            found += 1
+        return found
+
+    # ----------------- Filtering -----------------
+    def keep_mask(
+        self,
+        filters: Dict[str, Any],
+        predicates: List[FilterPredicate],
+        genre_ids: Dict[str, int],
+        allowed_languages: Iterable[str] = (),
+        rejections=None,
+    ) -> bytearray:
+        """
+        1 for rows passing the TMDB-fed `predicates`, column by column (the
+        same checks prefilter_discover_item runs on one dict). Rejections
+        are counted per predicate, first failure only, like the pipeline.
+        """
+        keep = bytearray(b"\x01") * len(self)
+        for p in predicates:
+            if p.source != "tmdb":
+                continue
+            fails = self._fails(p.name, filters, genre_ids, allowed_languages)
+            if fails is None:
+                continue
+            before = sum(keep)
+            keep = bytearray(map(and_, keep, map(not_, fails)))
+            if rejections is not None and before > sum(keep):
+                rejections[p.name] += before - sum(keep)
+        return keep
+
+    def _fails(self, name, filters, genre_ids, allowed_languages):
+        """A lazy column of booleans: True where the row fails `name`."""
+        if name == "year":
+            lo, hi = int(filters["start_year"]), int(filters["end_year"])
+            years = self.years
+            outside = map(or_, map(lt, years, repeat(lo)), map(gt, years, repeat(hi)))
+            return map(and_, map(bool, years), outside)  # unknown year: no check
+        if name == "tmdb":
+            return map(lt, self.tmdb, repeat(float(filters["min_tmdb"])))
+        if name == "votes":
+            return map(lt, self.votes, repeat(int(filters["min_vote_count"])))
+        if name == "genres":
+            include = self._mask(filters.get("include_genres"), genre_ids)
+            exclude = self._mask(filters.get("exclude_genres"), genre_ids)
+            fails = repeat(False, len(self))
+            if include:
+                fails = map(not_, map(and_, self.genres, repeat(include)))
+            if exclude:
+                excluded = map(bool, map(and_, self.genres, repeat(exclude)))
+                fails = map(or_, fails, excluded)
+            return fails
+        if name == "language":
+            codes = set(allowed_languages) | {""}  # no language: no check
+            allowed = {i for c, i in self._lang_codes.items() if c in codes}
+            return map(not_, map(allowed.__contains__, self.langs))
+        return None
+
+    def _mask(self, names, genre_ids: Dict[str, int]) -> int:
+        mask = 0
+        for name in names or []:
+            if name in genre_ids:
+                mask |= self.genre_bit(genre_ids[name])
+        return mask
+
+    # ----------------- Ranking -----------------
+    def scores(self, weights: Dict[str, float]) -> array:
+        """
+        Weighted composite of the rows' normalized components (ratings /10,
+        RT /100, log votes and recency relative to the pool); components a
+        row doesn't know yet leave their weight to the others.
+        """
+        n = len(self)
+        if not n:
+            return array("f")
+        w = {k: float(weights.get(k, 0.0)) for k in RANK_COMPONENTS}
+        top_votes = math.log10(1 + max(self.votes))
+        years = [y for y in self.years if y]
+        first = min(years) if years else 0
+        span = max(1, max(years) - first) if years else 1
+
+        def scaled(column, factor):
+            return map(mul, column, repeat(factor))
+
+        votes = (
+            scaled(map(math.log10, map(add, self.votes, repeat(1))), 1 / top_votes)
+            if top_votes
+            else repeat(0.0, n)
+        )
+        recency = map(
+            mul,
+            scaled(map(sub, self.years, repeat(first)), 1 / span),
+            map(bool, self.years),  # unknown year: 0
+        )
+        # NaN != NaN marks the unknown IMDb / RT values; max(0.0, NaN) is 0.0
+        imdb_known = array("f", map(eq, self.imdb, self.imdb))
+        rt_known = array("f", map(eq, self.rt, self.rt))
+        total = array("f", scaled(self.tmdb, w["tmdb"] / 10))
+        for column in (
+            scaled(votes, w["votes"]),
+            scaled(recency, w["recency"]),
+            scaled(map(max, repeat(0.0), self.imdb), w["imdb"] / 10),
+            scaled(map(max, repeat(0.0), self.rt), w["rt"] / 100),
+        ):
+            total = array("f", map(add, total, column))
+        weight = map(
+            add,
+            repeat(w["tmdb"] + w["votes"] + w["recency"]),
+            map(add, scaled(imdb_known, w["imdb"]), scaled(rt_known, w["rt"])),
+        )
+        # All weights zero: every score is 0 (and nothing is divided by 0)
+        return array("f", map(truediv, total, map(max, weight, repeat(1e-9))))
+
+    def ranked(
+        self, weights: Dict[str, float], keep: bytearray = None
+    ) -> Iterator[dict]:
+        """Slim items of the kept rows, best score first."""
+        scores = self.scores(weights)
+        rows = list(
+            compress(range(len(self)), keep) if keep is not None else range(len(self))
+        )
+        rows.sort(key=scores.__getitem__, reverse=True)
+        for i in rows:
+            yield dict(self.items[i], _score=round(scores[i], 3))
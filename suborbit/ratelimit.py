@@ -0,0 +1,68 @@
+# ratelimit.py
+# Per-provider token buckets shared by all pipeline threads
+
+import threading, time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Token bucket (rate requests/second, up to `burst` at once) combined with
+    a cap on concurrent in-flight requests. rate <= 0 disables throttling.
+    """
+
+    def __init__(
+        self, name: str, rate: float, burst: int = 1, concurrency: int = 0
+    ) -> None:
+        self.name = name
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = (
+            threading.BoundedSemaphore(concurrency) if concurrency > 0 else None
+        )
+        self.waited = 0.0  # total seconds spent sleeping for tokens
+        self.waits = 0  # number of times a caller had to sleep
+
+    def acquire(self, cancel: Optional[threading.Event] = None) -> bool:
+        """Block until a token is available. Returns False if `cancel` was set."""
+        if self.rate <= 0:
+            return not (cancel and cancel.is_set())
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._stamp) * self.rate
+                )
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+                self.waited += wait
+                self.waits += 1
+            if cancel:
+                if cancel.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+    @contextmanager
+    def slot(self, cancel: Optional[threading.Event] = None):
+        """
+        Hold a concurrency slot and a token for one request.
+        Yields False (without a token) if `cancel` was set while waiting.
+        """
+        if self._slots:
+            while not self._slots.acquire(timeout=0.5):
+                if cancel and cancel.is_set():
+                    yield False
+                    return
+        try:
+            yield self.acquire(cancel)
+        finally:
+            if self._slots:
+                self._slots.release()
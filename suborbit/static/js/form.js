@@ -40,12 +40,15 @@ document.addEventListener("DOMContentLoaded", () => {
       "hu","ro","id","uk"
     ];
 
+    // One code or a comma-separated list of them ("fi,sv")
     function validateLang() {
-      let val = langInput.value.replace(/[^a-zA-Z]/g, "")
-        .toLowerCase().slice(0, 2);
+      let val = langInput.value.replace(/[^a-zA-Z,]/g, "")
+        .toLowerCase().slice(0, 14);
       langInput.value = val;
 
-      const isValid = /^[a-z]{2}$/.test(val) && validLangs.includes(val);
+      const codes = val.split(",").filter((c) => c.length > 0);
+      const isValid = codes.length > 0 &&
+        codes.every((c) => /^[a-z]{2}$/.test(c) && validLangs.includes(c));
       langInput.classList.toggle("border-green-500", isValid);
       langInput.classList.toggle("border-red-500", !isValid && val.length > 0);
       langHint.classList.toggle("opacity-100", !isValid && val.length > 0);
@@ -56,10 +59,12 @@ document.addEventListener("DOMContentLoaded", () => {
 
     langInput.addEventListener("input", validateLang);
     langInput.addEventListener("blur", () => {
-      if (langInput.value.length === 1) {
-        langInput.value = "";
-        langHint.classList.add("opacity-100");
-        localStorage.removeItem(storageKey);
+      // Drop incomplete codes ("fi,s" -> "fi")
+      const codes = langInput.value.split(",").filter((c) => c.length === 2);
+      if (codes.join(",") !== langInput.value) {
+        langInput.value = codes.join(",");
+        if (!langInput.value) langHint.classList.add("opacity-100");
+        validateLang();
       }
     });
 
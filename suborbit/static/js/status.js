@@ -26,32 +26,76 @@ document.addEventListener("DOMContentLoaded", () => {
   // ----------------------------------------
   // 2️⃣ Log coloring helper
   // ----------------------------------------
-  function colorizeLogs(lines) {
-    return lines.map(line => {
-      if (line.startsWith("❌")) return `<span class="text-red-400">${line}</span>`;
-      if (line.startsWith("✅")) return `<span class="text-green-400">${line}</span>`;
-      if (line.startsWith("📀")) return `<span class="text-yellow-400">${line}</span>`;
-      if (line.startsWith("🎬")) return `<span class="text-blue-400">${line}</span>`;
-      return line;
-    }).join("<br>");
+  const MAX_LOG_LINES = 1000;
+
+  function escapeHtml(text) {
+    return text.replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;");
+  }
+
+  function colorizeLine(line) {
+    line = escapeHtml(line);
+    if (line.startsWith("❌")) return `<span class="text-red-400">${line}</span>`;
+    if (line.startsWith("✅")) return `<span class="text-green-400">${line}</span>`;
+    if (line.startsWith("📀")) return `<span class="text-yellow-400">${line}</span>`;
+    if (line.startsWith("🎬")) return `<span class="text-blue-400">${line}</span>`;
+    return line;
   }
 
   // ----------------------------------------
-  // 3️⃣ Fetch logs
+  // 3️⃣ Log stream (only new lines are sent)
   // ----------------------------------------
+  let logCursor = 0;
+
+  function clearLogs() {
+    logDiv.innerHTML = "";
+  }
+
+  function appendLogs(records) {
+    if (!records.length) return;
+    const html = records.map(r => `<div>${colorizeLine(r.msg)}</div>`).join("");
+    logDiv.insertAdjacentHTML("beforeend", html);
+    while (logDiv.childElementCount > MAX_LOG_LINES) {
+      logDiv.firstElementChild.remove();
+    }
+    logCursor = records[records.length - 1].seq;
+
+    if (autoscroll.checked) {
+      logDiv.scrollTop = logDiv.scrollHeight;
+    }
+  }
+
+  function streamLogs() {
+    const source = new EventSource(window.SubOrbitConfig.urls.logStream);
+    source.onmessage = e => appendLogs([JSON.parse(e.data)]);
+    source.addEventListener("reset", clearLogs);
+    // EventSource reconnects by itself, resuming from the last event id;
+    // refused outright (503: too many open streams), it falls back to polling
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        console.debug("[SubOrbit] log stream refused, polling instead");
+        pollLogs();
+      } else {
+        console.debug("[SubOrbit] log stream reconnecting");
+      }
+    };
+  }
+
+  function pollLogs() {
+    fetchLogs();
+    setInterval(fetchLogs, LOG_INTERVAL);
+  }
+
+  // Fallback for browsers without EventSource: poll with a cursor
   async function fetchLogs() {
     try {
-      const r = await fetch("/logs");
+      const r = await fetch(`/logs?after=${logCursor}`);
       if (!r.ok) throw new Error(`HTTP ${r.status}`);
-      const lines = await r.json();
-      logDiv.innerHTML = colorizeLogs(lines);
-
-      if (autoscroll.checked) {
-        logDiv.scrollTop = logDiv.scrollHeight;
-      }
+      const data = await r.json();
+      if (data.reset) clearLogs();
+      appendLogs(data.records);
+      logCursor = data.cursor;
     } catch (err) {
       console.error("Log fetch failed:", err);
-      logDiv.innerHTML = `<p class='text-red-400 text-sm'>Error loading logs.</p>`;
     }
   }
 
@@ -80,6 +124,13 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  function updateQueueDisplay(queued) {
+    // Stop only ends the running job; queued runs are dropped separately
+    const clearForm = document.getElementById("clear-form");
+    clearForm.style.display = queued > 0 ? "inline" : "none";
+    document.getElementById("clear-btn").textContent = `Clear queue (${queued})`;
+  }
+
  
   let lastState = "Idle";
 
@@ -90,6 +141,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
       const running = data.running;
       updateStatusDisplay(running);
+      updateQueueDisplay(data.queued);
 
       if (running) {
         // While discovery runs, check for new posters
@@ -109,11 +161,14 @@ document.addEventListener("DOMContentLoaded", () => {
 
 
   // ----------------------------------------
-  // 5️⃣ Polling setup
+  // 5️⃣ Streaming / polling setup
   // ----------------------------------------
-  fetchLogs();
+  if (window.EventSource) {
+    streamLogs();
+  } else {
+    pollLogs();
+  }
   updateStatus();
-  setInterval(fetchLogs, LOG_INTERVAL);
   setInterval(updateStatus, STATUS_INTERVAL);
 
 
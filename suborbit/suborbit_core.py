@@ -1,21 +1,40 @@
 # suborbit_core.py
-# Cleaned, sequential core suitable for CLI or Flask UI import
+# Cleaned core suitable for CLI or Flask UI import
 
-import csv, json, os, time, random, threading
+import atexit, contextvars, csv, heapq, json, math, os, time, random, threading, uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Optional
+from urllib.parse import urlparse
 
 import requests
 
+from .cache import BaseCache, create_cache, import_json_cache
+from .checkpoint import Checkpoint
 from .config import Config
-
-
-from suborbit.blueprints.radarr import mark_radarr_updated
+from .filters import (
+    FilterPredicate,
+    active_predicates,
+    fails_filters,
+    make_filters,
+    run_predicates,
+)
+from .http_client import HttpClient, parse_host_limits
+from .logbuffer import BufferedLogWriter, LogBuffer, LogFollower
+from .metrics import Metrics
+from .movie import CSV_FIELDS, Movie
+from .posters import PosterCache
+from .ranking import CandidatePool, parse_weights
+from .ratelimit import RateLimiter
 
 
 # ----------------- Stop mechanism -----------------
 def check_stop():
-    if STOP_EVENT.is_set():
+    run = current_run()
+    if run and run.cancel.is_set():
         raise RuntimeError("Stop requested")
 
 
@@ -32,54 +51,230 @@ else:
 
 # Now define paths relative to that base
 LOG_PATH = BASE_CONFIG / "suborbit.log"
-CACHE_FILE = BASE_CONFIG / "cache.json"
+CACHE_FILE = BASE_CONFIG / "cache.json"  # legacy, migrated into CACHE_DB
+CACHE_DB = BASE_CONFIG / "cache.db"
+STATE_DB = BASE_CONFIG / "state.db"
 CSV_FILE = BASE_CONFIG / "suborbit.csv"
+CHECKPOINT_DIR = BASE_CONFIG / "checkpoints"
+# Run id of command-line runs: one checkpoint, resumed by the next CLI run
+# with the same settings (other settings start over and replace it)
+CLI_RUN_ID = "cli"
+POSTER_DIR = BASE_CONFIG / "posters"
 
 
 # ----------------- Logging -----------------
-def log(msg: str) -> None:
+# Recent records live in memory for the UI; the file is written in batches.
+# With several web workers the buffer follows the file instead, so every
+# worker shows the lines of runs executing in the others.
+LOG_BUFFER = LogBuffer(Config.LOG_BUFFER_LINES)
+LOG_WRITER = BufferedLogWriter(LOG_PATH, flush_interval=Config.LOG_FLUSH_INTERVAL)
+LOG_FOLLOWER = LogFollower(LOG_PATH, LOG_BUFFER) if Config.WEB_WORKERS > 1 else None
+atexit.register(LOG_WRITER.close)
+
+
+def log(msg: str, level: str = "info") -> None:
+    if LOG_FOLLOWER is None:
+        LOG_BUFFER.append(msg, level)
+    run = current_run()
+    if run:
+        run.log.append(msg, level)
     if not Config.QUIET_MODE:
         print(msg, flush=True)
     try:
-        LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with LOG_PATH.open("a", encoding="utf-8") as f:
-            f.write(msg + "\n")
+        LOG_WRITER.write(msg)
     except Exception:
         # Logging should never crash the run
         pass
 
 
-# ----------------- Cache -----------------
-def load_cache() -> Dict[str, Any]:
-    if CACHE_FILE and Path(CACHE_FILE).exists():
-        try:
-            with Path(CACHE_FILE).open("r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+def clear_log() -> None:
+    """Start a fresh log (new run): empties the file and the buffer."""
+    if LOG_FOLLOWER is None:
+        LOG_BUFFER.clear()  # a follower notices the truncation itself
+    try:
+        LOG_WRITER.truncate()
+    except Exception:
+        pass
 
 
-def save_cache(cache: Dict[str, Any]) -> None:
+def _load_log_tail() -> None:
+    """Seed the buffer with the previous log after a restart."""
     try:
-        Path(CACHE_FILE).parent.mkdir(parents=True, exist_ok=True)
-        with Path(CACHE_FILE).open("w", encoding="utf-8") as f:
-            json.dump(cache, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        log(f"[WARN] Failed to save cache: {e}")
+        with LOG_PATH.open("r", encoding="utf-8") as f:
+            lines = deque(f, maxlen=Config.LOG_BUFFER_LINES)
+    except OSError:
+        return
+    for line in lines:
+        LOG_BUFFER.append(line.rstrip("\n"))
+
+
+if LOG_FOLLOWER:
+    LOG_FOLLOWER.start()
+else:
+    _load_log_tail()
+
+
+# ----------------- Cache -----------------
+CACHE_TTLS = {
+    "tmdb": Config.CACHE_TTL_TMDB,
+    "omdb": Config.CACHE_TTL_OMDB,
+    "opensubtitles": Config.CACHE_TTL_OS_FOUND,
+    "trakt": Config.CACHE_TTL_TRAKT,
+    "decisions": Config.DECISION_TTL,
+    "http": Config.CACHE_TTL_HTTP,
+}
+_cache: Optional[BaseCache] = None
+_cache_lock = threading.Lock()
+
+
+def load_cache() -> BaseCache:
+    """
+    Return the shared metadata cache, opening it on first use.
+    A legacy cache.json is imported once and renamed.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = create_cache(
+                    Config.CACHE_BACKEND,
+                    CACHE_DB,
+                    ttls=CACHE_TTLS,
+                    max_entries=Config.CACHE_MAX_ENTRIES,
+                )
+            except Exception as e:
+                log(f"[WARN] Failed to open cache ({e}), using memory cache")
+                _cache = create_cache(
+                    "memory", CACHE_DB, CACHE_TTLS, Config.CACHE_MAX_ENTRIES
+                )
+            try:
+                migrated = import_json_cache(_cache, CACHE_FILE)
+                if migrated:
+                    log(f"🗃️ Migrated {migrated} entries from {CACHE_FILE.name}")
+            except Exception as e:
+                log(f"[WARN] Failed to migrate {CACHE_FILE.name}: {e}")
+        return _cache
+
+
+# ----------------- Shared state -----------------
+# Small values every web worker must agree on (UI caches, update flags,
+# auth progress) live in state.db rather than in module globals
+_state: Optional[BaseCache] = None
+_state_lock = threading.Lock()
+
+
+def shared_state() -> BaseCache:
+    """Return the cross-process key/value store, opening it on first use."""
+    global _state
+    with _state_lock:
+        if _state is None:
+            try:
+                _state = create_cache("sqlite", STATE_DB)
+            except Exception as e:
+                log(f"[WARN] Failed to open {STATE_DB.name} ({e}), state is per-worker")
+                _state = create_cache("memory", STATE_DB)
+        return _state
+
+
+# ----------------- Metrics -----------------
+METRICS = Metrics()
+METRICS.describe("suborbit_http_requests_total", "HTTP requests by provider/status")
+METRICS.describe("suborbit_http_request_seconds", "HTTP request latency")
+METRICS.describe("suborbit_cache_requests_total", "Cache lookups by result")
+METRICS.describe("suborbit_ratelimit_wait_seconds_total", "Time spent rate limited")
+METRICS.describe("suborbit_candidates_total", "Candidates by pipeline outcome")
+METRICS.describe("suborbit_movies_added_total", "Movies added to Radarr")
+METRICS.describe("suborbit_known_rejects_total", "Candidates skipped as known rejects")
+
+# Base URL -> provider label (matched by prefix, so stand-in servers work too)
+PROVIDER_URLS = {
+    Config.TMDB_API_URL: "tmdb",
+    Config.OMDB_API_URL: "omdb",
+    Config.OS_API_URL: "opensubtitles",
+    Config.TRAKT_API_URL: "trakt",
+    Config.RADARR_API: "radarr",
+}
+
+
+def provider_for(url: str) -> str:
+    for base, provider in PROVIDER_URLS.items():
+        if base and url.startswith(base.rstrip("/")):
+            return provider
+    return (urlparse(url).hostname or "").lower() or "other"
+
+
+# Set while a poster is fetched: background UI work, kept out of run summaries
+_poster_fetch: contextvars.ContextVar = contextvars.ContextVar(
+    "suborbit_poster_fetch", default=False
+)
+
+
+def observe_http(method: str, url: str, status: Optional[int], seconds: float):
+    provider = "posters" if _poster_fetch.get() else provider_for(url)
+    METRICS.inc(
+        "suborbit_http_requests_total", provider=provider, status=status or "error"
+    )
+    METRICS.observe("suborbit_http_request_seconds", seconds, provider=provider)
+
+
+def count_candidate(outcome: str, rejections: Counter = None) -> None:
+    """Count a candidate's outcome (a rejecting stage or 'accepted')."""
+    if rejections is not None and outcome != "accepted":
+        rejections[outcome] += 1
+    METRICS.inc("suborbit_candidates_total", outcome=outcome)
+
+
+def collect_metrics() -> str:
+    """Refresh values tracked by the cache and limiters, then render."""
+    cache = load_cache()
+    for ns, n in list(cache.hits.items()):
+        METRICS.set_total(
+            "suborbit_cache_requests_total", n, namespace=ns, result="hit"
+        )
+    for ns, n in list(cache.misses.items()):
+        METRICS.set_total(
+            "suborbit_cache_requests_total", n, namespace=ns, result="miss"
+        )
+    for name, limiter in LIMITERS.items():
+        METRICS.set_total(
+            "suborbit_ratelimit_wait_seconds_total", limiter.waited, provider=name
+        )
+    return METRICS.render_prometheus()
 
 
 # ----------------- HTTP helpers -----------------
-SESSION = requests.Session()
-SESSION.headers.update({"Accept": "application/json"})
+HTTP = HttpClient(
+    pool_size=Config.HTTP_POOL_SIZE,
+    host_limits=parse_host_limits(Config.HTTP_HOST_CONCURRENCY),
+    retries=Config.HTTP_RETRIES,
+    backoff=Config.HTTP_BACKOFF,
+    log=lambda msg: log(msg, level="debug") if Config.DEBUG else None,
+    observe=observe_http,
+    cache_max_bytes=Config.HTTP_CACHE_MAX_BYTES,
+)
 
 
 def http_get(
-    url: str, *, params: dict = None, headers: dict = None, timeout: int = 15
+    url: str,
+    *,
+    params: dict = None,
+    headers: dict = None,
+    timeout: int = 15,
+    cache: bool = False,
 ) -> Optional[requests.Response]:
+    """
+    GET with retries; None if no response. With `cache`, the response is
+    kept with its validators (see HttpClient) and reused or revalidated.
+    """
+    if cache and HTTP.response_cache is None and Config.HTTP_CACHE:
+        HTTP.response_cache = load_cache()
     try:
-        resp = SESSION.get(
-            url, params=params or {}, headers=headers or {}, timeout=timeout
+        resp = HTTP.get(
+            url,
+            params=params or {},
+            headers=headers or {},
+            timeout=timeout,
+            cache=cache,
         )
         return resp
     except Exception as e:
@@ -91,42 +286,130 @@ def http_post(
     url: str, *, json_body: dict, headers: dict = None, timeout: int = 20
 ) -> Optional[requests.Response]:
     try:
-        resp = SESSION.post(url, json=json_body, headers=headers or {}, timeout=timeout)
+        resp = HTTP.post(url, json=json_body, headers=headers or {}, timeout=timeout)
         return resp
     except Exception as e:
         log(f"[HTTP] POST failed {url}: {e}")
         return None
 
 
+# ----------------- Rate limits -----------------
+LIMITERS = {
+    "tmdb": RateLimiter(
+        "tmdb", Config.TMDB_RATE, burst=10, concurrency=Config.TMDB_WORKERS
+    ),
+    "omdb": RateLimiter("omdb", Config.OMDB_RATE, concurrency=Config.OMDB_WORKERS),
+    "opensubtitles": RateLimiter(
+        "opensubtitles", Config.OS_RATE, concurrency=Config.OS_WORKERS
+    ),
+    "trakt": RateLimiter("trakt", Config.TRAKT_RATE, concurrency=1),
+}
+
+
+@contextmanager
+def throttle(provider: str):
+    """Wait for the provider's rate limiter; aborts the run if a stop arrives."""
+    run = current_run()
+    with LIMITERS[provider].slot(run.cancel if run else None) as ok:
+        if not ok:
+            raise RuntimeError("Stop requested")
+        yield
+
+
 # ----------------- API: TMDB -----------------
-def tmdb_details(tmdb_id: int) -> Optional[dict]:
-    url = f"https://api.themoviedb.org/3/movie/{tmdb_id}"
-    resp = http_get(url, params={"api_key": Config.TMDB_API_KEY, "language": "en-US"})
+def tmdb_details(tmdb_id: int) -> Optional[Movie]:
+    """
+    Movie details as a Movie (only the fields we use), cached by tmdb_id.
+    external_ids is appended so the imdb_id always comes back in this call.
+    """
+    cache = load_cache()
+    cached = cache.get("tmdb", tmdb_id)
+    if cached is not None:
+        return Movie.from_cache(tmdb_id, cached)
+
+    url = f"{Config.TMDB_API_URL}/movie/{tmdb_id}"
+    with throttle("tmdb"):
+        resp = http_get(
+            url,
+            params={
+                "api_key": Config.TMDB_API_KEY,
+                "language": "en-US",
+                "append_to_response": "external_ids",
+            },
+        )
     if not resp or resp.status_code != 200:
         if Config.DEBUG:
             log(f"[TMDB] details {tmdb_id} status={getattr(resp, 'status_code', None)}")
         return None
-    return resp.json()
+    movie = Movie.from_details(tmdb_id, resp.json())
+    cache.set("tmdb", tmdb_id, movie.to_cache())
+    return movie
+
+
+def tmdb_find_imdb(imdb_id: str) -> Optional[int]:
+    """TMDB id of a movie known by its IMDb id (cached, misses too)."""
+    cache = load_cache()
+    cached = cache.get("tmdb", f"find:{imdb_id}")
+    if cached is not None:
+        return cached or None
 
+    with throttle("tmdb"):
+        resp = http_get(
+            f"{Config.TMDB_API_URL}/find/{imdb_id}",
+            params={"api_key": Config.TMDB_API_KEY, "external_source": "imdb_id"},
+        )
+    if not resp or resp.status_code != 200:
+        return None
+    results = resp.json().get("movie_results") or []
+    tmdb_id = int(results[0]["id"]) if results else 0
+    cache.set("tmdb", f"find:{imdb_id}", tmdb_id)
+    return tmdb_id or None
 
-def tmdb_discover(year: int, page: int = 1) -> List[dict]:
-    url = "https://api.themoviedb.org/3/discover/movie"
+
+def tmdb_discover(
+    year: int, page: int = 1, extra_params: dict = None
+) -> Optional[List[dict]]:
+    """One /discover/movie page; None if the request failed (after retries)."""
+    url = f"{Config.TMDB_API_URL}/discover/movie"
     params = {
         "api_key": Config.TMDB_API_KEY,
         "primary_release_year": year,
         "sort_by": "popularity.desc",
         "page": page,
+        **(extra_params or {}),
     }
-    resp = http_get(url, params=params)
+    with throttle("tmdb"):
+        resp = http_get(url, params=params, cache=True)
     if not resp or resp.status_code != 200:
         if Config.DEBUG:
             log(
                 f"[TMDB] discover {year} p{page} status={getattr(resp, 'status_code', None)}"
             )
-        return []
+        return None
     return resp.json().get("results", [])
 
 
+def tmdb_genre_map() -> Dict[int, str]:
+    """TMDB movie genre id -> name (cached)."""
+    cache = load_cache()
+    cached = cache.get("tmdb", "genres")
+    if cached:
+        return {int(k): v for k, v in cached.items()}
+    if not Config.TMDB_API_KEY:
+        return {}
+    resp = http_get(
+        f"{Config.TMDB_API_URL}/genre/movie/list",
+        params={"api_key": Config.TMDB_API_KEY, "language": "en-US"},
+        timeout=10,
+    )
+    if not resp or resp.status_code != 200:
+        log(f"[TMDB] genre list status={getattr(resp, 'status_code', None)}")
+        return {}
+    genres = {g["id"]: g["name"] for g in resp.json().get("genres", [])}
+    cache.set("tmdb", "genres", genres)
+    return genres
+
+
 # ----------------- API: OMDb (IMDb + RottenTomatoes) -----------------
 def omdb_ratings(imdb_id: str) -> Tuple[Optional[float], Optional[int], Optional[int]]:
     """
@@ -134,10 +417,11 @@ def omdb_ratings(imdb_id: str) -> Tuple[Optional[float], Optional[int], Optional
     """
     if not (imdb_id and Config.OMDB_KEY):
         return None, None, None
-    resp = http_get(
-        "http://www.omdbapi.com/",
-        params={"i": imdb_id, "apikey": Config.OMDB_KEY},
-    )
+    with throttle("omdb"):
+        resp = http_get(
+            Config.OMDB_API_URL,
+            params={"i": imdb_id, "apikey": Config.OMDB_KEY},
+        )
     if not resp or resp.status_code != 200:
         if Config.DEBUG:
             log(f"[OMDb] status={getattr(resp, 'status_code', None)} imdb={imdb_id}")
@@ -160,32 +444,371 @@ def omdb_ratings(imdb_id: str) -> Tuple[Optional[float], Optional[int], Optional
 
 
 # ----------------- API: OpenSubtitles -----------------
-def has_subs(subtitle_lang: str, imdb_id: int) -> bool:
+# A run may want several subtitle languages ("fi,sv"): "any" accepts a movie
+# with one of them, "all" needs every one, "ranked" is "any" with the list
+# in order of preference (the best language found is the movie's).
+SUBTITLE_MODES = ("any", "all", "ranked")
+# Where candidates come from: TMDB discover (then subtitles are checked per
+# movie) or the OpenSubtitles listing itself (subtitle-first)
+DISCOVERY_MODES = ("tmdb", "subtitles")
+
+
+def subtitle_score(attrs: dict) -> float:
     """
-    Check OpenSubtitles for subtitles that are not AI/machine translated.
+    0-95 usefulness of one upload from its OpenSubtitles attributes:
+    downloads (log scale, up to 40), rating damped by its vote count (20),
+    trusted uploader (15), not hearing-impaired only (10), a release name
+    and frame rate to match files against (5 each). Uploads translating
+    only the foreign parts count a fifth.
     """
+    downloads = int(attrs.get("download_count") or 0)
+    score = min(40.0, 10 * math.log10(1 + downloads))
+    votes = int(attrs.get("votes") or 0)
+    rating = float(attrs.get("ratings") or 0) if votes else 5.0
+    score += 2 * (5 + (rating - 5) * votes / (votes + 5))  # few votes ~ neutral
+    if attrs.get("from_trusted"):
+        score += 15
+    if not attrs.get("hearing_impaired"):
+        score += 10
+    if attrs.get("release"):
+        score += 5
+    if attrs.get("fps"):
+        score += 5
+    if attrs.get("foreign_parts_only"):
+        score *= 0.2
+    return score
+
+
+def language_score(items: List[dict]) -> Tuple[float, Optional[str]]:
+    """A language's score (its best upload, +1 per upload up to 5) and that release."""
+    scored = [
+        (subtitle_score(i.get("attributes") or {}), i.get("attributes") or {})
+        for i in items
+    ]
+    if not scored:
+        return 0.0, None
+    best, attrs = max(scored, key=lambda s: s[0])
+    return round(min(100.0, best + min(5, len(scored))), 1), attrs.get("release")
+
+
+def parse_languages(raw) -> List[str]:
+    """'FI, sv' (or a list) -> ['fi', 'sv'], order kept, duplicates dropped."""
+    parts = raw.split(",") if isinstance(raw, str) else list(raw or [])
+    langs: List[str] = []
+    for part in parts:
+        lang = str(part).strip().lower()
+        if lang and lang not in langs:
+            langs.append(lang)
+    return langs
+
+
+def _fetch_subtitles(imdb_id: str, langs: List[str]) -> Optional[Dict[str, dict]]:
+    """One /subtitles request for several languages, split per language."""
     headers = {"Api-Key": Config.OS_API_KEY, "User-Agent": "SubOrbit/1.0"}
     params = {
-        "languages": subtitle_lang,
+        "languages": ",".join(sorted(langs)),
         "imdb_id": imdb_id,
         "type": "movie",
         "ai_translated": "exclude",
         "machine_translated": "exclude",
     }
-    resp = http_get(
-        "https://api.opensubtitles.com/api/v1/subtitles", params=params, headers=headers
-    )
+    # OS_RATE (default 1/OS_DELAY) keeps us gentle to the OS API
+    with throttle("opensubtitles"):
+        resp = http_get(
+            f"{Config.OS_API_URL}/subtitles",
+            params=params,
+            headers=headers,
+        )
     if not resp or resp.status_code != 200:
         if Config.DEBUG:
             log(f"[OS] imdb_id={imdb_id} status={getattr(resp, 'status_code', None)}")
-        return False
+        return None
     data = resp.json()
-    time.sleep(Config.OS_DELAY)  # be gentle to OS API
-    return len(data.get("data", [])) > 0
+    items = data.get("data", [])
+    by_lang: Dict[str, list] = {lang: [] for lang in langs}
+    for item in items:
+        lang = ((item.get("attributes") or {}).get("language") or "").lower()
+        if lang in by_lang:
+            by_lang[lang].append(item)
+
+    info = {}
+    for lang, found in by_lang.items():
+        uploads = [(i.get("attributes") or {}).get("upload_date") or "" for i in found]
+        count = len(found)
+        if len(langs) == 1:
+            count = int(data.get("total_count") or count)
+        score, release = language_score(found)
+        info[lang] = {
+            "found": count > 0,
+            "count": count,
+            "newest": max(uploads) if any(uploads) else None,
+            "score": score,
+            "release": release,
+        }
+
+    # A language may only be missing from the first page of a long result
+    unseen = [l for l in langs if not info[l]["found"]]
+    if len(langs) > 1 and unseen and int(data.get("total_pages") or 1) > 1:
+        for lang in unseen:
+            single = _fetch_subtitles(imdb_id, [lang])
+            if single is None:
+                return None
+            info.update(single)
+    return info
+
+
+def subtitle_info(
+    subtitle_lang, imdb_id: str, known: Dict[str, dict] = None
+) -> Optional[Dict[str, dict]]:
+    """
+    Look up non-AI/machine translated subtitles for one or more languages.
+    Returns {lang: {"found", "count", "newest", "score", "release"}} or
+    None if the request failed. Answers are cached per (imdb_id, language) and the languages
+    not cached yet are asked in a single request; "not found" entries use
+    their own TTL (CACHE_TTL_OS_MISSING) so the common negatives are
+    rechecked less often than hits. `known` answers (from the subtitle
+    feed) are used as they are.
+    """
+    cache = load_cache()
+    info: Dict[str, dict] = {}
+    missing = []
+    for lang in parse_languages(subtitle_lang):
+        if known and lang in known:
+            info[lang] = known[lang]
+            continue
+        cached = cache.get("opensubtitles", f"{imdb_id}:{lang}")
+        # Hits cached before scoring existed are asked again
+        if isinstance(cached, dict) and ("score" in cached or not cached["found"]):
+            info[lang] = cached
+        else:
+            missing.append(lang)
+    if not missing:
+        return info
+
+    fetched = _fetch_subtitles(imdb_id, missing)
+    if fetched is None:
+        return None
+    for lang, found in fetched.items():
+        ttl = (
+            Config.CACHE_TTL_OS_FOUND if found["found"] else Config.CACHE_TTL_OS_MISSING
+        )
+        cache.set("opensubtitles", f"{imdb_id}:{lang}", found, ttl=ttl)
+        info[lang] = found
+    return info
+
+
+def usable_subs(info: Optional[dict], min_score: float) -> bool:
+    """Subtitles exist and score at least `min_score` (0 = any upload)."""
+    if not (info and info.get("found")):
+        return False
+    return not min_score or info.get("score", 0) >= min_score
+
+
+def subtitle_verdict(
+    info: Optional[Dict[str, dict]],
+    subtitle_lang,
+    mode: str = "any",
+    min_score: float = Config.SUBTITLE_MIN_SCORE,
+) -> Tuple[bool, List[str]]:
+    """Whether the usable languages satisfy `mode`, and those (in order)."""
+    langs = parse_languages(subtitle_lang)
+    found = [l for l in langs if usable_subs((info or {}).get(l), min_score)]
+    if mode == "all":
+        return bool(langs) and len(found) == len(langs), found
+    return bool(found), found
+
+
+def has_subs(subtitle_lang, imdb_id: str, mode: str = "any") -> bool:
+    """
+    Check OpenSubtitles for subtitles that are not AI/machine translated.
+    """
+    ok, _ = subtitle_verdict(subtitle_info(subtitle_lang, imdb_id), subtitle_lang, mode)
+    return ok
 
 
 # ----------------- API: Radarr -----------------
-def radarr_exists(tmdb_id: int) -> bool:
+def _slim_radarr_movie(m: dict) -> dict:
+    """Keep only the Radarr movie fields SubOrbit actually reads."""
+    return {
+        "id": m.get("id"),
+        "tmdbId": m.get("tmdbId"),
+        "imdbId": m.get("imdbId"),
+        "title": m.get("title"),
+        "year": m.get("year"),
+        "added": m.get("added", ""),
+        "overview": m.get("overview", ""),
+        "ratings": m.get("ratings") or {},
+        "images": [i for i in m.get("images", []) if i.get("coverType") == "poster"],
+    }
+
+
+class RadarrLibrary:
+    """
+    In-memory snapshot of the Radarr library.
+    Pulls /movie once and answers lookups from tmdbId/imdbId indexes,
+    so the pipeline and the UI routes don't refetch the whole library.
+    The `recent_size` newest additions are kept sorted for the carousel;
+    `generation` changes whenever they do.
+    """
+
+    def __init__(
+        self,
+        ttl: int = Config.RADARR_LIBRARY_TTL,
+        recent_size: int = Config.RADARR_RECENT_SIZE,
+    ):
+        self.ttl = ttl
+        self.recent_size = recent_size
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._movies: Dict[int, dict] = {}
+        self._recent: List[Tuple[str, int]] = []  # (added, key), newest first
+        self._tmdb_keys: Dict[int, int] = {}  # tmdbId -> key in _movies
+        self._imdb_ids: set = set()
+        self._fetched_at = 0.0
+        self._marked = 0.0  # last change this process announced
+        self._validator: Tuple = (None, None)  # ETag / Last-Modified of the snapshot
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def is_fresh(self) -> bool:
+        if not self._loaded or time.time() - self._fetched_at >= self.ttl:
+            return False
+        # Stale if another worker changed the library after our snapshot
+        changed = shared_state().get("radarr", "version", 0)
+        return changed <= max(self._fetched_at, self._marked)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Fetch the full /movie list unless the snapshot is still fresh."""
+        if not force and self.is_fresh():
+            return True
+        if not (Config.RADARR_API and Config.RADARR_KEY):
+            return False
+        headers = {"X-Api-Key": Config.RADARR_KEY}
+        if self._loaded:
+            # Revalidate our snapshot; the library itself is never stored
+            etag, modified = self._validator
+            if etag:
+                headers["If-None-Match"] = etag
+            if modified:
+                headers["If-Modified-Since"] = modified
+        resp = http_get(
+            f"{Config.RADARR_API.rstrip('/')}/movie", headers=headers, timeout=30
+        )
+        if resp is not None and resp.status_code == 304 and self._loaded:
+            self._fetched_at = time.time()
+            return True
+        if not resp or resp.status_code != 200:
+            log(f"[Radarr] library fetch status={getattr(resp, 'status_code', None)}")
+            return False
+        validator = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        if self._loaded and any(validator) and validator == self._validator:
+            # Same body as our snapshot: nothing to reindex
+            self._fetched_at = time.time()
+            return True
+        try:
+            movies = resp.json()
+        except Exception as e:
+            log(f"[Radarr] library fetch returned invalid JSON: {e}")
+            return False
+
+        with self._lock:
+            self._movies = {}
+            self._tmdb_keys = {}
+            self._imdb_ids = set()
+            for m in movies:
+                self._index(_slim_radarr_movie(m))
+            self._set_recent(
+                heapq.nlargest(
+                    self.recent_size,
+                    ((m["added"] or "", k) for k, m in self._movies.items()),
+                )
+            )
+            self._validator = validator
+            self._fetched_at = time.time()
+            self._loaded = True
+        if Config.DEBUG:
+            log(f"📚 Radarr library loaded: {len(self._movies)} movies")
+        return True
+
+    def _index(self, movie: dict) -> int:
+        key = movie.get("id") or -(movie.get("tmdbId") or 0)
+        self._movies[key] = movie
+        if movie.get("tmdbId"):
+            self._tmdb_keys[int(movie["tmdbId"])] = key
+        if movie.get("imdbId"):
+            self._imdb_ids.add(movie["imdbId"])
+        return key
+
+    def _set_recent(self, recent: List[Tuple[str, int]]) -> None:
+        if recent != self._recent:
+            self._recent = recent
+            self.generation += 1
+
+    def add(self, movie: dict) -> None:
+        """Record a movie we just added (Radarr's POST /movie response)."""
+        with self._lock:
+            slim = _slim_radarr_movie(movie)
+            key = self._index(slim)
+            if slim["added"]:
+                others = [r for r in self._recent if r[1] != key]
+                self._set_recent(
+                    heapq.nlargest(self.recent_size, others + [(slim["added"], key)])
+                )
+
+    def recent(self, offset: int = 0, limit: int = 10) -> Tuple[List[dict], int]:
+        """A page of the newest additions and how many are kept."""
+        with self._lock:
+            page = self._recent[offset : offset + limit]
+            return [self._movies[k] for _, k in page], len(self._recent)
+
+    def find(self, tmdb_id: int) -> Optional[dict]:
+        with self._lock:
+            key = self._tmdb_keys.get(int(tmdb_id))
+            return self._movies.get(key) if key is not None else None
+
+    def contains(self, tmdb_id: Optional[int] = None, imdb_id: str = None) -> bool:
+        with self._lock:
+            if tmdb_id and int(tmdb_id) in self._tmdb_keys:
+                return True
+            return bool(imdb_id and imdb_id in self._imdb_ids)
+
+    def movies(self) -> List[dict]:
+        with self._lock:
+            return list(self._movies.values())
+
+    def invalidate(self) -> None:
+        """Drop the snapshot here and in every other worker."""
+        with self._lock:
+            self._fetched_at = 0.0
+        shared_state().set("radarr", "version", time.time())
+
+    def mark_updated(self) -> None:
+        """Announce a change to every worker (and the UI carousel)."""
+        self._marked = time.time()
+        state = shared_state()
+        state.set("radarr", "version", self._marked)
+        state.set("radarr", "updated", True)
+
+    def pop_updated(self) -> bool:
+        """Return whether the library changed since the last call, and reset."""
+        return bool(shared_state().pop("radarr", "updated", False))
+
+
+RADARR_LIBRARY = RadarrLibrary()
+
+
+def mark_radarr_updated() -> None:
+    RADARR_LIBRARY.mark_updated()
+
+
+def radarr_exists(tmdb_id: int, imdb_id: str = None) -> bool:
+    if RADARR_LIBRARY.loaded:
+        return RADARR_LIBRARY.contains(tmdb_id, imdb_id)
+
+    # Snapshot unavailable: fall back to a single lookup
     url = f"{Config.RADARR_API}/movie"
     headers = {"X-Api-Key": Config.RADARR_KEY}
     resp = http_get(url, params={"tmdbId": tmdb_id}, headers=headers)
@@ -197,226 +820,766 @@ def radarr_exists(tmdb_id: int) -> bool:
         return False
 
 
-def radarr_add(
-    tmdb_id: int, title: str, root_folder: str = Config.ROOT_FOLDER
-) -> Tuple[bool, str]:
-    url = f"{Config.RADARR_API}/movie"
-    headers = {"X-Api-Key": Config.RADARR_KEY}
-    payload = {
+def _radarr_payload(
+    tmdb_id: int, title: str, root_folder: str, search: bool
+) -> Dict[str, Any]:
+    return {
         "tmdbId": tmdb_id,
         "qualityProfileId": Config.QUALITY_PROFILE_ID,
         "title": title,
         "titleSlug": str(tmdb_id),
         "rootFolderPath": root_folder,
         "monitored": True,
-        "addOptions": {"searchForMovie": bool(Config.SEARCH_FOR_MOVIE)},
+        "addOptions": {"searchForMovie": search},
     }
+
+
+def _radarr_post_movie(
+    tmdb_id: int, title: str, root_folder: str, search: bool
+) -> Tuple[bool, str, Optional[dict]]:
+    """POST /movie for one movie: (ok, msg, created movie)."""
+    url = f"{Config.RADARR_API}/movie"
+    headers = {"X-Api-Key": Config.RADARR_KEY}
+    payload = _radarr_payload(tmdb_id, title, root_folder, search)
     resp = http_post(url, json_body=payload, headers=headers)
-    if not resp:
-        return False, "no response"
+    if resp is None:
+        return False, "no response", None
     if resp.status_code == 201:
-        return True, "added"
+        try:
+            movie = resp.json()
+        except Exception:
+            movie = {"tmdbId": tmdb_id, "title": title}
+        RADARR_LIBRARY.add(movie)
+        prewarm_poster(movie)
+        return True, "added", movie
     text = resp.text or ""
     # tolerate 'already exists' semantics
     if resp.status_code in (400, 405) and (
         "MovieExistsValidator" in text or "been added" in text
     ):
-        return False, "exists"
-    return False, f"status={resp.status_code} {text[:200]}"
+        RADARR_LIBRARY.add({"tmdbId": tmdb_id, "title": title})
+        return False, "exists", None
+    return False, f"status={resp.status_code} {text[:200]}", None
 
 
-# ----------------- CSV -----------------
-def append_csv(row: Dict[str, Any]) -> None:
-    file = Path(CSV_FILE)
-    is_new = not file.exists()
-    file.parent.mkdir(parents=True, exist_ok=True)
-    with file.open("a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "title",
-                "year",
-                "tmdb_id",
-                "imdb_id",
-                "original_language",
-                "genres",
-                "tmdb_rating",
-                "imdb_rating",
-                "rt_score",
-                "vote_count",
-            ],
+def radarr_add(
+    tmdb_id: int, title: str, root_folder: str = Config.ROOT_FOLDER
+) -> Tuple[bool, str]:
+    ok, msg, _ = _radarr_post_movie(
+        tmdb_id, title, root_folder, bool(Config.SEARCH_FOR_MOVIE)
+    )
+    if ok:
+        mark_radarr_updated()
+    return ok, msg
+
+
+def radarr_search(movie_ids: List[int]) -> bool:
+    """One MoviesSearch command for several Radarr movie ids."""
+    resp = http_post(
+        f"{Config.RADARR_API}/command",
+        json_body={"name": "MoviesSearch", "movieIds": movie_ids},
+        headers={"X-Api-Key": Config.RADARR_KEY},
+    )
+    if resp is None or resp.status_code not in (200, 201):
+        log(
+            f"[Radarr] MoviesSearch for {len(movie_ids)} movies failed: "
+            f"status={getattr(resp, 'status_code', None)}"
         )
-        if is_new:
-            writer.writeheader()
-        writer.writerow(row)
+        return False
+    return True
 
 
-# ----------------- Pipeline -----------------
-def discover_candidates_for_year(year: int, pages: int = 3) -> List[dict]:
+def radarr_add_batch(
+    movies: List[Movie], root_folder: str = Config.ROOT_FOLDER
+) -> List[Tuple[bool, str]]:
     """
-    Discover popular TMDB movies for a year; we’ll later filter subtitles.
+    Add several movies with one POST /movie/import and, with
+    SEARCH_FOR_MOVIE, start a single MoviesSearch for all of them.
+    Returns (ok, msg) per movie, in order, like radarr_add. Movies missing
+    from the import response (already there, or rejected) are posted one
+    by one to learn why.
     """
-    results: List[dict] = []
-    for p in range(1, pages + 1):
-        page = tmdb_discover(year, page=p)
-        results.extend(page)
+    if not movies:
+        return []
+    headers = {"X-Api-Key": Config.RADARR_KEY}
+    payload = [
+        dict(
+            _radarr_payload(m.tmdb_id, m.title, root_folder, False),
+            year=m.year,
+        )
+        for m in movies
+    ]
+    resp = http_post(
+        f"{Config.RADARR_API}/movie/import",
+        json_body=payload,
+        headers=headers,
+        timeout=60,
+    )
+    created: Dict[int, dict] = {}
+    if resp is not None and resp.status_code in (200, 201, 202):
+        try:
+            for movie in resp.json():
+                created[int(movie.get("tmdbId") or 0)] = movie
+        except Exception as e:
+            log(f"[Radarr] import returned invalid JSON: {e}")
+    else:
+        log(
+            f"[Radarr] import of {len(movies)} movies failed "
+            f"(status={getattr(resp, 'status_code', None)}), adding one by one"
+        )
+
+    results: List[Tuple[bool, str]] = []
+    search_ids: List[int] = []
+    for m in movies:
+        movie = created.get(m.tmdb_id)
+        if movie:
+            RADARR_LIBRARY.add(movie)
+            prewarm_poster(movie)
+            ok, msg = True, "added"
+        else:
+            ok, msg, movie = _radarr_post_movie(m.tmdb_id, m.title, root_folder, False)
+        if ok and movie and movie.get("id"):
+            search_ids.append(movie["id"])
+        results.append((ok, msg))
+
+    if search_ids and Config.SEARCH_FOR_MOVIE:
+        radarr_search(search_ids)
+    if any(ok for ok, _ in results):
+        mark_radarr_updated()
     return results
 
 
-def enrich_movie_basic(tmdb_obj: dict) -> Optional[dict]:
+# ----------------- Posters -----------------
+# Thumbnails for the carousel, served by /api/posters/<tmdb_id> so browsers
+# never pull full-size posters from Radarr themselves
+POSTERS = PosterCache(
+    POSTER_DIR, Config.POSTER_CACHE_MB * 1024 * 1024, Config.POSTER_WIDTH
+)
+_poster_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="suborbit-poster")
+TMDB_POSTER_SIZES = (92, 154, 185, 342, 500, 780)
+
+
+def poster_urls(movie: dict) -> List[str]:
     """
-    From TMDB discover item -> fetch details and produce a normalized movie dict.
-    Note: id from TMDB discover is 'id', from trakt list it's 'tmdb_id'.
+    Where a Radarr movie's poster can be fetched, nearest first: Radarr's
+    MediaCover (its pre-sized poster-250/500 when small enough), then the
+    TMDB image CDN at the smallest size that still fits POSTER_WIDTH.
     """
-    tmdb_id = tmdb_obj.get("id") or tmdb_obj.get("tmdb_id")
-    details = tmdb_details(tmdb_id)
-    if not details:
+    api = urlparse(Config.RADARR_API)
+    width = Config.POSTER_WIDTH
+    urls = []
+    for image in movie.get("images", []):
+        if image.get("coverType") != "poster":
+            continue
+        local = image.get("url") or ""
+        if local.startswith("/") and api.netloc:
+            for size in (250, 500):
+                if width <= size:
+                    local = local.replace("/poster.jpg", f"/poster-{size}.jpg")
+                    break
+            urls.append(f"{api.scheme}://{api.netloc}{local}")
+        remote = image.get("remoteUrl") or ""
+        if "/t/p/original/" in remote:
+            size = next((s for s in TMDB_POSTER_SIZES if s >= width), None)
+            if size:
+                remote = remote.replace("/t/p/original/", f"/t/p/w{size}/")
+        if remote:
+            urls.append(remote)
+    return urls
+
+
+def _fetch_poster(url: str) -> Optional[bytes]:
+    radarr = urlparse(Config.RADARR_API)
+    headers = {}
+    if radarr.netloc and urlparse(url).netloc == radarr.netloc:
+        headers["X-Api-Key"] = Config.RADARR_KEY
+    token = _poster_fetch.set(True)
+    try:
+        resp = HTTP.get(url, headers=headers, timeout=15)
+    except Exception as e:
+        if Config.DEBUG:
+            log(f"[Posters] {url} failed: {e}", level="debug")
         return None
+    finally:
+        _poster_fetch.reset(token)
+    if resp.status_code != 200:
+        return None
+    if not resp.headers.get("Content-Type", "image/").startswith("image/"):
+        return None
+    return resp.content
+
+
+def poster_file(tmdb_id: int, movie: dict = None) -> Optional[Path]:
+    """The cached thumbnail of a library movie, fetched on first use."""
+
+    def sources() -> List[str]:
+        found = movie or RADARR_LIBRARY.find(tmdb_id)
+        if not found and RADARR_LIBRARY.refresh():
+            # Not loaded in this worker yet (or stale): load it and look again
+            found = RADARR_LIBRARY.find(tmdb_id)
+        return poster_urls(found) if found else []
+
+    return POSTERS.get(tmdb_id, sources, _fetch_poster)
 
-    title = details.get("title") or details.get("original_title") or ""
-    release_date = details.get("release_date") or "0000-00-00"
+
+def prewarm_poster(movie: dict) -> None:
+    """Fetch a just-added movie's thumbnail in the background."""
+    if Config.POSTER_PREWARM and movie.get("tmdbId") and movie.get("images"):
+        _poster_pool.submit(poster_file, int(movie["tmdbId"]), movie)
+
+
+# ----------------- CSV -----------------
+_csv_lock = threading.Lock()  # concurrent runs share the file
+
+
+def _rotate_old_csv(file: Path) -> None:
+    """Move aside a CSV written with other columns (older versions)."""
     try:
-        year = (
-            int(release_date[:4]) if release_date and release_date[0:4].isdigit() else 0
-        )
-    except Exception:
-        year = 0
-    imdb_id = details.get("imdb_id")
-    original_language = details.get("original_language") or ""
-    genres = [g.get("name", "") for g in (details.get("genres") or [])]
-    tmdb_rating = (details.get("vote_average") or 0.0) * 1.0
-    vote_count = int(details.get("vote_count") or 0)
-    # log(
-    #     f"Title: {title}, Year: {year}, Orig lang: {original_language}, Genres: {genres}"
-    # )
-    return {
-        "title": title,
+        with file.open("r", newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), None)
+    except OSError:
+        return
+    if header and header != CSV_FIELDS:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        file.rename(file.with_name(f"{file.stem}.{stamp}{file.suffix}"))
+
+
+def append_csv(movie: Movie) -> None:
+    file = Path(CSV_FILE)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    with _csv_lock:
+        _rotate_old_csv(file)
+        with file.open("a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(CSV_FIELDS)
+            writer.writerow(movie.csv_row())
+
+
+# ----------------- Pipeline -----------------
+def discover_filter_params(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translate run filters into /discover/movie query parameters, so TMDB
+    drops obvious rejects before they reach us.
+    """
+    params: Dict[str, Any] = {}
+    if Config.USE_TMDB and filters.get("min_tmdb"):
+        params["vote_average.gte"] = filters["min_tmdb"]
+    # With OMDb, IMDb votes later replace TMDB's count, so only push it without
+    if not Config.OMDB_KEY and filters.get("min_vote_count"):
+        params["vote_count.gte"] = filters["min_vote_count"]
+
+    ids = {name.lower(): gid for gid, name in tmdb_genre_map().items()}
+    include = [str(ids[g]) for g in filters.get("include_genres") or [] if g in ids]
+    exclude = [str(ids[g]) for g in filters.get("exclude_genres") or [] if g in ids]
+    if include:
+        params["with_genres"] = "|".join(include)  # any of
+    if exclude:
+        params["without_genres"] = ",".join(exclude)
+
+    if len(Config.ALLOWED_LANGUAGES) == 1:
+        params["with_original_language"] = Config.ALLOWED_LANGUAGES[0]
+    return params
+
+
+def prefilter_discover_item(
+    item: dict,
+    filters: Dict[str, Any],
+    genre_names: Dict[int, str],
+    predicates: List[FilterPredicate],
+) -> Optional[Tuple[str, str]]:
+    """
+    Run the TMDB-fed predicates on a discover result's own payload (release
+    date, vote_average, vote_count, genre_ids, original_language), before
+    any details fetch. Returns (predicate name, reason) or None.
+    """
+    movie: Dict[str, Any] = {}
+    release_date = item.get("release_date") or ""
+    if release_date[:4].isdigit():
+        movie["year"] = int(release_date[:4])
+    if "vote_average" in item:
+        movie["tmdb_rating"] = item["vote_average"]
+    if "vote_count" in item:
+        movie["vote_count"] = item["vote_count"]
+    if "genre_ids" in item:
+        movie["genres"] = [genre_names.get(g, "") for g in item["genre_ids"]]
+    if item.get("original_language"):
+        movie["original_language"] = item["original_language"]
+    return run_predicates(movie, predicates, filters, source="tmdb", partial=True)
+
+
+def discover_stream(
+    years: Iterable[int],
+    pages: int = 3,
+    filters: Dict[str, Any] = None,
+    rejections: Counter = None,
+    randomize: bool = False,
+    prefetch: int = Config.DISCOVER_PREFETCH,
+    start: Optional[Tuple[int, int]] = None,
+    prefilter: bool = True,
+) -> Iterator[dict]:
+    """
+    Lazily yield TMDB discover candidates for all years, in year/page order.
+    Up to `prefetch` pages (spanning years) are fetched ahead in parallel;
+    a year stops at its first short page, and nothing more is requested
+    once the consumer stops iterating (max_movies reached or stop).
+    With `filters`, they are pushed into the discover query and checked
+    against the discover payload, so rejects never cost a details call
+    (unless `prefilter` is off: a CandidatePool checks them in bulk).
+    With `randomize`, each year is shuffled once all its pages are in.
+    Items carry their "_cursor" ([year, page]); `start` skips the pages
+    before one (resuming a run).
+    """
+    params = discover_filter_params(filters) if filters else {}
+    predicates = active_predicates(filters) if filters and prefilter else []
+    genre_names = tmdb_genre_map() if predicates else {}
+    finished_years = set()
+
+    def page_keys():
+        for year in years:
+            for p in range(1, pages + 1):
+                if year in finished_years:
+                    break
+                if start and (year, p) < tuple(start):
+                    continue
+                yield year, p
+
+    fetched = evaluate_in_order(
+        page_keys(),
+        lambda key: tmdb_discover(key[0], page=key[1], extra_params=params),
+        workers=prefetch,
+    )
+    current_year = None
+    buffered: List[dict] = []
+    try:
+        for (year, p), page in fetched:
+            if year != current_year:
+                random.shuffle(buffered)
+                yield from buffered
+                buffered = []
+                current_year = year
+                if current_run():
+                    current_run().progress["year"] = year
+                log(f"-- Discovering TMDB movies for {year} ...")
+            if page is None:
+                # Failed even after retries: skip it, later pages may still work
+                log(f"[TMDB] discover {year} page {p} failed, skipping it")
+                continue
+            if len(page) < 20:  # last page
+                finished_years.add(year)
+
+            for item in page:
+                failed = prefilter_discover_item(item, filters, genre_names, predicates)
+                if failed:
+                    count_candidate(failed[0], rejections)
+                    if Config.DEBUG:
+                        log(f"❌ {failed[1]}: {item.get('title', '<no title>')}")
+                    continue
+                item["_cursor"] = [year, p]
+                if randomize:
+                    buffered.append(item)
+                else:
+                    yield item
+        random.shuffle(buffered)
+        yield from buffered
+    finally:
+        fetched.close()
+
+
+def ranked_stream(
+    years: Iterable[int],
+    pages: int,
+    filters: Dict[str, Any],
+    rejections: Counter = None,
+    cache: BaseCache = None,
+) -> Iterator[dict]:
+    """
+    Discover every page of every year into a CandidatePool, filter it in
+    bulk and yield the survivors best composite score first (IMDb / RT
+    count where earlier runs cached them). A run then adds the top of
+    all years rather than the first movies that happen to pass.
+    """
+    pool = CandidatePool()
+    discovered = discover_stream(years, pages, filters, prefilter=False)
+    try:
+        pool.extend(discovered)
+    finally:
+        discovered.close()
+    genre_ids = {name.lower(): gid for gid, name in tmdb_genre_map().items()}
+    failed: Counter = Counter()
+    keep = pool.keep_mask(
+        filters, active_predicates(filters), genre_ids, Config.ALLOWED_LANGUAGES, failed
+    )
+    for stage, n in failed.items():
+        if rejections is not None:
+            rejections[stage] += n
+        METRICS.inc("suborbit_candidates_total", n, outcome=stage)
+
+    def known(tmdb_id: int) -> Optional[Tuple[Optional[float], Any]]:
+        cached = cache.get("tmdb", tmdb_id) if cache else None
+        imdb_id = cached and Movie.from_cache(tmdb_id, cached).imdb_id
+        omdb = imdb_id and cache.get("omdb", imdb_id)
+        return (omdb.get("imdb_rating"), omdb.get("rt_score")) if omdb else None
+
+    found = pool.fill_known(known)
+    log(
+        f"🏆 Ranking {sum(keep)} of {len(pool)} discovered movies "
+        f"({found} with known IMDb/RT)"
+    )
+    yield from pool.ranked(parse_weights(Config.RANK_WEIGHTS), keep)
+
+
+def _fetch_subtitle_feed(
+    langs: List[str], year: int, page: int
+) -> Optional[Tuple[List[dict], int]]:
+    """
+    One page of OpenSubtitles' own listing: (items, total_pages), or None
+    if the request failed (after retries).
+    """
+    headers = {"Api-Key": Config.OS_API_KEY, "User-Agent": "SubOrbit/1.0"}
+    params = {
+        "ai_translated": "exclude",
+        "languages": ",".join(sorted(langs)),
+        "machine_translated": "exclude",
+        "order_by": Config.SUBTITLE_FEED_ORDER,
+        "order_direction": "desc",
+        "page": page,
+        "type": "movie",
         "year": year,
-        "tmdb_id": tmdb_id,
-        "imdb_id": imdb_id,
-        "original_language": original_language,
-        "genres": genres,
-        "tmdb_rating": float(tmdb_rating),
-        "imdb_rating": None,
-        "rt_score": None,
-        "vote_count": vote_count,
     }
+    with throttle("opensubtitles"):
+        resp = http_get(
+            f"{Config.OS_API_URL}/subtitles", params=params, headers=headers
+        )
+    if not resp or resp.status_code != 200:
+        log(f"[OS] feed {year} p{page} status={getattr(resp, 'status_code', None)}")
+        return None
+    data = resp.json()
+    return data.get("data", []), int(data.get("total_pages") or 1)
+
+
+def subtitle_feed_stream(
+    langs: List[str],
+    years: Iterable[int],
+    pages: int = 3,
+    randomize: bool = False,
+    start: Optional[Tuple[int, int]] = None,
+) -> Iterator[dict]:
+    """
+    Subtitle-first discovery: movies straight from OpenSubtitles' listing
+    of uploads in `langs` (SUBTITLE_FEED_ORDER: most downloaded or latest
+    first), a year and page at a time. Uploads are grouped per movie and
+    mapped to TMDB ids (feature_details, else one cached /find per movie);
+    each candidate carries its subtitle answer in "_subs", so only the
+    rating and Radarr checks remain. "_cursor" and `start` work as in
+    discover_stream().
+    """
+    seen = set()
+    for year in years:
+        if current_run():
+            current_run().progress["year"] = year
+        log(f"-- Listing {','.join(langs)} subtitles for {year} ...")
+        buffered: List[dict] = []
+        for p in range(1, pages + 1):
+            if start and (year, p) < tuple(start):
+                continue
+            check_stop()
+            listing = _fetch_subtitle_feed(langs, year, p)
+            if listing is None:
+                # Failed even after retries: skip it, later pages may still work
+                log(f"[OS] feed {year} page {p} failed, skipping it")
+                continue
+            items, total_pages = listing
+            by_movie: Dict[Any, dict] = {}
+            for item in items:
+                attrs = item.get("attributes") or {}
+                feature = attrs.get("feature_details") or {}
+                imdb = feature.get("imdb_id")
+                if not imdb:
+                    continue
+                movie = by_movie.setdefault(
+                    imdb,
+                    {
+                        "tmdb_id": feature.get("tmdb_id"),
+                        "imdb_id": f"tt{int(imdb):07d}",
+                        "title": feature.get("title"),
+                        "uploads": {},
+                    },
+                )
+                lang = (attrs.get("language") or "").lower()
+                movie["uploads"].setdefault(lang, []).append(item)
+
+            for movie in by_movie.values():
+                tmdb_id = movie["tmdb_id"] or tmdb_find_imdb(movie["imdb_id"])
+                if not tmdb_id or tmdb_id in seen:
+                    continue
+                seen.add(tmdb_id)
+                subs = {}
+                for lang, uploads in movie["uploads"].items():
+                    score, release = language_score(uploads)
+                    newest = max(
+                        (u.get("attributes") or {}).get("upload_date") or ""
+                        for u in uploads
+                    )
+                    subs[lang] = {
+                        "found": True,
+                        "count": len(uploads),
+                        "newest": newest or None,
+                        "score": score,
+                        "release": release,
+                    }
+                candidate = {
+                    "id": int(tmdb_id),
+                    "imdb_id": movie["imdb_id"],
+                    "title": movie["title"],
+                    "_subs": subs,
+                    "_cursor": [year, p],
+                }
+                if randomize:
+                    buffered.append(candidate)
+                else:
+                    yield candidate
+            if p >= total_pages:
+                break
+        random.shuffle(buffered)
+        yield from buffered
+
+
+def discover_candidates_for_year(
+    year: int,
+    pages: int = 3,
+    filters: Dict[str, Any] = None,
+    rejections: Counter = None,
+) -> List[dict]:
+    """
+    Discover popular TMDB movies for a year; we’ll later filter subtitles.
+    """
+    return list(discover_stream([year], pages, filters, rejections))
+
+
+def enrich_movie_basic(tmdb_obj: dict) -> Optional[Movie]:
+    """
+    From TMDB discover item -> fetch details as a Movie.
+    Note: id from TMDB discover is 'id', from trakt list it's 'tmdb_id'.
+    """
+    return tmdb_details(tmdb_obj.get("id") or tmdb_obj.get("tmdb_id"))
 
 
 def get_tmdb_genres():
-    if not Config.TMDB_API_KEY:
-        return []
-    url = f"https://api.themoviedb.org/3/genre/movie/list?api_key={Config.TMDB_API_KEY}&language=en-US"
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        return [g["name"] for g in data.get("genres", [])]
-    except Exception as e:
-        print("Error fetching TMDB genres:", e)
-        return []
+    return list(tmdb_genre_map().values())
 
 
-def enrich_with_imdb_rt(movie: dict, cache: Dict[str, Any]) -> dict:
+def enrich_with_imdb_rt(movie: Movie, cache: BaseCache) -> Movie:
     """
     Optionally fetch IMDb + RT via OMDb (cached by imdb_id).
     """
-    imdb_id = movie.get("imdb_id")
+    imdb_id = movie.imdb_id
     if not imdb_id:
         return movie
 
-    cache_key = f"omdb:{imdb_id}"
-    if cache_key in cache:
-        omdb = cache[cache_key]
-        movie["imdb_rating"] = omdb.get("imdb_rating")
-        movie["rt_score"] = omdb.get("rt_score")
+    omdb = cache.get("omdb", imdb_id)
+    if omdb is not None:
+        movie.imdb_rating = omdb.get("imdb_rating")
+        movie.rt_score = omdb.get("rt_score")
         # allow cached imdb_votes to override low tmdb vote_count
-        if omdb.get("imdb_votes") and (
-            movie.get("vote_count", 0) < Config.MIN_VOTE_COUNT
-        ):
-            movie["vote_count"] = omdb["imdb_votes"]
+        if omdb.get("imdb_votes") and movie.vote_count < Config.MIN_VOTE_COUNT:
+            movie.vote_count = omdb["imdb_votes"]
         return movie
 
     imdb_rating, imdb_votes, rt_score = omdb_ratings(imdb_id)
     if imdb_rating is not None:
-        movie["imdb_rating"] = imdb_rating
+        movie.imdb_rating = imdb_rating
     if rt_score is not None:
-        movie["rt_score"] = rt_score
+        movie.rt_score = rt_score
     if imdb_votes:
         # if present, prefer IMDb votes for stability
-        movie["vote_count"] = imdb_votes or movie.get("vote_count", 0)
-
-    cache[cache_key] = {
-        "imdb_rating": movie.get("imdb_rating"),
-        "rt_score": movie.get("rt_score"),
-        "imdb_votes": imdb_votes,
-    }
+        movie.vote_count = imdb_votes
+
+    cache.set(
+        "omdb",
+        imdb_id,
+        {
+            "imdb_rating": movie.imdb_rating,
+            "rt_score": movie.rt_score,
+            "imdb_votes": imdb_votes,
+        },
+    )
     return movie
 
 
-def fails_filters(
-    movie,
-    start_year,
-    end_year,
-    min_tmdb,
-    min_imdb,
-    min_rt,
-    include_genres=None,
-    exclude_genres=None,
-):
-    """
-    Check movie against filters.
-    Return reason string if it fails, else None.
-
-    log(
-        f"Checking filters for movie: {movie}, {start_year}, {end_year}, {min_tmdb}, {min_imdb}, {min_rt}, {genres}"
+# ----------------- Decision index -----------------
+# The last rejection per tmdb_id ("decisions" cache namespace) with the
+# inputs it was based on. Later runs re-check that predicate against the
+# stored inputs: still failing under their thresholds means no provider
+# calls; loosened thresholds or an expired entry mean a full evaluation.
+DECISION_FIELDS = (
+    "year",
+    "original_language",
+    "tmdb_rating",
+    "genres",
+    "vote_count",
+    "imdb_rating",
+    "rt_score",
+)
+
+
+def remember_rejection(
+    cache: BaseCache, movie: Movie, stage: str, reason: str, subtitle_lang: str
+) -> None:
+    if not (Config.DECISION_TTL and movie.tmdb_id):
+        return
+    cache.set(
+        "decisions",
+        movie.tmdb_id,
+        {
+            "stage": stage,
+            "reason": reason,
+            "inputs": {k: movie[k] for k in DECISION_FIELDS},
+            "subtitle_lang": subtitle_lang,
+            "decided_at": datetime.now(timezone.utc).isoformat(),
+        },
     )
-    """
 
-    try:
-        year = int(movie.get("year", 0) or 0)
-    except Exception:
-        return "missing or invalid year"
 
-    # Year filters
-    if year < start_year:
-        return f"too old (year {year} < {start_year})"
-    if year > end_year:
-        return f"too new (year {year} > {end_year})"
-
-    # Votes filter
-    vote_count = int(movie.get("vote_count", 0) or 0)
-    if vote_count < Config.MIN_VOTE_COUNT:
-        return f"too few votes ({vote_count} < {Config.MIN_VOTE_COUNT})"
-
-    # Rating filters
-    if Config.USE_TMDB:
-        tmdb_rating = float(movie.get("tmdb_rating") or 0)
-        if tmdb_rating < min_tmdb:
-            return f"low TMDB ({tmdb_rating} < {min_tmdb})"
-
-    if Config.USE_IMDB:
-        imdb_rating = float(movie.get("imdb_rating") or 0)
-        if imdb_rating < min_imdb:
-            return f"low IMDB ({imdb_rating} < {min_imdb})"
-
-    if Config.USE_RT:
-        rt_score = int(movie.get("rt_score") or 0)
-        if rt_score < min_rt:
-            return f"low RT ({rt_score} < {min_rt})"
-
-    # Genres
-    movie_genres = [g.lower() for g in movie.get("genres", [])]
-
-    if include_genres:
-        if not any(g in movie_genres for g in include_genres):
-            return f"no required genres (movie has {movie_genres}, wanted {include_genres})"
-
-    if exclude_genres:
-        if any(g in movie_genres for g in exclude_genres):
-            return f"excluded genre present (movie has {movie_genres}, excludes {exclude_genres})"
-
-    return None
+def known_rejection(
+    cache: BaseCache,
+    tmdb_id: Optional[int],
+    filters: Dict[str, Any],
+    predicates: List[FilterPredicate],
+    subtitle_lang: str,
+) -> Optional[Tuple[str, str]]:
+    """(stage, reason) if a stored rejection still holds, else None."""
+    if not (Config.DECISION_TTL and tmdb_id):
+        return None
+    decision = cache.get("decisions", tmdb_id)
+    if not decision:
+        return None
+    stage = decision["stage"]
+    if stage == "subs":
+        if decision.get("subtitle_lang") != subtitle_lang:
+            return None
+        return stage, f"{decision['reason']} (known)"
+    for p in predicates:
+        if p.name == stage and all(k in decision["inputs"] for k in p.fields):
+            reason = p.check(decision["inputs"], filters)
+            return (stage, f"{reason} (known)") if reason else None
+    return None  # that filter is off in this run
+
+
+def evaluate_candidate(
+    item: dict,
+    cache: BaseCache,
+    filters: Dict[str, Any],
+    subtitle_lang: str,
+    predicates: List[FilterPredicate] = None,
+    subtitle_mode: str = Config.SUBTITLE_MODE,
+) -> Tuple[Optional[Movie], Optional[str], Optional[str]]:
+    """
+    Run one candidate through the stages, cheapest first:
+    Radarr (in-memory) -> TMDB details + TMDB filters -> OMDb + OMDb
+    filters (only if any is active) -> subtitles (all languages at once).
+    Safe to call from worker threads; logging is left to the caller so the
+    log stays in candidate order. Known rejects (decision index) end here
+    before any provider call; new rejections are recorded.
+    Returns (movie, stage, reason); stage is None if the movie passed.
+    """
+    if predicates is None:
+        predicates = active_predicates(filters)
+    langs = parse_languages(subtitle_lang)
+    # Decisions on subtitles only hold for the same languages, mode and bar
+    subs_key = ",".join(langs) + (f"/{subtitle_mode}" if len(langs) > 1 else "")
+    if Config.SUBTITLE_MIN_SCORE:
+        subs_key += f"@{Config.SUBTITLE_MIN_SCORE:g}"
+
+    # Radarr pre-check: ids are already known from discover/Trakt
+    check_stop()
+    tmdb_id = item.get("id") or item.get("tmdb_id")
+    if radarr_exists(tmdb_id, item.get("imdb_id")):
+        return None, "radarr", "already in Radarr"
+
+    known = known_rejection(cache, tmdb_id, filters, predicates, subs_key)
+    if known:
+        METRICS.inc("suborbit_known_rejects_total", stage=known[0])
+        return None, *known
+
+    basic = enrich_movie_basic(item)
+    if not basic:
+        return None, "details", "no TMDB details"
+    failed = run_predicates(basic, predicates, filters, source="tmdb")
+    if failed:
+        remember_rejection(cache, basic, *failed, subs_key)
+        return basic, *failed
+
+    # IMDb/RT enrichment (cached), only if a filter still needs it
+    omdb_done = any(p.source == "omdb" for p in predicates)
+    if omdb_done:
+        check_stop()
+        basic = enrich_with_imdb_rt(basic, cache)
+        failed = run_predicates(basic, predicates, filters, source="omdb")
+        if failed:
+            remember_rejection(cache, basic, *failed, subs_key)
+            return basic, *failed
+
+    # Require subtitles (non-AI) before adding
+    check_stop()
+    known = item.get("_subs")
+    ok, found = subtitle_verdict(known, langs, subtitle_mode)
+    if ok and subtitle_mode == "any":
+        info = known  # listed by the subtitle feed: nothing to ask
+    else:
+        info = subtitle_info(langs, basic.imdb_id, known)
+        ok, found = subtitle_verdict(info, langs, subtitle_mode)
+    if not ok:
+        missing = [l for l in langs if l not in found]
+        weak = [l for l in missing if info and info.get(l, {}).get("found")]
+        if weak and len(weak) == len(missing):
+            scores = ", ".join(f"{l} {info[l].get('score', 0):g}" for l in weak)
+            reason = f"low-quality subs ({scores} < {Config.SUBTITLE_MIN_SCORE:g})"
+        elif subtitle_mode == "all" and found:
+            reason = f"no {','.join(missing)} subs"
+        else:
+            reason = f"no {','.join(langs)} subs"
+        if info is not None:  # a failed lookup is not a decision
+            remember_rejection(cache, basic, "subs", reason, subs_key)
+        return basic, "subs", reason
+    # The feed lists only the languages it matched: leave the rest out
+    basic.subtitles = {l: info[l].get("count", 0) for l in langs if l in info}
+    basic.subtitle_score = max(info[l].get("score", 0) for l in found)
+    # "ranked": the most preferred language found is the movie's
+    basic.subtitle_lang = found[0] if subtitle_mode == "ranked" else ",".join(found)
+
+    # Ratings for the CSV, paid only for accepted movies
+    if not omdb_done:
+        basic = enrich_with_imdb_rt(basic, cache)
+    return basic, None, None
+
+
+def evaluate_in_order(
+    candidates: Iterable[dict], evaluate, workers: int = Config.MAX_WORKERS
+) -> Iterator[Tuple[dict, Any]]:
+    """
+    Evaluate candidates on a bounded thread pool, yielding (item, result)
+    in input order. At most `workers` candidates are in flight ahead of the
+    consumer, so stopping early (max_movies) wastes little work.
+    """
+    workers = max(1, workers)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="suborbit")
+    pending = deque()
+    try:
+        for item in candidates:
+            # Each task runs in a copy of the caller's context (current run)
+            ctx = contextvars.copy_context()
+            pending.append((item, pool.submit(ctx.run, evaluate, item)))
+            if len(pending) >= workers:
+                first, fut = pending.popleft()
+                yield first, fut.result()
+        while pending:
+            first, fut = pending.popleft()
+            yield first, fut.result()
+    finally:
+        for _, fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 # ----------------- API: Trakt -----------------
@@ -443,6 +1606,7 @@ def sanitize_trakt_name(name: str) -> str:
 
 
 TOKEN_PATH = Path("trakt_token.json")
+TRAKT_PAGE_KEEP = 30 * 86400  # cached pages outlive CACHE_TTL_TRAKT for revalidation
 
 
 def get_trakt_token():
@@ -465,7 +1629,7 @@ def get_trakt_token():
 
     # Refresh
     log("♻️ Refreshing expired Trakt token ...")
-    url = "https://api.trakt.tv/oauth/token"
+    url = f"{Config.TRAKT_API_URL}/oauth/token"
     payload = {
         "refresh_token": refresh_token,
         "client_id": Config.TRAKT_CLIENT_ID,
@@ -475,7 +1639,7 @@ def get_trakt_token():
     headers = {"Content-Type": "application/json"}
 
     try:
-        r = requests.post(url, json=payload, headers=headers, timeout=10)
+        r = HTTP.post(url, json=payload, headers=headers, timeout=10)
         if r.status_code != 200:
             log(f"⚠️ Failed to refresh Trakt token: {r.status_code} {r.text[:200]}")
             return None
@@ -492,66 +1656,279 @@ def get_trakt_token():
         return None
 
 
-def fetch_trakt_list(user: str, list_name: str):
-    """Fetch a (public or private) Trakt list of movies, with logging."""
-    log(f"🎬 Fetching movies from Trakt list: {user}/{list_name}")
-
-    user = sanitize_trakt_name(user)
-    list_name = sanitize_trakt_name(list_name)
-    url = f"https://api.trakt.tv/users/{user}/lists/{list_name}/items/movies"
-
-    token = get_trakt_token()
-
+def _trakt_headers() -> Dict[str, str]:
     headers = {
         "Content-Type": "application/json",
         "trakt-api-version": "2",
         "trakt-api-key": Config.TRAKT_CLIENT_ID,
         "User-Agent": "suborbit",
     }
+    token = get_trakt_token()
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    return headers
 
-    try:
-        log(f"🔗 Requesting: {url}")
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code != 200:
-            log(f"⚠️ Trakt returned {r.status_code}: {r.text[:200]}")
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        log(f"❌ Trakt fetch failed: {e}")
-        return []
 
-    movies = []
-    for item in data:
-        m = item.get("movie")
-        if not m:
-            continue
-        ids = m.get("ids", {})
-        movies.append(
-            {
-                "title": m.get("title"),
-                "year": m.get("year"),
-                "imdb_id": ids.get("imdb"),
-                "tmdb_id": ids.get("tmdb"),
-            }
+def _slim_trakt_item(item: dict) -> dict:
+    m = item["movie"]
+    ids = m.get("ids", {})
+    return {
+        "title": m.get("title"),
+        "year": m.get("year"),
+        "imdb_id": ids.get("imdb"),
+        "tmdb_id": ids.get("tmdb"),
+    }
+
+
+def trakt_list_stream(
+    user: str, list_name: str, page_size: int = Config.TRAKT_PAGE_SIZE
+) -> Iterator[dict]:
+    """
+    Yield the movies of a (public or private) Trakt list page by page,
+    following X-Pagination-Page-Count; pages are only requested as the
+    consumer gets to them. Each page is cached with its ETag/Last-Modified:
+    within CACHE_TTL_TRAKT it is reused as is, afterwards revalidated, so an
+    unchanged page costs a bodyless 304.
+    """
+    log(f"🎬 Fetching movies from Trakt list: {user}/{list_name}")
+
+    user = sanitize_trakt_name(user)
+    list_name = sanitize_trakt_name(list_name)
+    url = f"{Config.TRAKT_API_URL}/users/{user}/lists/{list_name}/items/movies"
+    cache = load_cache()
+    headers = None  # the token lookup waits until a request is needed
+
+    page, page_count = 1, 1
+    while page <= page_count:
+        check_stop()
+        key = f"{user}/{list_name}/{page_size}/{page}"
+        entry = cache.get("trakt", key)
+        if not entry or time.time() - entry["fetched_at"] >= Config.CACHE_TTL_TRAKT:
+            if headers is None:
+                headers = _trakt_headers()
+            conditional = dict(headers)
+            if entry and entry.get("etag"):
+                conditional["If-None-Match"] = entry["etag"]
+            if entry and entry.get("last_modified"):
+                conditional["If-Modified-Since"] = entry["last_modified"]
+            with throttle("trakt"):
+                resp = http_get(
+                    url,
+                    params={"page": page, "limit": page_size},
+                    headers=conditional,
+                )
+            status = getattr(resp, "status_code", None)
+            if status == 304 and entry:
+                entry["fetched_at"] = time.time()
+            elif status == 200:
+                try:
+                    data = resp.json()
+                except ValueError as e:
+                    log(f"❌ Trakt returned invalid JSON: {e}")
+                    return
+                count = resp.headers.get("X-Pagination-Page-Count")
+                entry = {
+                    "items": [_slim_trakt_item(i) for i in data if i.get("movie")],
+                    # Without pagination headers: a full page means more follow
+                    "page_count": (
+                        int(count)
+                        if count
+                        else page + 1 if len(data) == page_size else page
+                    ),
+                    "item_count": resp.headers.get("X-Pagination-Item-Count"),
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+            elif entry:
+                log(f"⚠️ Trakt returned {status}, using cached page {page}")
+            else:
+                text = getattr(resp, "text", "") or ""
+                log(f"❌ Trakt fetch failed: {status} {text[:200]}")
+                return
+            cache.set("trakt", key, entry, ttl=TRAKT_PAGE_KEEP)
+
+        if page == 1 and entry.get("item_count"):
+            log(f"📄 Trakt list: {entry['item_count']} movies")
+        page_count = entry["page_count"]
+        yield from entry["items"]
+        page += 1
+
+
+def fetch_trakt_list(user: str, list_name: str) -> List[dict]:
+    """The whole Trakt list at once (prefer trakt_list_stream for big lists)."""
+    return list(trakt_list_stream(user, list_name))
+
+
+def reservoir_sample(items: Iterable[Any], k: int) -> List[Any]:
+    """
+    A uniform random sample of k items from a stream of unknown length,
+    holding only k at a time (Algorithm R), in random order.
+    """
+    sample: List[Any] = []
+    for i, item in enumerate(items):
+        if i < k:
+            sample.append(item)
+        else:
+            j = random.randint(0, i)
+            if j < k:
+                sample[j] = item
+    random.shuffle(sample)
+    return sample
+
+
+# ----------------- Runs -----------------
+class RunContext:
+    """
+    One pipeline run: its cancel token, log stream, progress and summary.
+    main_process() makes it current for its thread and the worker threads
+    it starts, so check_stop(), throttle() and log() act on the right run
+    when several run side by side. `fresh_log` is False when runs in
+    other workers write to the shared log (it must not be truncated).
+    """
+
+    def __init__(self, run_id: str = None, fresh_log: bool = True) -> None:
+        self.id = run_id or uuid.uuid4().hex[:12]
+        self.fresh_log = fresh_log
+        self.cancel = threading.Event()
+        self.log = LogBuffer(Config.LOG_BUFFER_LINES)
+        self.progress: Dict[str, Any] = {}
+        self.state: Dict[str, Any] = {}  # run summary, see start_run_summary
+
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar(
+    "suborbit_run", default=None
+)
+ACTIVE_RUNS: Dict[str, RunContext] = {}
+LAST_RUN: Optional[RunContext] = None  # most recently started, for the UI
+
+
+def current_run() -> Optional[RunContext]:
+    return _current_run.get()
+
+
+def request_stop(run_id: str = None):
+    """Stop one run gracefully, or every active run."""
+    for rid, run in list(ACTIVE_RUNS.items()):
+        if run_id in (None, rid):
+            run.cancel.set()
+
+
+# ----------------- Run summary -----------------
+
+
+def _provider_totals() -> Dict[str, Dict[str, float]]:
+    totals: Dict[str, Dict[str, float]] = {}
+
+    def entry(name):
+        return totals.setdefault(
+            name,
+            {"requests": 0, "errors": 0, "seconds": 0.0, "rate_limit_wait": 0.0},
         )
 
-    return movies
+    for key, n in METRICS.counter_values("suborbit_http_requests_total").items():
+        labels = dict(key)
+        p = entry(labels["provider"])
+        p["requests"] += n
+        status = labels["status"]
+        if status == "error" or int(status) >= 400:
+            p["errors"] += n
+    for key, (_, seconds) in METRICS.histogram_totals(
+        "suborbit_http_request_seconds"
+    ).items():
+        entry(dict(key)["provider"])["seconds"] += seconds
+    for name, limiter in LIMITERS.items():
+        entry(name)["rate_limit_wait"] = limiter.waited
+    return totals
+
+
+def _cache_totals() -> Dict[str, Dict[str, int]]:
+    cache = load_cache()
+    namespaces = set(cache.hits) | set(cache.misses)
+    return {
+        ns: {"hits": cache.hits[ns], "misses": cache.misses[ns]} for ns in namespaces
+    }
 
 
-# ----------------- Stop mechanism -----------------
-# Global stop flag
-STOP_EVENT = threading.Event()
+def _diff(now: dict, base: dict) -> dict:
+    out = {}
+    for k, v in now.items():
+        if isinstance(v, dict):
+            out[k] = _diff(v, base.get(k) or {})
+        else:
+            out[k] = round(v - (base.get(k) or 0), 3)
+    return out
+
+
+def start_run_summary(params: Dict[str, Any]) -> None:
+    state = current_run().state
+    state.clear()
+    state.update(
+        {
+            "running": True,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "started": time.time(),
+            "params": params,
+            "added": 0,
+            "not_added": [],  # accepted, still waiting for Radarr at a stop
+            "rejections": Counter(),
+            "base_providers": _provider_totals(),
+            "base_cache": _cache_totals(),
+        }
+    )
 
 
-def request_stop():
-    """Call this to stop the current run gracefully."""
-    STOP_EVENT.set()
+def run_summary(run: RunContext = None) -> Dict[str, Any]:
+    """
+    JSON-friendly summary of a run (default: the latest one). Provider and
+    cache numbers are process-wide, so they include any concurrent runs.
+    """
+    run = run or LAST_RUN
+    if not (run and run.state):
+        return {"running": False}
+    state = run.state
+    end = state.get("finished") or time.time()
+    providers = _diff(_provider_totals(), state["base_providers"])
+    providers = {
+        k: v for k, v in providers.items() if any(v.values()) and k != "posters"
+    }
+    cache = _diff(_cache_totals(), state["base_cache"])
+    for c in cache.values():
+        lookups = c["hits"] + c["misses"]
+        c["hit_ratio"] = round(c["hits"] / lookups, 3) if lookups else None
+    bottleneck = max(
+        providers,
+        key=lambda p: providers[p]["seconds"] + providers[p]["rate_limit_wait"],
+        default=None,
+    )
+    return {
+        "id": run.id,
+        "running": state["running"],
+        "started_at": state["started_at"],
+        "finished_at": state.get("finished_at"),
+        "duration": round(end - state["started"], 2),
+        "params": state["params"],
+        "added": state["added"],
+        "not_added": state["not_added"],
+        "rejections": dict(state["rejections"]),
+        "providers": providers,
+        "cache": cache,
+        "bottleneck": bottleneck,
+    }
 
 
-def reset_stop():
-    STOP_EVENT.clear()
+def finish_run_summary() -> Dict[str, Any]:
+    run = current_run()
+    run.state["running"] = False
+    run.state["finished"] = time.time()
+    run.state["finished_at"] = datetime.now(timezone.utc).isoformat()
+    summary = run_summary(run)
+    for name, p in summary["providers"].items():
+        log(
+            f"⏱️ {name}: {p['requests']:g} requests, {p['seconds']:.1f}s in HTTP, "
+            f"{p['rate_limit_wait']:.1f}s rate limited, {p['errors']:g} errors"
+        )
+    return summary
 
 
 # ----------------- Orchestration -----------------
@@ -568,25 +1945,69 @@ def main_process(
     max_pages: int = Config.MAX_DISCOVER_PAGES,
     min_vote_count: int = Config.MIN_VOTE_COUNT,
     subtitle_lang: str = Config.SUBTITLE_LANG,
+    subtitle_mode: str = Config.SUBTITLE_MODE,
+    discovery: str = Config.DISCOVERY,
+    rank: bool = Config.RANK_CANDIDATES,
     trakt_user=None,
     trakt_list=None,
-) -> None:
+    run: RunContext = None,
+) -> Optional[Dict[str, Any]]:
     """
     Runs the whole pipeline with current config and parameters.
+    `run` carries the cancel token, log and progress (a fresh one if
+    omitted). A run whose id has a checkpoint with the same parameters
+    resumes from it. Returns the run summary.
     """
-
-    # Make sure we start clean
-    reset_stop()
+    global LAST_RUN
+    run = run or RunContext()
+    if subtitle_mode not in SUBTITLE_MODES:
+        subtitle_mode = "any"
+    if discovery not in DISCOVERY_MODES:
+        discovery = "tmdb"
+    token = _current_run.set(run)
+    ACTIVE_RUNS[run.id] = run
+    LAST_RUN = run
+    checkpoint, completed = None, False
+    batch: List[Tuple[Movie, Optional[list]]] = []  # accepted, not yet in Radarr
+    batch_started = 0.0
+
+    def flush_batch() -> None:
+        """
+        Add the held movies to Radarr; log, count and record each one.
+        Failed adds stay held in the checkpoint, so a resume retries them.
+        """
+        nonlocal total_added
+        movies = [basic for basic, _ in batch]
+        if Config.RADARR_BATCH_SIZE > 1:
+            outcomes = radarr_add_batch(movies, Config.ROOT_FOLDER)
+        else:
+            outcomes = [
+                radarr_add(m.tmdb_id, m.title, Config.ROOT_FOLDER) for m in movies
+            ]
+        for (basic, cursor), (ok, msg) in zip(batch, outcomes):
+            if ok or msg == "exists":
+                checkpoint.decide(basic.tmdb_id, cursor)
+            if ok:
+                total_added += 1
+                run.state["added"] = run.progress["added"] = total_added
+                METRICS.inc("suborbit_movies_added_total")
+                log(f"🎬 added to Radarr: {basic.title} ({basic.year})")
+                append_csv(basic)
+            elif msg == "exists":
+                log(f"Already in Radarr (detected on add): {basic.title}")
+            else:
+                log(f"[Radarr] Failed to add {basic.title}: {msg}")
+        batch.clear()
 
     try:
 
-        # Clear previous log
-        try:
-            LOG_PATH.write_text("", encoding="utf-8")
-        except Exception:
-            pass
-
-        log(f"=== Starting SubOrbit run ===")
+        # Clear previous log, unless another run (in any worker) still
+        # writes to it: then this run only starts its own section
+        if run.fresh_log and len(ACTIVE_RUNS) == 1:
+            clear_log()
+            log(f"=== Starting SubOrbit run ===")
+        else:
+            log(f"=== Starting SubOrbit run {run.id} ===")
         log(f"Years: {start_year}–{end_year}")
         tmdb_min = str(min_tmdb) if Config.USE_TMDB else f"({min_tmdb})"
         imdb_min = str(min_imdb) if Config.USE_IMDB else f"({min_imdb})"
@@ -596,136 +2017,199 @@ def main_process(
         log(f"Randomize: {randomize}")
         log(f"Max TMDB pages per year: {max_pages}")
         log(f"Min TMDB/IMDB vote count: {min_vote_count}")
+        if len(parse_languages(subtitle_lang)) > 1:
+            log(f"Subtitles: {subtitle_lang} ({subtitle_mode})")
+        if discovery == "subtitles" and not trakt_list:
+            log(f"Discovery: subtitle-first ({Config.SUBTITLE_FEED_ORDER})")
+        elif rank and not randomize and not trakt_list:
+            log(f"Ranking: best of all years ({Config.RANK_WEIGHTS})")
         if include_genres or exclude_genres:
             log(f"Include genres: {include_genres or 'none'}")
             log(f"Exclude genres: {exclude_genres or 'none'}")
         log(f"=============================")
 
-        cache = load_cache()
         total_added = 0
         years = list(range(int(start_year), int(end_year) + 1))
-        trakt_complete = False
-
-        for year in years:
-            if max_movies and total_added >= max_movies:
-                break
-            if trakt_complete:
-                break
-
-            # ----------------- Movie discovery -----------------
-            if trakt_user and trakt_list:
-                candidates = fetch_trakt_list(trakt_user, trakt_list)
-
-                # Optional shuffle for variety
-                if randomize and isinstance(candidates, dict):
-                    import random
-
-                    items = list(candidates.items())
-                    random.shuffle(items)
-                    candidates = dict(items)
-
-                log(f"✅ Loaded {len(candidates)} movies from Trakt list.")
-                trakt_complete = True
-            else:
-                log(f"-- Discovering TMDB movies for {year} ...")
-                candidates = discover_candidates_for_year(
-                    year, pages=Config.MAX_DISCOVER_PAGES
+        filters = make_filters(
+            start_year,
+            end_year,
+            min_tmdb,
+            min_imdb,
+            min_rt,
+            include_genres,
+            exclude_genres,
+            min_vote_count,
+        )
+        predicates = active_predicates(filters)
+        params = {
+            **filters,
+            "max_movies": max_movies,
+            "randomize": randomize,
+            "max_pages": max_pages,
+            "subtitle_lang": subtitle_lang,
+            "subtitle_mode": subtitle_mode,
+            "discovery": discovery,
+            "rank": bool(rank),
+            "trakt_list": f"{trakt_user}/{trakt_list}" if trakt_list else None,
+        }
+        start_run_summary(params)
+        rejections: Counter = run.state["rejections"]
+        run.progress.update({"evaluated": 0, "added": 0, "max_movies": max_movies})
+
+        # Pick up a stopped or crashed run with the same id
+        ckpt_path = CHECKPOINT_DIR / f"{run.id}.json"
+        checkpoint = Checkpoint.load(ckpt_path, params, Config.CHECKPOINT_INTERVAL)
+        if checkpoint:
+            total_added = checkpoint.added
+            run.state["added"] = run.progress["added"] = total_added
+            run.progress["evaluated"] = checkpoint.evaluated
+            rejections.update(checkpoint.rejections)
+            log(
+                f"⏯️ Resuming: {len(checkpoint.processed)} movies already decided, "
+                f"{total_added} added"
+            )
+        else:
+            checkpoint = Checkpoint(ckpt_path, params, Config.CHECKPOINT_INTERVAL)
+        cache = load_cache()
+        RADARR_LIBRARY.refresh()
+
+        # ----------------- Movie discovery -----------------
+        if trakt_user and trakt_list:
+            # Streamed: pages are only fetched as candidates are consumed
+            candidates = trakt_list_stream(trakt_user, trakt_list)
+
+            # Random selection reads the whole list but keeps only a sample
+            if randomize:
+                candidates = reservoir_sample(candidates, Config.TRAKT_SAMPLE_SIZE)
+                log(f"🎲 Picked {len(candidates)} random movies from the Trakt list")
+        else:
+            # Streamed: pages are only fetched as candidates are consumed
+            start = checkpoint.cursor
+            if start:
+                years = [y for y in years if y >= start[0]]
+            if discovery == "subtitles":
+                # Only movies that have the subtitles; "all" still checks the rest
+                langs = parse_languages(subtitle_lang)
+                feed_langs = langs[:1] if subtitle_mode == "all" else langs
+                candidates = subtitle_feed_stream(
+                    feed_langs, years, max_pages, randomize=randomize, start=start
                 )
-                if randomize:
-                    import random
-
-                    random.shuffle(candidates)
-
-            for item in candidates:
-                if max_movies and total_added >= max_movies:
-                    break
-
-                check_stop()
-
-                basic = enrich_movie_basic(item)
-                if not basic:
-                    continue
-
-                # Optional genre override for this run (instead of ALLOWED_GENRES)
-                # if genres:
-                #     if not any(g in genres for g in basic.get("genres", [])):
-                #         continue
-
-                tmdb_id = basic.get("tmdb_id")
-                imdb_id = basic.get("imdb_id")
-
-                # Radarr pre-check
-                if radarr_exists(tmdb_id):
-                    log(f"📀 already in Radarr: {basic['title']}")
-                    continue
-
-                # IMDb/RT enrichment (cached)
-                basic = enrich_with_imdb_rt(basic, cache)
-
-                # Apply filters
-                reason = fails_filters(
-                    basic,
-                    start_year,
-                    end_year,
-                    min_tmdb,
-                    min_imdb,
-                    min_rt,
-                    include_genres=include_genres,
-                    exclude_genres=exclude_genres,
+            elif rank and not randomize:
+                # Needs every page first; resuming relies on decided movies
+                candidates = ranked_stream(
+                    list(range(int(start_year), int(end_year) + 1)),
+                    max_pages,
+                    filters,
+                    rejections,
+                    cache,
+                )
+            else:
+                candidates = discover_stream(
+                    years,
+                    max_pages,
+                    filters,
+                    rejections,
+                    randomize=randomize,
+                    start=start,
                 )
-                if reason:
-                    if Config.DEBUG:
-                        log(f"❌ {reason}: {item.get('title','<no title>')}")
-                    continue
-
-                # Require subtitles (non-AI) before any rating fetch
-                if not has_subs(subtitle_lang, imdb_id):
-                    if Config.DEBUG:
-                        log(f"❌ no {subtitle_lang} subs: {basic['title']}")
-                    continue
-
-                if Config.DEBUG:
-                    log(f"✅ passed all filters: {item.get('title','<no title>')}")
-
-                # Add to Radarr
-                ok, msg = radarr_add(tmdb_id, basic["title"], Config.ROOT_FOLDER)
-                if ok:
-                    total_added += 1
-                    log(
-                        f"🎬 added to Radarr: {basic['title']} ({basic['year']}) "
-                        #                        f"| TMDb {basic.get('tmdb_rating')} | IMDb {basic.get('imdb_rating')} | RT {basic.get('rt_score')}"
-                    )
-                    append_csv(
-                        {
-                            "title": basic["title"],
-                            "year": basic["year"],
-                            "tmdb_id": basic["tmdb_id"],
-                            "imdb_id": basic.get("imdb_id"),
-                            "original_language": basic.get("original_language"),
-                            "genres": ",".join(basic.get("genres", [])),
-                            "tmdb_rating": basic.get("tmdb_rating"),
-                            "imdb_rating": basic.get("imdb_rating"),
-                            "rt_score": basic.get("rt_score"),
-                            "vote_count": basic.get("vote_count", 0),
-                        }
-                    )
-                elif msg == "exists":
-                    log(f"Already in Radarr (detected on add): {basic['title']}")
-                else:
-                    log(f"[Radarr] Failed to add {basic['title']}: {msg}")
 
-                # Persist cache periodically
-                if total_added and total_added % 5 == 0:
-                    save_cache(cache)
+        # Movies decided before a restart cost no provider calls
+        pending = (
+            item
+            for item in candidates
+            if not checkpoint.skip(item.get("id") or item.get("tmdb_id"))
+        )
+        results = evaluate_in_order(
+            pending,
+            lambda item: evaluate_candidate(
+                item, cache, filters, subtitle_lang, predicates, subtitle_mode
+            ),
+        )
+        for item, (basic, stage, reason) in results:
+            if max_movies and total_added >= max_movies:
+                break
 
-        save_cache(cache)
+            check_stop()
+            if batch and time.monotonic() - batch_started >= Config.RADARR_BATCH_WAIT:
+                flush_batch()
+            run.progress["evaluated"] += 1
+            checkpoint.save(total_added, run.progress["evaluated"], rejections)
+            # A shuffled year may hold earlier pages still to decide
+            cursor = item.get("_cursor")
+            if cursor and randomize:
+                cursor = [cursor[0], 1]
+
+            if stage:
+                count_candidate(stage, rejections)
+                checkpoint.decide(item.get("id") or item.get("tmdb_id"), cursor)
+                title = item.get("title") or (basic.title if basic else None)
+                if stage == "radarr":
+                    log(f"📀 already in Radarr: {title}")
+                elif stage != "details" and Config.DEBUG:
+                    log(f"❌ {reason}: {title or '<no title>'}")
+                continue
+
+            count_candidate("accepted")
+            if Config.DEBUG:
+                log(f"✅ passed all filters: {basic.title}")
+
+            # Add to Radarr, a batch at a time (or once max_movies is covered)
+            if not batch:
+                batch_started = time.monotonic()
+            batch.append((basic, cursor))
+            checkpoint.hold(basic.tmdb_id, cursor)
+            if len(batch) >= Config.RADARR_BATCH_SIZE or (
+                max_movies and total_added + len(batch) >= max_movies
+            ):
+                flush_batch()
+        if batch:
+            flush_batch()
+        results.close()
+        if hasattr(candidates, "close"):
+            candidates.close()
+        completed = True
+
+        if rejections:
+            log(
+                "Rejected by stage: "
+                + ", ".join(f"{k}={v}" for k, v in rejections.most_common())
+            )
         log(f"=== Summary: added={total_added}, years={start_year}-{end_year} ===")
 
     except RuntimeError:
         log(f"Run stopped by user")
+    finally:
+        if batch and run.cancel.is_set():
+            # Stopped: nothing more goes to Radarr; they stay held for a resume
+            for basic, _ in batch:
+                log(f"⏹️ not added (stopped): {basic.title} ({basic.year})")
+                run.state["not_added"].append(
+                    {"tmdb_id": basic.tmdb_id, "title": basic.title}
+                )
+            batch.clear()
+        elif batch:
+            # Already accepted; if this fails too they stay held for a resume
+            try:
+                flush_batch()
+            except Exception as e:
+                log(f"[WARN] Failed to add the waiting movies: {e}")
+        if checkpoint and completed:
+            checkpoint.discard()
+        elif checkpoint:
+            # Stopped or crashed: keep the position for a resume
+            try:
+                checkpoint.save(
+                    total_added, run.progress["evaluated"], rejections, force=True
+                )
+            except Exception as e:
+                log(f"[WARN] Failed to save checkpoint: {e}")
+        summary = finish_run_summary() if run.state.get("running") else None
+        ACTIVE_RUNS.pop(run.id, None)
+        _current_run.reset(token)
+    return summary
 
 
 # ----------------- CLI -----------------
 if __name__ == "__main__":
     # Purely parameter-driven: runs with values from config.py / .env
-    main_process()
+    main_process(run=RunContext(CLI_RUN_ID))